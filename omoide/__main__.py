@@ -131,6 +131,9 @@ def cli():
 @click.option('--static-folder',
               default=constants.DEFAULT_STATIC_FOLDER,
               help='Where to load static from (only if static is on)')
+@click.option('--shards',
+              default=0,
+              help='Worker processes for every search (0 to search in place)')
 def cmd_runserver(**kwargs) -> None:
     """Command that starts web server."""
     command = commands.RunserverCommand(**kwargs)
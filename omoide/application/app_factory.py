@@ -1,35 +1,118 @@
 # -*- coding: utf-8 -*-
 """Application.
 """
-from functools import partial
+import html
+import time
+from functools import partial, wraps
+from typing import Callable, List
 
 import flask
+import markupsafe
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import sessionmaker
 
-import omoide.constants.project
-import omoide.database.operations
-from omoide import commands, constants, utils
+from omoide import commands, constants, utils, infra
 from omoide import search_engine
-from omoide.application import database, logic
+from omoide.application import logic
+from omoide.application.class_reloader import Reloader
+from omoide.application.class_search_state import SearchState
 from omoide.application.class_web_query import WebQuery
+from omoide.database import operations
 
 
-# pylint: disable=too-many-locals
+# pylint: disable=too-many-locals,too-many-statements
 def create_app(command: commands.RunserverCommand,
                engine: Engine) -> flask.Flask:
     """Create web application instance."""
     app = flask.Flask(import_name='omoide',
                       template_folder=command.templates_folder,
                       static_folder=command.static_folder)
-    Session = sessionmaker(bind=engine)  # pylint: disable=invalid-name
-    query_builder = search_engine.QueryBuilder(search_engine.Query)
+    timings = search_engine.Histograms()
 
-    with omoide.database.operations.session_scope(Session) as _session:
-        search_index = database.get_index(_session)
+    def load_state() -> SearchState:
+        """Load state for the new database file."""
+        new_engine = operations.create_read_only_database(
+            folder=command.database_folder,
+            filename=constants.STATIC_DB_FILE_NAME,
+            filesystem=infra.Filesystem(),
+            echo=False,
+        )
+        return SearchState.load(new_engine, command.database_folder,
+                                command.shards)
+
+    reloader = Reloader(
+        folder=command.database_folder,
+        current=SearchState.load(engine, command.database_folder,
+                                 command.shards),
+        loader=load_state,
+    )
+    reloader.compact()
+    app.extensions[constants.RELOADER_EXTENSION] = reloader
 
     version = f'Version: {constants.VERSION}'
 
+    @app.before_request
+    def take_state():
+        """Fix search state for the whole request."""
+        reloader.check()
+        flask.g.state = reloader.current
+
+    def cached(when: Callable[[WebQuery], bool] = lambda _: True):
+        """Store rendered page and answer with 304 if client has it."""
+
+        def decorator(view):
+            """Wrap the view."""
+
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                """Return page from the cache if possible."""
+                web_query = WebQuery.from_request(flask.request.args)
+
+                if flask.request.method != 'GET' or not when(web_query):
+                    response = flask.make_response(view(*args, **kwargs))
+                    if 'search_report' in flask.g:
+                        body = fill_report(response.get_data(),
+                                           flask.g.search_report)
+                        response.set_data(fill_note(body,
+                                                    flask.g.search_note))
+                    return response
+
+                start = time.perf_counter()
+                state = flask.g.state
+                key = (flask.request.path, web_query.get_key())
+                etag = state.page_cache.make_etag(state.version, key)
+
+                if etag in flask.request.if_none_match:
+                    state.page_cache.revalidate()
+                    response = flask.Response(status=304)
+                    response.set_etag(etag)
+                    return response
+
+                stored = state.page_cache.get(key)
+
+                if stored is None:
+                    response = flask.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    stored = (response.get_data(), response.mimetype)
+                    state.page_cache.put(key, *stored)
+                    report = flask.g.get('search_report', [])
+                    note = flask.g.get('search_note', '')
+                else:
+                    duration = time.perf_counter() - start
+                    report = [f'Page was taken from cache '
+                              f'in {duration:0.4f} sec.']
+                    note = f'Taken from cache in {duration:0.4f} seconds'
+
+                body, mimetype = stored
+                body = fill_note(fill_report(body, report), note)
+                response = flask.Response(body, mimetype=mimetype)
+                response.set_etag(etag)
+                return response
+
+            return wrapper
+
+        return decorator
+
     @app.route('/')
     def index():
         """Entry page."""
@@ -46,6 +129,7 @@ def create_app(command: commands.RunserverCommand,
             'sep_digits': utils.sep_digits,
             'web_query': '',
             'search_report': [],
+            'search_report_marker': constants.SEARCH_REPORT_MARKER,
         }
 
     @app.errorhandler(404)
@@ -58,13 +142,17 @@ def create_app(command: commands.RunserverCommand,
         return flask.render_template('404.html', **context), 404
 
     @app.route('/navigation')
+    @cached()
     def navigation():
         """Show selection fields for realm/theme."""
         web_query = WebQuery.from_request(flask.request.args)
-        context = logic.make_navigation_response(Session, web_query)
+        context = logic.make_navigation_response(flask.g.state.maker,
+                                                 web_query)
         return flask.render_template('navigation.html', **context)
 
+    # random pages get new seed on every visit
     @app.route('/search', methods=['GET', 'POST'])
+    @cached(when=lambda web_query: bool(web_query.get('q')))
     def search():
         """Main page of the application."""
         web_query = WebQuery.from_request(flask.request.args)
@@ -73,29 +161,101 @@ def create_app(command: commands.RunserverCommand,
             web_query['q'] = flask.request.form.get('query', '')
             return flask.redirect(flask.url_for('search') + str(web_query))
 
-        context = logic.make_search_response(maker=Session,
-                                             web_query=web_query,
-                                             query_builder=query_builder,
-                                             index=search_index)
+        state = flask.g.state
+        context = logic.make_search_response(
+            maker=state.maker,
+            web_query=web_query,
+            query_builder=state.query_builder,
+            index=state.index,
+            search_cache=state.search_cache,
+            facets=state.facets,
+            timings=timings,
+        )
 
+        # report and duration differ for every request,
+        # they are not stored with page
+        flask.g.search_report = context['search_report']
+        flask.g.search_note = context['note']
+        context['note'] = markupsafe.Markup(constants.SEARCH_NOTE_MARKER)
         return flask.render_template('search.html', **context)
 
     @app.route('/preview/<uuid>')
+    @cached()
     def preview(uuid: str):
         """Show description for a single record."""
         not_found = partial(flask.abort, 404)
         web_query = WebQuery.from_request(flask.request.args)
-        context = logic.make_preview_response(maker=Session,
+        context = logic.make_preview_response(maker=flask.g.state.maker,
                                               web_query=web_query,
                                               uuid=uuid,
                                               abort_callback=not_found)
         return flask.render_template('preview.html', **context)
 
+    @app.route('/api/stats')
+    def stats():
+        """Show internal counters for monitoring."""
+        return flask.jsonify({
+            'generation': reloader.generation,
+            'reload_failures': reloader.failures,
+            'search_cache': flask.g.state.search_cache.as_dict(),
+            'page_cache': flask.g.state.page_cache.as_dict(),
+            'timings': timings.as_dict(),
+        })
+
+    @app.route('/api/search')
+    def api_search():
+        """Return one page of found records as json."""
+        web_query = WebQuery.from_request(flask.request.args)
+        state = flask.g.state
+
+        try:
+            context = logic.make_api_search_response(
+                maker=state.maker,
+                web_query=web_query,
+                query_builder=state.query_builder,
+                index=state.index,
+                search_cache=state.search_cache,
+                timings=timings,
+            )
+        except ValueError as exc:
+            return flask.jsonify({'error': str(exc)}), 400
+
+        return flask.Response(logic.dumps(context),
+                              mimetype='application/json')
+
+    @app.route('/api/search/export')
+    def api_export():
+        """Stream all found records as newline delimited json."""
+        web_query = WebQuery.from_request(flask.request.args)
+        state = flask.g.state
+        lines = logic.make_api_export_response(
+            maker=state.maker,
+            web_query=web_query,
+            query_builder=state.query_builder,
+            index=state.index,
+            search_cache=state.search_cache,
+        )
+        return flask.Response(lines, mimetype='application/x-ndjson')
+
+    @app.route('/api/tags/suggest')
+    def suggest_tags():
+        """Return most frequent tags for autocompletion."""
+        web_query = WebQuery.from_request(flask.request.args)
+        state = flask.g.state
+        context = logic.make_suggest_response(maker=state.maker,
+                                              web_query=web_query,
+                                              index=state.index,
+                                              tag_trie=state.tag_trie)
+        return flask.jsonify(context)
+
     @app.route('/tags')
+    @cached()
     def tags():
         """Show available tags."""
         web_query = WebQuery.from_request(flask.request.args)
-        context = logic.make_tags_response(Session, web_query)
+        state = flask.g.state
+        context = logic.make_tags_response(state.maker, web_query,
+                                           state.statistics)
         return flask.render_template('tags.html', **context)
 
     @app.route('/feedback', methods=['GET', 'POST'])
@@ -131,3 +291,20 @@ def create_app(command: commands.RunserverCommand,
                                              filename, conditional=True)
 
     return app
+
+
+def fill_report(body: bytes, report: List[str]) -> bytes:
+    """Put lines of the search report in place of the marker."""
+    marker = constants.SEARCH_REPORT_MARKER.encode('utf-8')
+
+    if marker not in body:
+        return body
+
+    lines = ''.join(f'{html.escape(line)}<br>' for line in report)
+    return body.replace(marker, lines.encode('utf-8'))
+
+
+def fill_note(body: bytes, note: str) -> bytes:
+    """Put search duration note in place of the marker."""
+    marker = constants.SEARCH_NOTE_MARKER.encode('utf-8')
+    return body.replace(marker, html.escape(note).encode('utf-8'))
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""Production application launcher, ASGI variant.
+
+Single process handles many requests at once and keeps one copy
+of the search index:
+
+    uvicorn omoide.application.asgi:app --host=0.0.0.0 --port=8080
+"""
+from omoide.application.app import app as wsgi_app
+from omoide.application.class_asgi_adapter import AsgiAdapter
+
+app = AsgiAdapter(wsgi_app)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""ASGI interface for the WSGI application.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from omoide import constants
+
+__all__ = [
+    'AsgiAdapter',
+    'make_environ',
+]
+
+Message = Dict[str, Any]
+
+
+class AsgiAdapter:
+    """ASGI interface for the WSGI application.
+
+    Event loop only accepts connections and passes bytes around.
+    Every request is handled by the usual WSGI application in
+    a bounded pool of threads, so slow database reads do not stop
+    other requests and all of them share one copy of the index.
+    Requests above the pool size wait in the queue, not in the loop.
+    """
+
+    def __init__(self, wsgi_app: Callable,
+                 threads: int = constants.ASGI_THREADS) -> None:
+        """Initialize instance."""
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, threads={self.threads}>'
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Return pool for request handling, creating it if needed."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.threads,
+                thread_name_prefix='omoide-asgi',
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Stop all threads after their current requests."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __call__(self, scope: Message, receive: Callable,
+                       send: Callable) -> None:
+        """Handle single ASGI connection."""
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f'Unsupported connection: {scope["type"]!r}')
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        """Start and stop the pool together with the server."""
+        while True:
+            message = await receive()
+
+            if message['type'] == 'lifespan.startup':
+                _ = self.executor
+                await send({'type': 'lifespan.startup.complete'})
+
+            elif message['type'] == 'lifespan.shutdown':
+                self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope: Message, receive: Callable,
+                    send: Callable) -> None:
+        """Handle request in the pool, send response from the loop."""
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.extend(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+
+        loop = asyncio.get_running_loop()
+
+        def send_from_thread(message: Message) -> None:
+            """Pass message to the loop and wait until it is sent."""
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        environ = make_environ(scope, bytes(body))
+        await loop.run_in_executor(self.executor, self._respond,
+                                   environ, send_from_thread)
+
+    def _respond(self, environ: Dict[str, Any],
+                 send: Callable[[Message], None]) -> None:
+        """Run WSGI application and stream its response."""
+        response: List[Tuple[str, List[Tuple[str, str]]]] = []
+        started = False
+
+        def write(chunk: bytes) -> None:
+            """Send part of the body, starting response if needed."""
+            nonlocal started
+            if not started:
+                send(_make_start(*response[0]))
+                started = True
+            if chunk:
+                send({'type': 'http.response.body',
+                      'body': chunk, 'more_body': True})
+
+        def start_response(status: str, headers: List[Tuple[str, str]],
+                           exc_info: Optional[tuple] = None) -> Callable:
+            """Remember status and headers until the first chunk."""
+            if exc_info is not None and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response[:] = [(status, headers)]
+            return write
+
+        chunks = self.wsgi_app(environ, start_response)
+
+        try:
+            for chunk in chunks:
+                write(chunk)
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+        write(b'')
+        send({'type': 'http.response.body', 'body': b'',
+              'more_body': False})
+
+
+def make_environ(scope: Message, body: bytes) -> Dict[str, Any]:
+    """Convert ASGI connection scope into WSGI environ."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8')
+        .decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+
+        if name == 'CONTENT_LENGTH':
+            continue
+
+        key = f'HTTP_{name}'
+        if key in environ:
+            value = f'{environ[key]},{value}'
+        environ[key] = value
+
+    return environ
+
+
+def _make_start(status: str, headers: List[Tuple[str, str]]) -> Message:
+    """Return ASGI message that starts the response."""
+    return {
+        'type': 'http.response.start',
+        'status': int(status.split(' ', 1)[0]),
+        'headers': [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers
+        ],
+    }
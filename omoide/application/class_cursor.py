@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Position in the search result, given to the api clients.
+"""
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Optional
+
+import ujson
+
+__all__ = [
+    'Cursor',
+]
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in the search result, given to the api clients.
+
+    Specific search results are ordered by number, so next page
+    starts right after the number of the last returned record.
+    Random results are resumed by position with the same seed.
+    Uuid of the last record tells if the index has been changed
+    since the cursor was made.
+    """
+    number: int
+    uuid: str
+    position: int
+    seed: Optional[int] = None
+
+    def encode(self) -> str:
+        """Return opaque textual form."""
+        raw = ujson.dumps([self.number, self.uuid, self.position, self.seed])
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @classmethod
+    def decode(cls, text: str) -> 'Cursor':
+        """Restore cursor from textual form, raise ValueError if broken."""
+        try:
+            raw = base64.urlsafe_b64decode(text.encode('ascii'))
+            number, uuid, position, seed = ujson.loads(raw)
+        except (binascii.Error, UnicodeError, TypeError, ValueError) as exc:
+            raise ValueError(f'Malformed cursor: {text!r}') from exc
+
+        if not isinstance(number, int) or not isinstance(position, int) \
+                or not isinstance(uuid, str) \
+                or not isinstance(seed, (int, type(None))) \
+                or number < 0 or position < 0:
+            raise ValueError(f'Malformed cursor: {text!r}')
+
+        return cls(number=number, uuid=uuid, position=position, seed=seed)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""Uuids of metas around the current one in the group.
+"""
+from typing import Dict, List, Sequence, Union, overload
+
+__all__ = [
+    'GroupWindow',
+]
+
+
+class GroupWindow(Sequence[str]):
+    """Uuids of metas around the current one in the group.
+
+    Group can hold thousands of metas, but preview page shows
+    links only to the first, the last and the nearest ones.
+    Only they are loaded, keys are ordinals starting from 1.
+    """
+
+    def __init__(self, total: int, uuids: Dict[int, str]) -> None:
+        """Initialize instance."""
+        self._total = total
+        self._uuids = uuids
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return (f'<{type(self).__name__}, n={self._total}, '
+                f'loaded={len(self._uuids)}>')
+
+    def __len__(self) -> int:
+        """Return total amount of metas in the group."""
+        return self._total
+
+    @overload
+    def __getitem__(self, item: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, item: slice) -> List[str]:
+        ...
+
+    def __getitem__(self, item: Union[int, slice]
+                    ) -> Union[str, List[str]]:
+        """Return uuid by its position, raise KeyError if not loaded."""
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+
+        if item < 0:
+            item += self._total
+
+        if not 0 <= item < self._total:
+            raise IndexError(item)
+
+        return self._uuids[item + 1]
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""Bounded storage for rendered pages.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from omoide import constants
+
+__all__ = [
+    'PageCache',
+]
+
+
+class PageCache:
+    """Bounded storage for rendered pages.
+
+    Database does not change until the next freeze, so the same
+    route with the same query always gives the same page. Least
+    recently used pages get evicted when total size of the stored
+    pages exceeds the limit.
+    """
+
+    def __init__(self, max_bytes: int = constants.PAGE_CACHE_BYTES) -> None:
+        """Initialize instance."""
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.total_bytes = 0
+        self._storage: 'OrderedDict[Hashable, Tuple[bytes, str]]' = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return total amount of stored pages."""
+        return len(self._storage)
+
+    @staticmethod
+    def make_etag(version: str, key: Hashable) -> str:
+        """Return strong ETag of the page for given database version."""
+        return hashlib.sha1(
+            f'{version}:{key!r}'.encode('utf-8')
+        ).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        """Return stored body and mimetype or None."""
+        with self._lock:
+            value = self._storage.get(key)
+
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._storage.move_to_end(key)
+            return value
+
+    def revalidate(self) -> None:
+        """Count page, that client already has."""
+        with self._lock:
+            self.not_modified += 1
+
+    def put(self, key: Hashable, body: bytes, mimetype: str) -> None:
+        """Store page, evicting old ones if needed."""
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._storage.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old[0])
+
+            self._storage[key] = (body, mimetype)
+            self.total_bytes += len(body)
+
+            while self.total_bytes > self.max_bytes:
+                _, (evicted, _) = self._storage.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return current state for monitoring."""
+        total = self.hits + self.misses + self.not_modified
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'hit_ratio': round((self.hits + self.not_modified) / total, 4)
+            if total else 0.0,
+            'entries': len(self._storage),
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+        }
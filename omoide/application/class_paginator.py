@@ -3,7 +3,9 @@
 """Helper class created to handle pagination.
 """
 import math
-from typing import Sequence, Generator, Dict, Union, Any
+from typing import Sequence, Generator, Dict, Union, Any, Optional
+
+from omoide import constants
 
 
 class Paginator:
@@ -11,7 +13,8 @@ class Paginator:
     """
 
     def __init__(self, sequence: Sequence, current_page: int,
-                 items_per_page: int, pages_in_block: int = 15) -> None:
+                 items_per_page: int,
+                 pages_in_block: int = constants.PAGES_IN_BLOCK) -> None:
         """Initialize instance."""
         assert items_per_page
         self._sequence = sequence
@@ -22,6 +25,7 @@ class Paginator:
         self.num_pages = math.ceil(self.total_items / self.items_per_page)
 
         self._current_page = min(max(current_page, 1), self.num_pages)
+        self._page: Optional[list] = None
 
     def __len__(self) -> int:
         """Return total amount of items in the sequence."""
@@ -29,12 +33,19 @@ class Paginator:
 
     def __iter__(self):
         """Iterate over current page."""
-        stop = self.items_per_page * self._current_page
-        if self._current_page == 1:
-            start = 0
-        else:
-            start = stop - self.items_per_page
-        return iter(self._sequence[start:stop])
+        return iter(self.page)
+
+    @property
+    def page(self) -> list:
+        """Return items of the current page."""
+        if self._page is None:
+            stop = self.items_per_page * self._current_page
+            if self._current_page == 1:
+                start = 0
+            else:
+                start = stop - self.items_per_page
+            self._page = list(self._sequence[start:stop])
+        return self._page
 
     @property
     def has_previous(self) -> bool:
@@ -80,6 +91,7 @@ class Paginator:
         """Set current page number."""
         if 1 <= value <= self.num_pages:
             self._current_page = value
+            self._page = None
             return
 
         raise ValueError(
@@ -87,6 +99,16 @@ class Paginator:
             f'has only {self.num_pages} pages'
         )
 
+    def _get_value(self, page: int) -> Any:
+        """Return sequence element for the page.
+
+        Makes sense only when each page contains single element,
+        otherwise we are not fetching anything from the sequence.
+        """
+        if self.items_per_page == 1:
+            return self._sequence[page - 1]
+        return None
+
     @property
     def is_fitting(self) -> bool:
         """Return True if all pages can be displayed at once."""
@@ -113,7 +135,7 @@ class Paginator:
                 'is_dummy': False,
                 'is_current': i == self._current_page,
                 'number': i,
-                'value': self._sequence[i - 1],
+                'value': self._get_value(i),
             }
 
     def _iterate_long(self) \
@@ -129,7 +151,7 @@ class Paginator:
                     'is_dummy': False,
                     'is_current': x == self._current_page,
                     'number': x,
-                    'value': self._sequence[x - 1],
+                    'value': self._get_value(x),
                 }
                 for x in _gen
             ]
@@ -150,7 +172,7 @@ class Paginator:
             yield {'is_dummy': False,
                    'is_current': self.current_page == 1,
                    'number': 1,
-                   'value': self._sequence[0]}
+                   'value': self._get_value(1)}
 
             yield {'is_dummy': True,
                    'is_current': False,
@@ -168,4 +190,4 @@ class Paginator:
             yield {'is_dummy': False,
                    'is_current': self.current_page == self.num_pages,
                    'number': self.num_pages,
-                   'value': self._sequence[self.num_pages - 1]}
+                   'value': self._get_value(self.num_pages)}
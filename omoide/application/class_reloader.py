@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""Keeper of the current search state.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+from omoide import constants
+from omoide import search_engine
+from omoide.application.class_search_state import (
+    SearchState, Identity, get_identity,
+)
+
+__all__ = [
+    'Reloader',
+]
+
+
+class Reloader:
+    """Keeper of the current search state.
+
+    Watched files are compared by identity, not contents, so new
+    database is expected to be moved in place of the old one, not
+    written over it. New state is loaded in background thread and
+    replaces the old one with single assignment. Requests, that
+    already took the old state, finish with it. Index deltas
+    are merged afterwards in the same thread, merged snapshot
+    written to disk is loaded by the next reload.
+    """
+
+    def __init__(self, folder: str, current: SearchState,
+                 loader: Callable[[], SearchState],
+                 interval: float = constants.RELOAD_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize instance."""
+        self.folder = folder
+        self.interval = interval
+        self.generation = 1
+        self.failures = 0
+        self._loader = loader
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._identity = self.get_identity()
+        self._last_check = clock()
+        self.current = current
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, generation={self.generation}>'
+
+    def get_identity(self) -> Identity:
+        """Return identity of the watched files."""
+        return get_identity(self.folder)
+
+    def check(self) -> bool:
+        """Start reloading if files have changed, return True if started.
+
+        Files are checked not more often than once per interval.
+        """
+        now = self._clock()
+
+        if now - self._last_check < self.interval:
+            return False
+
+        self._last_check = now
+        identity = self.get_identity()
+
+        if identity == self._identity or identity[0] is None:
+            return False
+
+        return self._start(self._loader, identity)
+
+    def compact(self) -> bool:
+        """Merge deltas of the current state in background.
+
+        Return True if started.
+        """
+        return self._start(None, None)
+
+    def _start(self, loader: Optional[Callable[[], SearchState]],
+               identity: Optional[Identity]) -> bool:
+        """Run reloading in background, return True if started.
+
+        Nothing is started while another state is being loaded.
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+
+        self._thread = threading.Thread(target=self._reload,
+                                        args=(loader, identity),
+                                        name='omoide-reload',
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until current reloading is finished."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def after_fork(self) -> None:
+        """Drop everything, that belongs to the parent process.
+
+        Background thread and its lock do not survive fork, database
+        connections and shard workers of the parent must not be used.
+        """
+        self._lock = threading.Lock()
+        self._thread = None
+        # connections of the parent are left alone, worker opens its own,
+        # dispose(close=False) does the same but needs SQLAlchemy 1.4.33
+        engine = self.current.engine
+        engine.pool = engine.pool.recreate()
+
+        index = self.current.index
+        if index.shards is not None:
+            index.shards.detach()
+            index.shards = None
+            search_engine.Shards.attach(index, self.current.shards)
+
+    def _reload(self, loader: Optional[Callable[[], SearchState]],
+                identity: Optional[Identity]) -> None:
+        """Load new state, replace current one and then compact it."""
+        try:
+            if loader is not None:
+                self._replace(loader())
+
+            # delta is searched as it is until compaction is done
+            compacted = self.current.compact()
+            if compacted is not self.current:
+                self._replace(compacted)
+        except Exception as exc:  # pylint: disable=broad-except
+            # broken file is not loaded again until it gets replaced
+            self.failures += 1
+            print(f'Failed to reload search state because of: {exc}')
+        finally:
+            if identity is not None:
+                self._identity = identity
+            self._lock.release()
+
+    def _replace(self, state: SearchState) -> None:
+        """Make given state current."""
+        old = self.current
+        self.current = state
+        self.generation += 1
+
+        # connections in use are closed after their requests
+        if old.engine is not state.engine:
+            old.engine.dispose()
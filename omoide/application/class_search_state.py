@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""Everything, that is loaded from one database file.
+"""
+import hashlib
+import os
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from omoide import constants
+from omoide import search_engine
+from omoide.application import database
+from omoide.application.class_page_cache import PageCache
+from omoide.database import operations
+
+__all__ = [
+    'SearchState',
+    'Identity',
+    'get_identity',
+]
+
+# device, inode, modification time and size of every watched file
+Identity = Tuple[Optional[Tuple[int, int, int, int]], ...]
+
+
+def get_identity(folder: str) -> Identity:
+    """Return identity of the database files."""
+    identity: List[Optional[Tuple[int, int, int, int]]] = []
+    for filename in (constants.STATIC_DB_FILE_NAME,
+                     constants.INDEX_SNAPSHOT_FILE_NAME,
+                     constants.INDEX_DELTA_FILE_NAME):
+        try:
+            stat = os.stat(os.path.join(folder, filename))
+        except FileNotFoundError:
+            identity.append(None)
+        else:
+            identity.append((stat.st_dev, stat.st_ino,
+                             stat.st_mtime_ns, stat.st_size))
+    return tuple(identity)
+
+
+@dataclass(frozen=True)
+class SearchState:
+    """Everything, that is loaded from one database file.
+
+    Request takes the current state once and uses only it,
+    so it never mixes index of one database with another.
+    Version is the same in every worker, that loaded the same
+    files, so it is safe to use in ETags.
+    """
+    engine: Engine
+    maker: sessionmaker
+    index: search_engine.Index
+    tag_trie: search_engine.TagTrie
+    facets: search_engine.Facets
+    statistics: search_engine.StatisticsTable
+    query_builder: search_engine.QueryBuilder
+    search_cache: search_engine.SearchCache = field(
+        default_factory=search_engine.SearchCache
+    )
+    shards: int = 0
+    folder: str = ''
+    version: str = ''
+    page_cache: PageCache = field(default_factory=PageCache)
+
+    @classmethod
+    def load(cls, engine: Engine, folder: str,
+             shards: int = 0) -> 'SearchState':
+        """Load all search structures for the database."""
+        version = hashlib.sha1(
+            repr(get_identity(folder)).encode('utf-8')
+        ).hexdigest()[:16]
+        maker = sessionmaker(bind=engine)
+
+        with operations.session_scope(maker) as session:
+            index = database.load_index(session, folder)
+            statistics = database.load_statistics(session)
+
+        tag_trie = database.get_tag_trie(statistics, index)
+        facets = database.load_facets(folder, index)
+
+        # numbers will change after compaction, shards are started then
+        if not isinstance(index, search_engine.LayeredIndex):
+            search_engine.Shards.attach(index, shards)
+
+        ngram_index = search_engine.NgramIndex(index.by_tags,
+                                               index.synonyms)
+        query_builder = search_engine.QueryBuilder(
+            search_engine.Query,
+            resolver=ngram_index.resolve,
+        )
+
+        return cls(engine=engine,
+                   maker=maker,
+                   index=index,
+                   tag_trie=tag_trie,
+                   facets=facets,
+                   statistics=statistics,
+                   query_builder=query_builder,
+                   shards=shards,
+                   folder=folder,
+                   version=version)
+
+    def compact(self) -> 'SearchState':
+        """Return state with deltas merged into plain index.
+
+        Merged index is written as the new snapshot if possible,
+        then the same state is returned and every worker maps the new
+        file on the next reload. Otherwise deltas are merged in memory.
+        """
+        index = self.index
+        if not isinstance(index, search_engine.LayeredIndex):
+            return self
+
+        if self.folder and database.compact_index(self.folder):
+            return self
+
+        compacted = search_engine.Shards.attach(index.compact(),
+                                                self.shards)
+        return replace(self,
+                       index=compacted,
+                       facets=search_engine.Facets.from_index(compacted),
+                       search_cache=search_engine.SearchCache())
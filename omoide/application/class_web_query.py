@@ -3,7 +3,7 @@
 """Handler for browser queries (not user search).
 """
 
-from typing import Dict
+from typing import Dict, Tuple
 
 __all__ = [
     'WebQuery',
@@ -50,6 +50,10 @@ class WebQuery:
         cls = type(self)
         return cls({**self.kwargs, **kwargs})
 
+    def get_key(self) -> Tuple[Tuple[str, str], ...]:
+        """Return canonical form, order of parameters does not matter."""
+        return tuple(sorted(self.kwargs.items()))
+
     def get(self, key: str, default: str = '') -> str:
         """Return value of a parameter."""
         return self.kwargs.get(key, default)
@@ -1,14 +1,18 @@
 # -*- coding: utf-8 -*-
 """Database tools used specifically by the Application.
 """
-from collections import defaultdict
-from typing import Optional, Dict, Type, Union, Any, Set
+import os
+import weakref
+from typing import Optional, Dict, Type, Union, Tuple
 
+import sqlalchemy as sa
 import ujson
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from omoide import search_engine, constants
-from omoide.database import models
+from omoide.database import models, search_index
+from omoide.search_engine import snapshot
 
 
 def get_meta(session: Session, meta_uuid: str) -> Optional[models.Meta]:
@@ -17,58 +21,145 @@ def get_meta(session: Session, meta_uuid: str) -> Optional[models.Meta]:
         .where(models.Meta.uuid == meta_uuid).first()
 
 
-def get_index(session: Session) -> search_engine.Index:
-    """Load instance of Index from db."""
-    metas = list(session.query(models.IndexMetas).order_by('number').all())
-    all_metas = [
-        search_engine.ShallowMeta(x.meta_uuid, x.number, x.path_to_thumbnail)
-        for x in metas
-    ]
+def get_preview(session: Session, meta_uuid: str
+                ) -> Optional[Tuple[models.Meta, models.IndexPreview]]:
+    """Load meta with precomputed preview information.
 
-    by_tags = defaultdict(set)
-    for each in session.query(models.IndexTags).all():
-        by_tags[each.tag.lower()].add(each.uuid)
+    Return None if database was frozen without preview index.
+    """
+    if not has_preview_index(session):
+        return None
+
+    return session.query(models.Meta, models.IndexPreview) \
+        .join(models.IndexPreview,
+              models.IndexPreview.meta_uuid == models.Meta.uuid) \
+        .where(models.Meta.uuid == meta_uuid).first()
 
-    index = search_engine.Index(
-        all_metas=all_metas,
-        by_tags={
-            tag: frozenset(uuids)
-            for tag, uuids in by_tags.items()
-        },
-    )
 
-    return index
+def get_group_window(session: Session, preview: models.IndexPreview,
+                     radius: int) -> Dict[int, str]:
+    """Load uuids of the first, the last and the nearest metas in group."""
+    low = preview.ordinal - radius
+    high = preview.ordinal + radius
+    rows = session.query(models.IndexPreview.ordinal,
+                         models.IndexPreview.meta_uuid) \
+        .where(models.IndexPreview.group_uuid == preview.group_uuid) \
+        .where(models.IndexPreview.ordinal.between(low, high)
+               | models.IndexPreview.ordinal.in_([1, preview.total]))
+    return dict(rows.all())
 
 
-def get_statistic(session: Session,
-                  active_themes: Optional[Set[str]]
-                  ) -> search_engine.Statistics:
-    """Load statistics for given targets from db.
+def load_index(session: Session, folder: str) -> search_engine.Index:
+    """Map index snapshot if it exists, otherwise load Index from db.
 
-    Could get SQL injection here.
+    Delta written after the snapshot is put on top of it.
     """
-    if active_themes is None:
-        keys = ['stats__all_themes']
-    else:
-        keys = [f'stats__{x}' for x in active_themes]
+    path = os.path.join(folder, constants.INDEX_SNAPSHOT_FILE_NAME)
+    delta_path = os.path.join(folder, constants.INDEX_DELTA_FILE_NAME)
+
+    if os.path.exists(path):
+        try:
+            index = snapshot.load(path)
+
+            if os.path.exists(delta_path):
+                delta = snapshot.load_delta(delta_path)
+                if delta.base != snapshot.get_generation(path):
+                    raise snapshot.SnapshotError(
+                        f'Delta was made for another snapshot: {delta_path}'
+                    )
+                if delta:
+                    index = search_engine.LayeredIndex(index, delta)
+
+            return index
+        except snapshot.SnapshotError as exc:
+            print(f'Failed to load index snapshot because of: {exc}')
+
+    return search_index.get_index(session)
+
+
+def compact_index(folder: str) -> bool:
+    """Write index with merged delta as the new snapshot.
+
+    Return False if it cannot be written. Busy lock means that
+    another process is doing the same right now.
+    """
+    path = os.path.join(folder, constants.INDEX_SNAPSHOT_FILE_NAME)
+    delta_path = os.path.join(folder, constants.INDEX_DELTA_FILE_NAME)
+
+    try:
+        with snapshot.lock(path, blocking=False) as acquired:
+            if acquired:
+                snapshot.compact(path, delta_path)
+    except (OSError, snapshot.SnapshotError) as exc:
+        print(f'Failed to compact index snapshot because of: {exc}')
+        return False
+
+    return True
+
+
+def load_facets(folder: str,
+                index: search_engine.Index) -> search_engine.Facets:
+    """Map facets from index snapshot if possible, otherwise build them."""
+    path = os.path.join(folder, constants.INDEX_SNAPSHOT_FILE_NAME)
+
+    if os.path.exists(path):
+        try:
+            facets = snapshot.load_facets(path)
+            if len(facets.indptr) == len(index) + 1:
+                return facets
+            print('Index snapshot has facets for different index')
+        except snapshot.SnapshotError as exc:
+            print(f'Failed to load facets because of: {exc}')
+
+    return search_engine.Facets.from_index(index)
+
+
+def load_statistics(session: Session) -> search_engine.StatisticsTable:
+    """Load statistics of all themes from db at once."""
+    prefix = 'stats__'
+    everything = f'{prefix}{constants.ALL_THEMES}'
+    sources = {
+        helper.key[len(prefix):]: ujson.loads(helper.value)
+        for helper in session.query(models.Helper)
+        .where(models.Helper.key.startswith(prefix))
+        if helper.key != everything
+    }
+    return search_engine.StatisticsTable.from_dicts(sources)
+
+
+def get_tag_trie(statistics: search_engine.StatisticsTable,
+                 index: search_engine.Index) -> search_engine.TagTrie:
+    """Build autocompletion lookup for all searchable tags."""
+    known = statistics.get(None).tags
+    frequencies = {
+        tag: known.get(tag) or index.count(tag)
+        for tag in index.by_tags
+        if not constants.IDENTITY_TAG_PATTERN.match(tag)
+    }
+    return search_engine.TagTrie(frequencies, limit=constants.SUGGEST_LIMIT)
+
+
+# names and graph never change inside one database file, caches are
+# kept per engine, so the new file after reload gets empty ones
+_CACHES: 'weakref.WeakKeyDictionary[Engine, Dict[str, dict]]' = \
+    weakref.WeakKeyDictionary()
+
 
-    statistic = search_engine.Statistics()
-    for key in keys:
-        item = session.query(models.Helper) \
-            .where(models.Helper.key == key).first()
+def _get_cache(session: Session, name: str) -> dict:
+    """Return cache for the database file, used by this session."""
+    caches = _CACHES.setdefault(session.get_bind(), {})
+    return caches.setdefault(name, {})
 
-        if item is not None:
-            local_statistic = search_engine.Statistics.from_dict(
-                source=ujson.loads(item.value)
-            )
-            statistic += local_statistic
 
-    return statistic
+def has_preview_index(session: Session) -> bool:
+    """Return True if database has precomputed preview information."""
+    cache = _get_cache(session, 'tables')
+    name = models.IndexPreview.__tablename__
 
+    if name not in cache:
+        cache[name] = sa.inspect(session.get_bind()).has_table(name)
 
-_THEME_NAMES_CACHE: Dict[str, str] = {}
-_GROUP_NAMES_CACHE: Dict[str, str] = {}
-_GRAPH_CACHE: Optional[Dict[str, Any]] = None
+    return cache[name]
 
 
 def get_theme_name(session: Session, theme_uuid: str) -> str:
@@ -76,13 +167,13 @@ def get_theme_name(session: Session, theme_uuid: str) -> str:
     if theme_uuid == constants.ALL_THEMES:
         return ''
     return _common_getter(session, theme_uuid,
-                          _THEME_NAMES_CACHE, models.Theme)
+                          _get_cache(session, 'theme_names'), models.Theme)
 
 
 def get_group_name(session: Session, group_uuid: str) -> str:
     """Return cached or find group name by uuid."""
     return _common_getter(session, group_uuid,
-                          _GROUP_NAMES_CACHE, models.Group)
+                          _get_cache(session, 'group_names'), models.Group)
 
 
 def _common_getter(session: Session, uuid: str, collection: Dict[str, str],
@@ -106,10 +197,11 @@ def _common_getter(session: Session, uuid: str, collection: Dict[str, str],
 
 def get_graph(session: Session) -> dict:
     """Load navigation graph from db."""
-    global _GRAPH_CACHE
+    cache = _get_cache(session, 'graph')
+    graph = cache.get('graph')
 
-    if _GRAPH_CACHE is not None:
-        return _GRAPH_CACHE
+    if graph is not None:
+        return graph
 
     raw_graph = session.query(models.Helper) \
         .where(models.Helper.key == 'graph').first()
@@ -119,6 +211,6 @@ def get_graph(session: Session) -> dict:
     else:
         graph = {}
 
-    _GRAPH_CACHE = graph
+    cache['graph'] = graph
 
     return graph
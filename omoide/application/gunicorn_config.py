@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""Gunicorn settings for the workers, that share preloaded index.
+
+Usage:
+    gunicorn --config=python:omoide.application.gunicorn_config \
+        --workers=4 --bind :8080 omoide.application.app:app
+"""
+from omoide.application import preload
+
+# application is created in the master before workers are forked
+preload_app = True  # pylint: disable=invalid-name
+
+# config is imported before the application
+preload.before_load()
+
+
+def pre_fork(server, worker):  # pylint: disable=unused-argument
+    """Prepare preloaded application for sharing."""
+    preload.before_fork(server.app.wsgi())
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Prepare preloaded application for the worker."""
+    preload.after_fork(server.app.wsgi())
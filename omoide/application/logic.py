@@ -3,8 +3,12 @@
 """
 import datetime
 import json
+import random
 import time
-from typing import Dict, Any, Callable, Optional, Set, List, Tuple
+from typing import (
+    Dict, Any, Callable, Optional, Set, List, Tuple, Iterator, Sequence,
+    Union,
+)
 
 import ujson
 from sqlalchemy.orm import sessionmaker, Session
@@ -13,20 +17,29 @@ from omoide import constants
 from omoide import search_engine
 from omoide import utils
 from omoide.application import database as app_database
+from omoide.application.class_cursor import Cursor
+from omoide.application.class_group_window import GroupWindow
 from omoide.application.class_paginator import Paginator
 from omoide.application.class_web_query import WebQuery
 from omoide.database import operations, models
+from omoide.search_engine import bitmaps
 from omoide.search_engine import find
 
-_GRAPH_CACHE: Optional[Dict[str, Any]] = None
+# records found by query or taken in random order
+Found = Union[search_engine.SearchResult, search_engine.RandomOrder]
 
 
 # pylint: disable=too-many-locals
 def make_search_response(maker: sessionmaker, web_query: WebQuery,
                          query_builder: search_engine.QueryBuilder,
-                         index: search_engine.Index) -> Dict[str, Any]:
+                         index: search_engine.Index,
+                         search_cache: search_engine.SearchCache,
+                         facets: Optional[search_engine.Facets] = None,
+                         timings: Optional[search_engine.Histograms] = None,
+                         ) -> Dict[str, Any]:
     """Create context for search request."""
     start = time.perf_counter()
+    trace = search_engine.Trace(timings)
 
     with operations.session_scope(maker) as session:
         graph = app_database.get_graph(session)
@@ -38,22 +51,13 @@ def make_search_response(maker: sessionmaker, web_query: WebQuery,
     current_page = int(web_query.get('page', '1'))
     search_query = query_builder.from_query(user_query)
 
-    if not active_themes and active_themes is not None:
-        uuids = []
-        search_report = ['No themes to search on.']
-    else:
-        if search_query:
-            uuids, search_report = find.specific_records(
-                query=search_query,
-                index=index,
-                active_themes=active_themes or set(),
-            )
-        else:
-            uuids, search_report = find.random_records(
-                index=index,
-                active_themes=active_themes,
-                amount=constants.ITEMS_PER_PAGE,
-            )
+    uuids = _find_records(web_query, search_query, index, active_themes,
+                          search_cache, trace)
+
+    refinements = []
+    if facets is not None \
+            and isinstance(uuids, search_engine.SearchResult) and uuids:
+        refinements = facets.top(index, uuids)
 
     paginator = Paginator(
         sequence=uuids,
@@ -61,6 +65,9 @@ def make_search_response(maker: sessionmaker, web_query: WebQuery,
         items_per_page=constants.ITEMS_PER_PAGE,
     )
 
+    with trace.span('paginate') as span:
+        span.total = len(paginator.page)
+
     duration = time.perf_counter() - start
     note = get_note_for_search(len(paginator), duration)
 
@@ -69,13 +76,172 @@ def make_search_response(maker: sessionmaker, web_query: WebQuery,
         'user_query': web_query.get('q'),
         'search_query': search_query,
         'paginator': paginator,
-        'search_report': search_report,
+        'search_report': trace.report(),
         'note': note,
         'placeholder': placeholder,
+        'refinements': refinements,
     }
     return context
 
 
+def _find_records(web_query: WebQuery,
+                  search_query: search_engine.Query,
+                  index: search_engine.Index,
+                  active_themes: Optional[Set[str]],
+                  search_cache: search_engine.SearchCache,
+                  trace: search_engine.Trace) -> Found:
+    """Return found records, random ones for empty query."""
+    if not active_themes and active_themes is not None:
+        trace.note('No themes to search on.')
+        return search_engine.SearchResult.from_bitmap(index, 0)
+
+    if search_query:
+        uuids, _ = find.specific_records(
+            query=search_query,
+            index=index,
+            active_themes=active_themes or set(),
+            cache=search_cache,
+            trace=trace,
+        )
+        return uuids
+
+    seed = get_random_seed(web_query)
+    order, _ = find.random_records(
+        index=index,
+        active_themes=active_themes,
+        seed=seed,
+        trace=trace,
+    )
+    return order
+
+
+def make_api_search_response(maker: sessionmaker, web_query: WebQuery,
+                             query_builder: search_engine.QueryBuilder,
+                             index: search_engine.Index,
+                             search_cache: search_engine.SearchCache,
+                             timings: Optional[search_engine.Histograms]
+                             = None) -> Dict[str, Any]:
+    """Create json compatible response for the api search request.
+
+    Raises ValueError if given cursor is broken or outdated.
+    """
+    trace = search_engine.Trace(timings)
+    cursor = None
+
+    if web_query.get('cursor'):
+        cursor = Cursor.decode(web_query.get('cursor'))
+        if cursor.seed is not None:
+            web_query['seed'] = str(cursor.seed)
+
+    raw_limit = web_query.get('limit')
+    limit = int(raw_limit) if raw_limit.isdigit() \
+        else constants.ITEMS_PER_PAGE
+    limit = max(min(limit, constants.API_MAX_LIMIT), 1)
+
+    search_query, uuids = _api_find_records(maker, web_query, query_builder,
+                                            index, search_cache, trace)
+
+    with trace.span('paginate') as span:
+        numbers = _resume(index, uuids, cursor, limit)
+        span.total = len(numbers)
+
+    metas = index.resolve(numbers)
+    position = (cursor.position if cursor else 0) + len(metas)
+
+    next_cursor = None
+    if metas and position < len(uuids):
+        next_cursor = Cursor(
+            number=metas[-1].number,
+            uuid=metas[-1].uuid,
+            position=position,
+            seed=None if search_query else int(web_query.get('seed')),
+        ).encode()
+
+    return {
+        'query': web_query.get('q'),
+        'total': len(uuids),
+        'items': [meta.as_dict() for meta in metas],
+        'cursor': next_cursor,
+        'search_report': trace.report(),
+    }
+
+
+def make_api_export_response(maker: sessionmaker, web_query: WebQuery,
+                             query_builder: search_engine.QueryBuilder,
+                             index: search_engine.Index,
+                             search_cache: search_engine.SearchCache,
+                             ) -> Iterator[str]:
+    """Find records and return generator of newline delimited json."""
+    trace = search_engine.Trace()
+    _, uuids = _api_find_records(maker, web_query, query_builder,
+                                 index, search_cache, trace)
+    return iterate_export(index, uuids)
+
+
+def iterate_export(index: search_engine.Index, uuids: Found,
+                   chunk_size: int = constants.EXPORT_CHUNK_SIZE
+                   ) -> Iterator[str]:
+    """Yield found records as json lines, one chunk at a time."""
+    cursor = None
+
+    while True:
+        numbers = _resume(index, uuids, cursor, chunk_size)
+
+        if not numbers:
+            break
+
+        metas = index.resolve(numbers)
+        yield ''.join(dumps(meta.as_dict()) + '\n' for meta in metas)
+
+        cursor = Cursor(number=metas[-1].number,
+                        uuid=metas[-1].uuid,
+                        position=(cursor.position if cursor else 0)
+                        + len(metas))
+
+
+def _api_find_records(maker: sessionmaker, web_query: WebQuery,
+                      query_builder: search_engine.QueryBuilder,
+                      index: search_engine.Index,
+                      search_cache: search_engine.SearchCache,
+                      trace: search_engine.Trace
+                      ) -> Tuple[search_engine.Query, Found]:
+    """Parse user query and return found records."""
+    with operations.session_scope(maker) as session:
+        graph = app_database.get_graph(session)
+        unsafe_themes = web_query.get('active_themes', constants.ALL_THEMES)
+        active_themes = extract_active_themes(unsafe_themes, graph)
+
+    search_query = query_builder.from_query(web_query.get('q'))
+    uuids = _find_records(web_query, search_query, index, active_themes,
+                          search_cache, trace)
+    return search_query, uuids
+
+
+def _resume(index: search_engine.Index, uuids: Found,
+            cursor: Optional[Cursor], limit: int) -> List[int]:
+    """Return numbers of records that go after the cursor."""
+    if cursor is None:
+        return uuids.numbers(slice(0, limit)) if uuids else []
+
+    if cursor.number >= len(index) \
+            or index.all_metas[cursor.number].uuid != cursor.uuid:
+        raise ValueError('Cursor is outdated, search index has been changed')
+
+    if isinstance(uuids, search_engine.SearchResult):
+        return uuids.after(cursor.number, limit)
+
+    if not uuids:
+        return []
+
+    return uuids.numbers(slice(cursor.position, cursor.position + limit))
+
+
+def dumps(value: Any) -> str:
+    """Return compact json text."""
+    return ujson.dumps(value, ensure_ascii=False,
+                       escape_forward_slashes=False)
+
+
 def make_navigation_response(maker: sessionmaker, web_query: WebQuery,
                              ) -> Dict[str, Any]:
     """Create context for navigation request (GET)."""
@@ -105,18 +271,40 @@ def make_preview_response(maker: sessionmaker,
                           uuid: str,
                           abort_callback: Callable) -> Dict[str, Any]:
     """Create context for preview request."""
+    uuids: Sequence[str]
+
     with operations.session_scope(maker) as session:
-        meta = app_database.get_meta(session, uuid) or abort_callback()
-        uuids = _get_group_uuids(meta)
-        _next, _previous, paginator = _build_paginator(uuids, meta.uuid)
-
-        all_tags = {
-            *[x.value for x in meta.group.theme.tags],
-            *[x.value for x in meta.group.tags],
-            *[x.value for x in meta.tags],
-        }
+        found = app_database.get_preview(session, uuid)
+
+        if found is None:
+            # database was frozen without preview index
+            meta = app_database.get_meta(session, uuid) or abort_callback()
+            uuids = _get_group_uuids(meta)
+            current, _next, _previous = _find_neighbours(uuids, meta.uuid)
+            tags = sorted({
+                *[x.value for x in meta.group.theme.tags],
+                *[x.value for x in meta.group.tags],
+                *[x.value for x in meta.tags],
+            })
+        else:
+            meta, preview = found
+            uuids = GroupWindow(
+                total=preview.total,
+                uuids=app_database.get_group_window(session, preview,
+                                                    constants.PAGES_IN_BLOCK)
+                if preview.total else {},
+            )
+            current = preview.ordinal
+            _next = preview.next_uuid
+            _previous = preview.previous_uuid
+            tags = ujson.loads(preview.tags)
+
         session.expunge_all()
 
+    paginator = Paginator(uuids,
+                          current_page=current,
+                          items_per_page=1)
+
     context = {
         'web_query': web_query,
         'user_query': web_query.get('q'),
@@ -124,7 +312,7 @@ def make_preview_response(maker: sessionmaker,
         'next': _next,
         'previous': _previous,
         'meta': meta,
-        'tags': sorted(all_tags),
+        'tags': tags,
     }
     return context
 
@@ -137,39 +325,28 @@ def _get_group_uuids(meta: models.Meta) -> List[str]:
     return [x.uuid for x in meta.group.metas]
 
 
-def _build_paginator(group_uuids: List[str], current_uuid: str) \
-        -> Tuple[Optional[str], Optional[str], Paginator]:
-    """Create Paginator instance that will help browsing group."""
-    current_page = 0
-    _next = None
-    _previous = None
+def _find_neighbours(group_uuids: List[str], current_uuid: str
+                     ) -> Tuple[int, Optional[str], Optional[str]]:
+    """Return ordinal of the meta in group, next and previous uuids."""
     for i, each_uuid in enumerate(group_uuids, start=1):
         if each_uuid == current_uuid:
-            current_page = i
+            _next = group_uuids[i] if i < len(group_uuids) else None
+            _previous = group_uuids[i - 2] if i > 1 else None
+            return i, _next, _previous
 
-            if i > 1:
-                _previous = group_uuids[i - 2]
+    return 0, None, None
 
-            if i < len(group_uuids):
-                _next = group_uuids[i]
 
-            break
-
-    paginator = Paginator(group_uuids,
-                          current_page=current_page,
-                          items_per_page=1)
-
-    return _next, _previous, paginator
-
-
-def make_tags_response(maker: sessionmaker,
-                       web_query: WebQuery) -> Dict[str, Any]:
+def make_tags_response(maker: sessionmaker, web_query: WebQuery,
+                       statistics: search_engine.StatisticsTable
+                       ) -> Dict[str, Any]:
     """Create context for tags request."""
     with operations.session_scope(maker) as session:
         graph = app_database.get_graph(session)
         unsafe_themes = web_query.get('active_themes', constants.ALL_THEMES)
         active_themes = extract_active_themes(unsafe_themes, graph)
-        statistic = app_database.get_statistic(session, active_themes)
+
+    statistic = statistics.get(active_themes)
 
     context = {
         'web_query': web_query,
@@ -179,6 +356,59 @@ def make_tags_response(maker: sessionmaker,
     return context
 
 
+def make_suggest_response(maker: sessionmaker, web_query: WebQuery,
+                          index: search_engine.Index,
+                          tag_trie: search_engine.TagTrie
+                          ) -> Dict[str, Any]:
+    """Create context for tag autocompletion request."""
+    with operations.session_scope(maker) as session:
+        graph = app_database.get_graph(session)
+        unsafe_themes = web_query.get('active_themes', constants.ALL_THEMES)
+        active_themes = extract_active_themes(unsafe_themes, graph)
+
+    counter = None
+    if active_themes is not None:
+        counter = _make_theme_counter(index, active_themes)
+
+    prefix = web_query.get('prefix')[:constants.MAX_LEN]
+    suggestions = tag_trie.suggest(prefix, counter=counter)
+
+    return {
+        'prefix': prefix,
+        'suggestions': [
+            {'tag': tag, 'count': count}
+            for tag, count in suggestions
+        ],
+    }
+
+
+def _make_theme_counter(index: search_engine.Index,
+                        active_themes: Set[str]) -> Callable[[str], int]:
+    """Return function, that counts metas with tag in active themes."""
+    mask = index.get_themes_mask(active_themes)
+
+    def counter(tag: str) -> int:
+        """Return amount of metas with tag in active themes."""
+        return bitmaps.count(index.get_by_tag(tag) & mask)
+
+    return counter
+
+
+def get_random_seed(web_query: WebQuery) -> int:
+    """Return seed of the random ordering, creating new one if needed.
+
+    Seed is stored in the query, so all pages
+    share the same random ordering.
+    """
+    seed = web_query.get('seed')
+
+    if not seed.isdigit():
+        seed = str(random.getrandbits(constants.RANDOM_SEED_BITS))
+        web_query['seed'] = seed
+
+    return int(seed)
+
+
 def get_note_for_search(total: int, duration: float) -> str:
     """Return description of search duration."""
     total = utils.sep_digits(total)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Sharing of the loaded application between forked workers.
+
+Application is created once in the master process and workers
+get it by fork, so memory pages of the index are shared until
+somebody writes into them. Postings, metas and facets are kept
+in arrays and memory-mapped buffers, that have no reference counts
+inside, but every container object has a header, that cyclic garbage
+collector writes into during full collection. Such objects are frozen
+right before fork, collector of the worker never visits them.
+"""
+import gc
+
+import flask
+
+from omoide import constants
+from omoide.application.class_reloader import Reloader
+
+__all__ = [
+    'get_reloader',
+    'before_load',
+    'before_fork',
+    'after_fork',
+]
+
+
+def get_reloader(app: flask.Flask) -> Reloader:
+    """Return keeper of the search state for the application."""
+    return app.extensions[constants.RELOADER_EXTENSION]
+
+
+def before_load() -> None:
+    """Stop collecting garbage while the index is being loaded.
+
+    Collections during loading only move long living objects around
+    generations and leave holes in the pages, that are shared later.
+    """
+    gc.disable()
+
+
+def before_fork(app: flask.Flask) -> None:
+    """Finish background work and freeze all existing objects."""
+    get_reloader(app).wait()
+    gc.collect()
+    gc.freeze()
+
+
+def after_fork(app: flask.Flask) -> None:
+    """Make application usable in the worker process."""
+    get_reloader(app).after_fork()
+    gc.enable()
@@ -131,3 +131,34 @@ function explainSearchResults() {
 //     document.body.removeChild(input);
 //     return result;
 // }
+
+function suggestTags(element) {
+    // show most frequent tags, that start with last typed word
+    let parts = element.value.split(/([+|-])/)
+    let prefix = parts.pop().trimStart()
+    let head = parts.join('')
+
+    let list = document.getElementById('tag_suggestions')
+    if (!list || prefix.length === 0) {
+        return
+    }
+
+    let searchParams = new URLSearchParams(window.location.search);
+    let params = new URLSearchParams({prefix: prefix})
+    if (searchParams.has('active_themes')) {
+        params.set('active_themes', searchParams.get('active_themes'))
+    }
+
+    fetch('/api/tags/suggest?' + params.toString())
+        .then(response => response.json())
+        .then(data => {
+            list.innerHTML = ''
+            data.suggestions.forEach(each => {
+                let option = document.createElement('option')
+                option.value = (head ? head + ' ' : '') + each.tag
+                option.label = each.tag + ' (' + each.count + ')'
+                list.appendChild(option)
+            })
+        })
+        .catch(error => console.log('Failed to get suggestions: ' + error))
+}
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the search engine on synthetic data.
+"""
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the search engine.
+
+Possible call variants:
+
+    To measure on one hundred thousands metas:
+        python -m omoide.benchmarks --metas=100000 --output=new.json
+
+    To see how search scales with processor cores:
+        python -m omoide.benchmarks --metas=1000000 --shards=8
+
+    To compare with previous measurements:
+        python -m omoide.benchmarks --output=new.json --compare=old.json
+"""
+import json
+
+import click
+
+from omoide.benchmarks import runner
+
+
+@click.command()
+@click.option('--metas', default=100_000, help='Amount of metas')
+@click.option('--tags', default=10_000, help='Amount of unique tags')
+@click.option('--themes', default=10, help='Amount of themes')
+@click.option('--queries', default=1_000, help='Amount of search requests')
+@click.option('--tags-per-meta', default=8, help='Tags of every meta')
+@click.option('--exponent', default=1.0,
+              help='Exponent of Zipf law for tag frequencies')
+@click.option('--seed', default=0, help='Seed for corpus and requests')
+@click.option('--shards', default=0,
+              help='Also measure search on 2, 4, ... up to this many shards')
+@click.option('--output', default='', help='Where to save json results')
+@click.option('--compare', 'previous', default='',
+              help='Json results to compare with')
+def main(output: str, previous: str, **kwargs) -> None:
+    """Measure search engine on synthetic data."""
+    results = runner.run(**kwargs)
+    click.echo(json.dumps(results, indent=4))
+
+    if output:
+        runner.save(output, results)
+
+    if previous:
+        with open(previous, mode='r', encoding='utf-8') as file:
+            old = json.load(file)
+        for line in runner.compare(old, results):
+            click.echo(line)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""Synthetic collection of metas for benchmarks.
+"""
+import random
+import uuid as uuid_module
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, List, Set
+
+from omoide.search_engine import Column, Index, ShallowMeta, Statistics
+
+__all__ = [
+    'Corpus',
+]
+
+# syllables for readable tags, typos in them look like real ones
+_SYLLABLES = [
+    consonant + vowel
+    for consonant in 'bdfgklmnprstvz'
+    for vowel in 'aeiou'
+]
+
+
+def _make_uuid(generator: random.Random) -> str:
+    """Return reproducible uuid4."""
+    return str(uuid_module.UUID(int=generator.getrandbits(128), version=4))
+
+
+def _make_words(generator: random.Random, total: int) -> List[str]:
+    """Return unique readable words."""
+    words: List[str] = []
+    seen: Set[str] = set()
+
+    while len(words) < total:
+        length = 2 + len(words) % 3
+        word = ''.join(generator.choice(_SYLLABLES) for _ in range(length))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+
+    return words
+
+
+class Corpus:
+    """Synthetic collection of metas for benchmarks.
+
+    Tag frequencies follow Zipf law: tag with rank R is used
+    about R ** exponent times less often than the most popular
+    one. Every meta belongs to a single theme, theme uuid is
+    a tag of the meta, same as in the real database.
+    """
+
+    def __init__(self, all_metas: List[ShallowMeta],
+                 by_tags: Dict[str, List[int]], words: List[str],
+                 themes: List[str], columns: Dict[str, Column],
+                 statistics: Dict[str, Statistics], seed: int) -> None:
+        """Initialize instance."""
+        self.all_metas = all_metas
+        self.by_tags = by_tags
+        self.words = words
+        self.themes = themes
+        self.columns = columns
+        self.statistics = statistics
+        self.seed = seed
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return (f'<{type(self).__name__}, metas={len(self.all_metas)}, '
+                f'tags={len(self.words)}, themes={len(self.themes)}>')
+
+    @classmethod
+    def generate(cls, metas: int, tags: int, themes: int,
+                 tags_per_meta: int = 8, exponent: float = 1.0,
+                 seed: int = 0) -> 'Corpus':
+        """Create random corpus, same arguments give same corpus."""
+        generator = random.Random(seed)
+        words = _make_words(generator, tags)
+        theme_uuids = [f't_{_make_uuid(generator)}' for _ in range(themes)]
+        cum_weights = list(accumulate(
+            1 / (rank + 1) ** exponent for rank in range(tags)
+        ))
+
+        all_metas = []
+        by_tags: Dict[str, List[int]] = {}
+        counters: Dict[str, Counter] = {x: Counter() for x in theme_uuids}
+        sizes = []
+        dates = []
+
+        for number in range(metas):
+            meta_uuid = _make_uuid(generator)
+            theme = theme_uuids[number * themes // metas]
+            all_metas.append(ShallowMeta(
+                uuid=f'm_{meta_uuid}',
+                number=number,
+                path_to_thumbnail=f'/thumbnails/{theme}/m_{meta_uuid}.jpg',
+            ))
+
+            chosen = {
+                words[rank]
+                for rank in generator.choices(range(tags),
+                                              cum_weights=cum_weights,
+                                              k=tags_per_meta)
+            }
+            for tag in (*chosen, theme):
+                by_tags.setdefault(tag, []).append(number)
+
+            counters[theme].update(chosen)
+            sizes.append(int(generator.lognormvariate(14, 1.5)))
+            year = 2000 + generator.randrange(22)
+            dates.append(year * 10000 + generator.randrange(1, 13) * 100
+                         + generator.randrange(1, 29))
+
+        statistics = {
+            theme: Statistics(total_items=len(by_tags.get(theme, ())),
+                              tags=dict(counter))
+            for theme, counter in counters.items()
+        }
+
+        return cls(
+            all_metas=all_metas,
+            by_tags=by_tags,
+            words=words,
+            themes=theme_uuids,
+            columns={
+                'size': Column.from_values('Q', sizes),
+                'date': Column.from_values('I', dates),
+            },
+            statistics=statistics,
+            seed=seed,
+        )
+
+    def build_index(self) -> Index:
+        """Create search index for the corpus."""
+        return Index(all_metas=self.all_metas,
+                     by_tags=self.by_tags,
+                     columns=self.columns)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""Synthetic user requests for benchmarks.
+"""
+import random
+from itertools import accumulate
+from typing import Dict, List, Optional, Set, Tuple
+
+from omoide.benchmarks.class_corpus import Corpus
+
+__all__ = [
+    'Workload',
+    'KINDS',
+]
+
+# kind of the request -> its share in the workload
+KINDS = {
+    'single': 0.25,
+    'and': 0.2,
+    'or': 0.15,
+    'not': 0.1,
+    'group': 0.1,
+    'typo': 0.1,
+    'condition': 0.1,
+}
+
+
+class Workload:
+    """Synthetic user requests for benchmarks.
+
+    Every request is a query text (empty for random browsing)
+    with set of active themes (None means all of them). Words
+    are chosen with the same Zipf law as in the corpus, popular
+    tags get requested more often.
+    """
+
+    def __init__(self, requests: List[Tuple[str, str, Optional[Set[str]]]]
+                 ) -> None:
+        """Initialize instance."""
+        self.requests = requests
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, n={len(self.requests)}>'
+
+    def __len__(self) -> int:
+        """Return total amount of requests."""
+        return len(self.requests)
+
+    def by_kind(self) -> Dict[str, List[Tuple[str, Optional[Set[str]]]]]:
+        """Return requests grouped by their kind."""
+        result: Dict[str, List[Tuple[str, Optional[Set[str]]]]] = {}
+        for kind, text, themes in self.requests:
+            result.setdefault(kind, []).append((text, themes))
+        return result
+
+    @classmethod
+    def generate(cls, corpus: Corpus, total: int,
+                 themes_share: float = 0.3, exponent: float = 1.0,
+                 seed: int = 0) -> 'Workload':
+        """Create random requests, same arguments give same requests."""
+        generator = random.Random(seed)
+        cum_weights = list(accumulate(
+            1 / (rank + 1) ** exponent for rank in range(len(corpus.words))
+        ))
+
+        def word() -> str:
+            """Return random word."""
+            return generator.choices(corpus.words, cum_weights=cum_weights)[0]
+
+        def typo() -> str:
+            """Return random word with one wrong letter."""
+            letters = list(word())
+            position = generator.randrange(len(letters))
+            letters[position] = generator.choice('abcdefghijklmnopqrstuvwxyz')
+            return ''.join(letters)
+
+        makers = {
+            'single': lambda: word(),
+            'and': lambda: f'{word()} + {word()} + {word()}',
+            'or': lambda: f'{word()} | {word()}',
+            'not': lambda: f'{word()} - {word()}',
+            'group': lambda: f'( {word()} | {word()} ) + ( {word()} '
+                             f'| {word()} ) - {word()}',
+            'typo': lambda: f'{typo()} + {word()}',
+            'condition': lambda: f'{word()} + size>1mb + date>2010',
+        }
+
+        kinds = list(KINDS)
+        weights = [KINDS[kind] for kind in kinds]
+        requests = []
+
+        for _ in range(total):
+            themes = None
+            if corpus.themes and generator.random() < themes_share:
+                amount = generator.randint(1, len(corpus.themes))
+                themes = set(generator.sample(corpus.themes, amount))
+
+            kind = generator.choices(kinds, weights=weights)[0]
+            requests.append((kind, makers[kind](), themes))
+
+            # every request also opens random page with same themes
+            requests.append(('random', '', themes))
+
+        return cls(requests)
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""Measuring of the search engine on synthetic data.
+"""
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+from omoide import constants
+from omoide import search_engine
+from omoide.benchmarks.class_corpus import Corpus
+from omoide.benchmarks.class_workload import Workload
+from omoide.search_engine import find
+
+__all__ = [
+    'run',
+    'summarize',
+    'get_rss',
+    'save',
+    'compare',
+]
+
+
+def get_rss() -> int:
+    """Return current resident memory of the process in bytes."""
+    try:
+        with open('/proc/self/statm', mode='r', encoding='utf-8') as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # peak value is better than nothing, it is in kilobytes on linux
+        # and in bytes on mac
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _get_commit() -> str:
+    """Return current git commit if possible."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    """Return latency quantiles (in milliseconds) and throughput."""
+    if not durations:
+        return {'count': 0}
+
+    ordered = sorted(durations)
+    total = sum(ordered)
+
+    def quantile(fraction: float) -> float:
+        """Return value for given fraction, nearest rank."""
+        position = min(int(fraction * len(ordered)), len(ordered) - 1)
+        return round(ordered[position] * 1000, 4)
+
+    return {
+        'count': len(ordered),
+        'p50_ms': quantile(0.5),
+        'p95_ms': quantile(0.95),
+        'p99_ms': quantile(0.99),
+        'max_ms': round(ordered[-1] * 1000, 4),
+        'mean_ms': round(total / len(ordered) * 1000, 4),
+        'per_second': round(len(ordered) / total, 1) if total else 0.0,
+    }
+
+
+def _measure(function: Callable[..., Any],
+             arguments: Iterable[tuple]) -> List[float]:
+    """Return duration of every call."""
+    durations = []
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run(metas: int, tags: int, themes: int, queries: int,
+        tags_per_meta: int = 8, exponent: float = 1.0, seed: int = 0,
+        shards: int = 0, log: Callable[[str], None] = print
+        ) -> Dict[str, Any]:
+    """Generate corpus and workload, return measurements."""
+    config = {
+        'metas': metas, 'tags': tags, 'themes': themes, 'queries': queries,
+        'tags_per_meta': tags_per_meta, 'exponent': exponent, 'seed': seed,
+        'shards': shards, 'cpu_count': os.cpu_count(),
+    }
+    results: Dict[str, Any] = {
+        'commit': _get_commit(),
+        'python': platform.python_version(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': config,
+        'build': {},
+        'operations': {},
+    }
+
+    log(f'Generating corpus: {metas} metas, {tags} tags, {themes} themes')
+    corpus = Corpus.generate(metas, tags, themes, tags_per_meta,
+                             exponent, seed)
+    workload = Workload.generate(corpus, queries, exponent=exponent,
+                                 seed=seed)
+
+    gc.collect()
+    rss_before = get_rss()
+    start = time.perf_counter()
+    index = corpus.build_index()
+    results['build']['index_sec'] = round(time.perf_counter() - start, 4)
+    gc.collect()
+    results['build']['index_rss_bytes'] = get_rss() - rss_before
+
+    start = time.perf_counter()
+    ngram_index = search_engine.NgramIndex(index.by_tags, index.synonyms)
+    query_builder = search_engine.QueryBuilder(search_engine.Query,
+                                               resolver=ngram_index.resolve)
+    results['build']['ngram_sec'] = round(time.perf_counter() - start, 4)
+    results['build']['total_rss_bytes'] = get_rss()
+
+    log(f'Running {len(workload)} requests')
+    operations = results['operations']
+    parsed = {}
+
+    for kind, requests in sorted(workload.by_kind().items()):
+        if kind == 'random':
+            continue
+        durations = []
+        for text, _ in requests:
+            start = time.perf_counter()
+            parsed[text] = query_builder.from_query(text)
+            durations.append(time.perf_counter() - start)
+        operations[f'parse.{kind}'] = summarize(durations)
+
+        operations[f'specific.{kind}'] = summarize(_measure(
+            lambda text, themes: find.specific_records(
+                parsed[text], index, themes or set()
+            )[0][:constants.ITEMS_PER_PAGE],
+            requests,
+        ))
+
+    cache = search_engine.SearchCache()
+    specific = [(text, active_themes)
+                for kind, text, active_themes in workload.requests
+                if kind != 'random']
+    for text, active_themes in specific:
+        find.specific_records(parsed[text], index, active_themes or set(),
+                              cache)
+    operations['specific.cached'] = summarize(_measure(
+        lambda text, themes: find.specific_records(
+            parsed[text], index, themes or set(), cache
+        )[0][:constants.ITEMS_PER_PAGE],
+        specific,
+    ))
+
+    amount = 2
+    while amount <= shards:
+        log(f'Running specific requests on {amount} shards')
+        index.shards = search_engine.Shards(index, amount)
+        operations[f'specific.shards_{amount}'] = summarize(_measure(
+            lambda text, themes: find.specific_records(
+                parsed[text], index, themes or set()
+            )[0][:constants.ITEMS_PER_PAGE],
+            specific,
+        ))
+        index.shards.close()
+        index.shards = None
+        amount *= 2
+
+    operations['random'] = summarize(_measure(
+        lambda themes, seed: find.random_records(
+            index, themes, seed
+        )[0][:constants.ITEMS_PER_PAGE],
+        [(themes, number) for number, (kind, _, themes)
+         in enumerate(workload.requests) if kind == 'random'],
+    ))
+
+    table = search_engine.StatisticsTable.from_dicts({
+        theme: statistics.as_dict()
+        for theme, statistics in corpus.statistics.items()
+    })
+    selections = [(themes,) for kind, _, themes in workload.requests
+                  if kind == 'random']
+
+    operations['statistics'] = summarize(_measure(
+        lambda themes: _summarize_statistics(
+            table.merge(corpus.themes if themes is None else themes)
+        ),
+        selections,
+    ))
+
+    operations['statistics.cached'] = summarize(_measure(
+        lambda themes: _summarize_statistics(table.get(themes)),
+        selections,
+    ))
+
+    results['build']['peak_rss_bytes'] = get_rss()
+    return results
+
+
+def _summarize_statistics(statistic: search_engine.Statistics) -> None:
+    """Do the same work as the tags page does."""
+    _ = statistic.tags_by_frequency
+    _ = statistic.tags_by_alphabet
+
+
+def save(path: str, results: Dict[str, Any]) -> None:
+    """Write measurements into json file."""
+    with open(path, mode='w', encoding='utf-8') as file:
+        json.dump(results, file, indent=4, ensure_ascii=False)
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any],
+            metric: str = 'p95_ms') -> List[str]:
+    """Return textual comparison of two measurements."""
+    lines = []
+
+    if old.get('config') != new.get('config'):
+        lines.append('Warning: measurements were made with different config')
+
+    for name in sorted(set(old['operations']) | set(new['operations'])):
+        before = old['operations'].get(name, {}).get(metric)
+        after = new['operations'].get(name, {}).get(metric)
+
+        if before is None or after is None:
+            lines.append(f'{name:<24} {before} -> {after}')
+            continue
+
+        change = (after - before) / before * 100 if before else 0.0
+        lines.append(f'{name:<24} {before:>10.4f} -> {after:>10.4f} '
+                     f'{metric} ({change:+.1f}%)')
+
+    return lines
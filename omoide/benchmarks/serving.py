@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""Comparison of the deployment modes on a frozen database.
+
+Possible call variants:
+
+    Four sync workers (as gunicorn runs them) against one asgi process:
+        python -m omoide.benchmarks.serving --database-folder=./database
+
+    Same amount of concurrent clients for both modes:
+        python -m omoide.benchmarks.serving --database-folder=./database \
+            --workers=4 --concurrency=32 --requests=2000
+
+    Workers, forked from preloaded master, with and without freezing:
+        python -m omoide.benchmarks.serving --database-folder=./database \
+            --preload
+
+Both modes handle requests in child processes without network,
+so only the request handling itself gets compared.
+"""
+import asyncio
+import gc
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import click
+import flask
+
+from omoide import commands, constants, infra
+from omoide.application import app_factory, preload
+from omoide.application.class_asgi_adapter import AsgiAdapter
+from omoide.benchmarks import runner
+from omoide.database import operations
+
+__all__ = [
+    'make_urls',
+    'run_wsgi',
+    'run_asgi',
+    'run_preloaded',
+]
+
+# application of the current worker process
+_APP: Optional[flask.Flask] = None
+
+
+def _make_app(database_folder: str) -> flask.Flask:
+    """Create application the same way the launcher does."""
+    folder = os.path.dirname(app_factory.__file__)
+    command = commands.RunserverCommand(
+        database_folder=database_folder,
+        templates_folder=os.path.join(folder,
+                                      constants.TEMPLATES_FOLDER_NAME),
+        static_folder=os.path.join(folder, constants.STATIC_FOLDER_NAME),
+    )
+    engine = operations.create_read_only_database(
+        folder=database_folder,
+        filename=constants.STATIC_DB_FILE_NAME,
+        filesystem=infra.Filesystem(),
+        echo=False,
+    )
+    return app_factory.create_app(command, engine)
+
+
+def _get_app() -> flask.Flask:
+    """Return application of the worker process."""
+    assert _APP is not None, 'Worker has no application'
+    return _APP
+
+
+def _init_worker(database_folder: str) -> None:
+    """Load application in the worker process."""
+    global _APP  # pylint: disable=global-statement
+    _APP = _make_app(database_folder)
+
+
+def make_urls(app: flask.Flask, total: int, seed: int = 0) -> List[str]:
+    """Return typical requests of the users."""
+    with app.test_request_context():
+        app.preprocess_request()
+        state = flask.g.state
+        tags = [tag for tag in state.index.by_tags
+                if not constants.IDENTITY_TAG_PATTERN.match(tag)]
+        tags.sort(key=state.index.count, reverse=True)
+        tags = tags[:1000] or ['']
+        uuids = [meta.uuid for meta in state.index.all_metas[:1000]]
+
+    generator = random.Random(seed)
+    makers = [
+        lambda: f'/search?q={quote(generator.choice(tags))}',
+        lambda: f'/search?q={quote(generator.choice(tags))}'
+                f'%20%2B%20{quote(generator.choice(tags))}'
+                f'&page={generator.randint(1, 3)}',
+        lambda: f'/search?seed={generator.getrandbits(32)}',
+        lambda: f'/preview/{generator.choice(uuids)}',
+        lambda: '/tags',
+        lambda: '/navigation',
+    ]
+    weights = [0.35, 0.2, 0.2, 0.15, 0.05, 0.05]
+
+    return [generator.choices(makers, weights=weights)[0]()
+            for _ in range(total)]
+
+
+def _serve_wsgi(urls: List[str]) -> Tuple[List[float], Dict[str, int]]:
+    """Handle requests one after another, like sync worker does."""
+    client = _get_app().test_client()
+    durations = []
+
+    for url in urls:
+        start = time.perf_counter()
+        client.get(url).get_data()
+        durations.append(time.perf_counter() - start)
+
+    # long living worker makes full collection sooner or later
+    gc.collect()
+    return durations, _get_memory()
+
+
+def run_wsgi(database_folder: str, urls: List[str],
+             workers: int) -> Dict[str, Any]:
+    """Measure several processes with their own copies of everything."""
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(database_folder,)) as executor:
+        # make sure every worker has loaded the application
+        list(executor.map(_get_rss, range(workers * 4)))
+
+        start = time.perf_counter()
+        parts = [urls[i::workers] for i in range(workers)]
+        results = list(executor.map(_serve_wsgi, parts))
+        duration = time.perf_counter() - start
+
+    return _report(f'wsgi, {workers} workers', urls, duration, results)
+
+
+def _get_rss(_: Any = None) -> int:
+    """Return memory of the worker."""
+    return runner.get_rss()
+
+
+def _get_memory() -> Dict[str, int]:
+    """Return resident, proportional and private memory in bytes."""
+    memory = {'rss': runner.get_rss()}
+    try:
+        with open('/proc/self/smaps_rollup', mode='r',
+                  encoding='utf-8') as file:
+            fields = dict(line.split(':', 1) for line in file
+                          if line.count(':') == 1)
+    except OSError:
+        return memory
+
+    def get(name: str) -> int:
+        return int(fields.get(name, '0 kB').split()[0]) * 1024
+
+    memory['pss'] = get('Pss')
+    memory['uss'] = get('Private_Clean') + get('Private_Dirty')
+    return memory
+
+
+def _after_fork() -> None:
+    """Prepare inherited application for the worker."""
+    preload.after_fork(_get_app())
+
+
+def run_preloaded(app: flask.Flask, urls: List[str], workers: int,
+                  freeze: bool) -> Dict[str, Any]:
+    """Measure workers, forked from the process with application."""
+    global _APP  # pylint: disable=global-statement
+    _APP = app
+
+    if freeze:
+        preload.before_fork(app)
+    else:
+        preload.get_reloader(app).wait()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context(
+                                     'fork'),
+                                 initializer=_after_fork) as executor:
+            list(executor.map(_get_rss, range(workers * 4)))
+
+            start = time.perf_counter()
+            parts = [urls[i::workers] for i in range(workers)]
+            results = list(executor.map(_serve_wsgi, parts))
+            duration = time.perf_counter() - start
+    finally:
+        gc.unfreeze()
+        gc.enable()
+
+    state = 'frozen' if freeze else 'not frozen'
+    return _report(f'preloaded, {workers} workers, {state}',
+                   urls, duration, results)
+
+
+def _report(mode: str, urls: List[str], duration: float,
+            results: List[Tuple[List[float], Dict[str, int]]]
+            ) -> Dict[str, Any]:
+    """Combine measurements of all worker processes."""
+    durations = [x for part, _ in results for x in part]
+    memory = [worker for _, worker in results]
+    return {
+        'mode': mode,
+        'wall_sec': round(duration, 4),
+        'requests_per_second': round(len(urls) / duration, 1),
+        'rss_bytes': sum(worker['rss'] for worker in memory),
+        'per_worker': {
+            name: max(worker.get(name, 0) for worker in memory)
+            for name in ('rss', 'pss', 'uss')
+        },
+        'latency': runner.summarize(durations),
+    }
+
+
+async def _get(adapter: AsgiAdapter, url: str) -> None:
+    """Make single request to the asgi application."""
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query.encode('latin-1'),
+        'headers': [],
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(_):
+        return None
+
+    await adapter(scope, receive, send)
+
+
+def _serve_asgi(urls: List[str], concurrency: int,
+                threads: int) -> Tuple[List[float], float, int]:
+    """Handle requests by many concurrent clients."""
+    adapter = AsgiAdapter(_get_app(), threads=threads)
+    durations = []
+
+    async def client(queue: List[str]) -> None:
+        """Make requests one after another."""
+        while queue:
+            url = queue.pop()
+            start = time.perf_counter()
+            await _get(adapter, url)
+            durations.append(time.perf_counter() - start)
+
+    async def run_clients() -> None:
+        """Start all clients."""
+        queue = list(reversed(urls))
+        await asyncio.gather(*(client(queue) for _ in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(run_clients())
+    duration = time.perf_counter() - start
+    adapter.close()
+
+    return durations, duration, runner.get_rss()
+
+
+def run_asgi(database_folder: str, urls: List[str], concurrency: int,
+             threads: int = constants.ASGI_THREADS) -> Dict[str, Any]:
+    """Measure single process with many concurrent requests."""
+    with ProcessPoolExecutor(max_workers=1,
+                             initializer=_init_worker,
+                             initargs=(database_folder,)) as executor:
+        executor.submit(_get_rss).result()
+        durations, duration, rss = executor.submit(
+            _serve_asgi, urls, concurrency, threads
+        ).result()
+
+    return {
+        'mode': f'asgi, {threads} threads, {concurrency} clients',
+        'wall_sec': round(duration, 4),
+        'requests_per_second': round(len(urls) / duration, 1),
+        'rss_bytes': rss,
+        'latency': runner.summarize(durations),
+    }
+
+
+@click.command()
+@click.option('--database-folder', required=True,
+              help='Folder with frozen database')
+@click.option('--requests', default=1_000, help='Amount of requests')
+@click.option('--workers', default=4, help='Sync workers in wsgi mode')
+@click.option('--concurrency', default=16,
+              help='Concurrent clients in asgi mode')
+@click.option('--threads', default=constants.ASGI_THREADS,
+              help='Threads in asgi mode')
+@click.option('--preload', 'preloaded', is_flag=True,
+              help='Also measure workers forked from preloaded master')
+@click.option('--seed', default=0, help='Seed for requests')
+@click.option('--output', default='', help='Where to save json results')
+# pylint: disable=too-many-arguments
+def main(database_folder: str, requests: int, workers: int,
+         concurrency: int, threads: int, preloaded: bool, seed: int,
+         output: str) -> None:
+    """Compare sync workers with single asgi process."""
+    app = _make_app(database_folder)
+    urls = make_urls(app, requests, seed)
+    results: Dict[str, Any] = {
+        'config': {'requests': requests, 'workers': workers,
+                   'concurrency': concurrency, 'threads': threads,
+                   'seed': seed, 'cpu_count': os.cpu_count()},
+        'modes': [
+            run_wsgi(database_folder, urls, workers),
+            run_asgi(database_folder, urls, concurrency, threads),
+        ],
+    }
+
+    if preloaded:
+        results['modes'].extend([
+            run_preloaded(app, urls, workers, freeze=False),
+            run_preloaded(app, urls, workers, freeze=True),
+        ])
+    click.echo(json.dumps(results, indent=4))
+
+    if output:
+        runner.save(output, results)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
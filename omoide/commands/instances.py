@@ -99,4 +99,5 @@ class RunserverCommand(BaseCommand):
     templates_folder: str = '.'
     static_folder: str = '.'
     injection: str = ''
+    shards: int = 0
     name: str = 'runserver'
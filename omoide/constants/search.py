@@ -36,4 +36,46 @@ STRICT_THEME_UUID_PATTERN = re.compile(
     '^t_[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$'
 )
 
+# uuids of themes, groups and metas are searchable as tags too
+IDENTITY_TAG_PATTERN = re.compile(
+    '^[' + ALL_PREFIXES + ']_'
+    '[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}$'
+)
+
 THEMES_SEPARATION = re.compile(r',|%2C')
+
+# limit for stored search results, per worker
+SEARCH_CACHE_BYTES = 16 * 1024 * 1024
+
+# amount of stored masks for theme selections and conditions, per worker
+THEMES_MASKS_CACHE_SIZE = 64
+
+# amount of tags in autocompletion
+SUGGEST_LIMIT = 10
+
+# maximum amount of edits, when looking for misspelled tags
+TYPO_MAX_DISTANCE = 2
+
+# size of the seed for random browsing, it is shown in the url
+RANDOM_SEED_BITS = 32
+
+# deeper parentheses in the query are ignored
+MAX_QUERY_DEPTH = 32
+
+# amount of tags that help to narrow search result
+FACETS_LIMIT = 10
+
+# upper bounds (in seconds) of the buckets for search phase latencies
+TIMING_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                  0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# freeze writes the whole new snapshot, when changes since
+# the last one touch more than this part of all metas
+DELTA_MAX_RATIO = 0.1
+
+# smaller indexes are searched in one process even if shards are requested,
+# sending results between processes would take longer than the search
+SHARDS_MIN_METAS = 100_000
+
+# amount of stored statistics for theme selections on tags page, per worker
+STATISTICS_CACHE_SIZE = 64
@@ -18,3 +18,30 @@ DEFAULT_STATIC_FOLDER = _os.path.join('.', STATIC_FOLDER_NAME)
 ITEMS_PER_PAGE = 100
 
 MAX_TEXT_INPUT_SIZE = 4096
+
+# seconds between checks for the new database file
+RELOAD_INTERVAL = 5.0
+
+# records in one response of the json api
+API_MAX_LIMIT = 1000
+
+# records in one chunk of the streamed export
+EXPORT_CHUNK_SIZE = 1000
+
+# amount of page links shown by the paginator
+PAGES_IN_BLOCK = 15
+
+# limit for stored rendered pages, per worker
+PAGE_CACHE_BYTES = 8 * 1024 * 1024
+
+# place of the search report in the cached search page
+SEARCH_REPORT_MARKER = '<!-- search report -->'
+
+# place of the search duration note in the cached search page
+SEARCH_NOTE_MARKER = '<!-- search note -->'
+
+# key of the reloader among flask extensions
+RELOADER_EXTENSION = 'omoide.reloader'
+
+# threads handling requests in the asgi variant of the application
+ASGI_THREADS = 16
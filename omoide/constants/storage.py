@@ -29,6 +29,8 @@ ROOT_DB_FILE_NAME = 'root.db'
 BRANCH_DB_FILE_NAME = 'branch.db'
 LEAF_DB_FILE_NAME = 'migration.db'
 STATIC_DB_FILE_NAME = 'database.db'
+INDEX_SNAPSHOT_FILE_NAME = 'index.bin'
+INDEX_DELTA_FILE_NAME = 'index.delta.json'
 
 # media parameters
 PREVIEW_SIZE = (1024, 1024)
@@ -10,6 +10,7 @@ from omoide.database import common
 __alL__ = [
     'IndexTags',
     'IndexMetas',
+    'IndexPreview',
 ]
 
 
@@ -48,3 +49,34 @@ class IndexMetas(common.Base):
     # fields
     number = sa.Column(sa.Integer, nullable=False)
     path_to_thumbnail = sa.Column(sa.Text, nullable=False)
+
+
+class IndexPreview(common.Base):
+    """Index for preview pages.
+
+    Everything preview page needs besides the meta itself, so it
+    does not have to walk through group, theme and their tags.
+    Ordinal is position of the meta in its group, starting from 1,
+    metas without group have zero.
+    """
+    __tablename__ = 'index_preview'
+    __table_args__ = (
+        sa.Index('ix_index_preview_group_ordinal', 'group_uuid', 'ordinal'),
+    )
+
+    # primary and foreign keys
+    meta_uuid = sa.Column(sa.String(length=constants.UUID_LEN),
+                          sa.ForeignKey('metas.uuid'),
+                          primary_key=True, nullable=False,
+                          unique=True, index=True)
+    # fields
+    group_uuid = sa.Column(sa.String(length=constants.UUID_LEN),
+                           nullable=False)
+    ordinal = sa.Column(sa.Integer, nullable=False)
+    total = sa.Column(sa.Integer, nullable=False)
+    previous_uuid = sa.Column(sa.String(length=constants.UUID_LEN),
+                              nullable=True)
+    next_uuid = sa.Column(sa.String(length=constants.UUID_LEN),
+                          nullable=True)
+    # merged tags of theme, group and meta, sorted, as json list
+    tags = sa.Column(sa.Text, nullable=False)
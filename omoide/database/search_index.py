@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""Loading of the search index from the database.
+
+Used both by the application, when there is no index snapshot,
+and by the freeze operation, that saves the snapshot.
+"""
+from collections import defaultdict
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from omoide import search_engine
+from omoide.database import models
+
+__all__ = [
+    'get_index',
+    'get_columns',
+]
+
+
+def get_index(session: Session) -> search_engine.Index:
+    """Load instance of Index from db."""
+    metas = list(session.query(models.IndexMetas).order_by('number').all())
+    all_metas = [
+        search_engine.ShallowMeta(x.meta_uuid, number, x.path_to_thumbnail)
+        for number, x in enumerate(metas)
+    ]
+    numbers = {meta.uuid: meta.number for meta in all_metas}
+
+    by_tags = defaultdict(set)
+    for tag, uuid in session.query(models.IndexTags.tag,
+                                   models.IndexTags.uuid):
+        number = numbers.get(uuid)
+        if number is not None:
+            by_tags[tag.lower()].add(number)
+
+    synonyms = defaultdict(list)
+    for uuid, value in session.query(models.SynonymValue.synonym_uuid,
+                                     models.SynonymValue.value):
+        synonyms[uuid].append(value)
+
+    index = search_engine.Index(
+        all_metas=all_metas,
+        by_tags=by_tags,
+        synonyms=synonyms.values(),
+        columns=get_columns(session, numbers),
+    )
+
+    return index
+
+
+# pylint: disable=too-many-locals
+def get_columns(session: Session, numbers: Dict[str, int]
+                ) -> Dict[str, search_engine.Column]:
+    """Load numeric attributes of metas, ordered by number."""
+    total = len(numbers)
+    width = [0] * total
+    height = [0] * total
+    resolution = [0.0] * total
+    size = [0] * total
+    types = [0] * total
+    dates = [0] * total
+    labels: Dict[str, int] = {}
+
+    query = session.query(models.Meta.uuid,
+                          models.Meta.width,
+                          models.Meta.height,
+                          models.Meta.resolution,
+                          models.Meta.size,
+                          models.Meta.type,
+                          models.Meta.registered_on,
+                          models.Group.registered_on) \
+        .join(models.Group, models.Group.uuid == models.Meta.group_uuid)
+
+    for uuid, *values, meta_date, group_date in query:
+        number = numbers.get(uuid)
+
+        if number is None:
+            continue
+
+        (width[number], height[number], resolution[number],
+         size[number], meta_type) = values
+        types[number] = labels.setdefault(meta_type, len(labels))
+        dates[number] = _date_to_number(meta_date or group_date)
+
+    ratio = [x / y if y else 0.0 for x, y in zip(width, height)]
+    make = search_engine.Column.from_values
+
+    return {
+        'width': make('I', width),
+        'height': make('I', height),
+        'resolution': make('d', resolution),
+        'ratio': make('d', ratio),
+        'size': make('Q', size),
+        'date': make('I', dates),
+        'type': make('B', types, labels=tuple(labels)),
+    }
+
+
+def _date_to_number(date: str) -> int:
+    """Convert date like '2021-01-31' into 20210131 or 0."""
+    digits = date.replace('-', '')
+
+    if len(digits) != 8 or not digits.isdigit():
+        return 0
+
+    return int(digits)
@@ -4,14 +4,16 @@
 """
 import sys
 
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 
 from omoide import commands
 from omoide import constants
 from omoide import infra
-from omoide.database import operations
+from omoide.database import operations, search_index
 from omoide.migration_engine.operations.freeze import indexes
 from omoide.migration_engine.operations.freeze import helpers
+from omoide import search_engine
+from omoide.search_engine import snapshot
 
 
 def act(command: commands.FreezeCommand,
@@ -61,6 +63,50 @@ def act(command: commands.FreezeCommand,
     operations.synchronize(session_root, session_db)
     indexes.build_indexes(session_db, stdout)
     helpers.build_helpers(session_db, stdout)
+    build_snapshot(session_db, db_folder, filesystem, stdout)
 
     root_db.dispose()
     database.dispose()
+
+
+def build_snapshot(session: Session, db_folder: str,
+                   filesystem: infra.Filesystem,
+                   stdout: infra.STDOut) -> int:
+    """Save search index into binary file near the app_database.
+
+    When changes since the existing snapshot are small,
+    only they are saved and the snapshot is kept as it is.
+    """
+    path = filesystem.join(db_folder, constants.INDEX_SNAPSHOT_FILE_NAME)
+    delta_path = filesystem.join(db_folder, constants.INDEX_DELTA_FILE_NAME)
+    index = search_index.get_index(session)
+
+    # running application may be compacting the same files
+    with snapshot.lock(path):
+        delta = None
+        if filesystem.exists(path):
+            try:
+                base = snapshot.load(path)
+                delta = search_engine.Delta.from_indexes(
+                    base=base,
+                    target=index,
+                    generation=snapshot.get_generation(path),
+                )
+            except snapshot.SnapshotError as exc:
+                stdout.yellow(f'\tExisting snapshot is not used: {exc}')
+
+        if delta is not None \
+                and len(delta) <= len(base) * constants.DELTA_MAX_RATIO:
+            stdout.print(f'\tSaving index delta: {len(delta.all_metas)} '
+                         f'added, {len(delta.removed)} removed')
+            return snapshot.save_delta(delta_path, delta)
+
+        stdout.print('\tSaving index snapshot')
+        facets = search_engine.Facets.from_index(index)
+        size = snapshot.save(path, index, facets)
+
+        # old delta belongs to the replaced snapshot
+        if filesystem.exists(delta_path):
+            filesystem.delete_file(delta_path)
+
+    return size
@@ -4,16 +4,16 @@
 Gets loaded on start of the application and
 helps limiting amount of app_database requests.
 """
-from typing import List
+import json
 
 from sqlalchemy.orm import Session
 
+from omoide import constants
 from omoide import infra
 from omoide.database import models
 
 _META_THEMES_CACHE = {}
 _META_GROUPS_CACHE = {}
-_SYNONYMS = None
 
 
 def build_indexes(session: Session, stdout: infra.STDOut) -> int:
@@ -21,6 +21,7 @@ def build_indexes(session: Session, stdout: infra.STDOut) -> int:
     new_values = 0
     new_values += build_index_tags(session, stdout)
     new_values += build_index_meta(session, stdout)
+    new_values += build_index_preview(session, stdout)
     return new_values
 
 
@@ -46,18 +47,12 @@ def lazy_get_group(meta: models.Meta) -> models.Group:
     return value
 
 
-def lazy_get_synonyms(session) -> List[models.Synonym]:
-    """Lazy return Group or go to app_database for it."""
-    global _SYNONYMS
-
-    if _SYNONYMS is None:
-        _SYNONYMS = session.query(models.Synonym).all()
-
-    return _SYNONYMS
-
-
 def build_index_tags(session: Session, stdout: infra.STDOut) -> int:
-    """Create indexes for tags."""
+    """Create indexes for tags.
+
+    Synonyms are not stored here, search engine
+    expands query with them instead.
+    """
     stdout.print('\tBuilding index for tags')
     new_values = 0
 
@@ -74,13 +69,6 @@ def build_index_tags(session: Session, stdout: infra.STDOut) -> int:
             meta.uuid,
         }
 
-        for synonym in lazy_get_synonyms(session):
-            values = {x.value for x in synonym.values}
-            for value in values:
-                if value in all_tags:
-                    all_tags.update(values)
-                    break
-
         new_values += len(all_tags)
 
         for tag in all_tags:
@@ -112,3 +100,40 @@ def build_index_meta(session: Session, stdout: infra.STDOut) -> int:
     session.commit()
 
     return new_values
+
+
+def build_index_preview(session: Session, stdout: infra.STDOut) -> int:
+    """Create table with everything preview page needs."""
+    stdout.print('\tBuilding index for previews')
+    new_values = 0
+
+    for group in session.query(models.Group).all():
+        group_tags = {
+            *(x.value for x in group.theme.tags),
+            *(x.value for x in group.tags),
+        }
+        metas = list(group.metas)
+
+        # metas without group are not browsed one after another
+        in_group = group.route != constants.NO_GROUP
+        total = len(metas) if in_group else 0
+
+        for i, meta in enumerate(metas):
+            tags = sorted(group_tags | {x.value for x in meta.tags})
+            value = models.IndexPreview(
+                meta_uuid=meta.uuid,
+                group_uuid=group.uuid,
+                ordinal=i + 1 if in_group else 0,
+                total=total,
+                previous_uuid=metas[i - 1].uuid
+                if in_group and i > 0 else None,
+                next_uuid=metas[i + 1].uuid
+                if in_group and i + 1 < total else None,
+                tags=json.dumps(tags, ensure_ascii=False),
+            )
+            session.add(value)
+            new_values += 1
+
+    session.commit()
+
+    return new_values
@@ -1,6 +1,25 @@
 # -*- coding: utf-8 -*-
+from omoide.search_engine.class_column import Column
+from omoide.search_engine.class_delta import Delta
+from omoide.search_engine.class_facets import Facets
+from omoide.search_engine.class_histograms import Histograms
 from omoide.search_engine.class_index import Index
-from omoide.search_engine.class_index import ShallowMeta
+from omoide.search_engine.class_shallow_meta import ShallowMeta
+from omoide.search_engine.class_shards import Shards
+from omoide.search_engine.class_layered_index import LayeredIndex
+from omoide.search_engine.class_meta_table import MetaTable
+from omoide.search_engine.class_ngram_index import NgramIndex
+from omoide.search_engine.class_plan import Plan
+from omoide.search_engine.class_predicate import Predicate
+from omoide.search_engine.class_plan import Step
 from omoide.search_engine.class_query import Query
 from omoide.search_engine.class_query_builder import QueryBuilder
+from omoide.search_engine.class_random_order import RandomOrder
+from omoide.search_engine.class_ranked_bitmap import RankedBitmap
+from omoide.search_engine.class_search_cache import SearchCache
+from omoide.search_engine.class_search_result import SearchResult
 from omoide.search_engine.class_statistics import Statistics
+from omoide.search_engine.class_statistics_table import StatisticsTable
+from omoide.search_engine.class_tag_trie import TagTrie
+from omoide.search_engine.class_trace import Span
+from omoide.search_engine.class_trace import Trace
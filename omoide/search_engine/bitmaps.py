@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""Operations on bitmaps of meta numbers.
+
+Bitmap is a plain python int, where bit N is set when meta
+with number N belongs to the set. Union, intersection and
+difference are just |, & and & ~ and are executed in C.
+"""
+import sys
+from array import array
+from itertools import islice
+from typing import Collection, Iterator, List
+
+__all__ = [
+    'EMPTY',
+    'from_numbers',
+    'to_numbers',
+    'full',
+    'count',
+    'iterate',
+    'select',
+]
+
+EMPTY = 0
+
+# amount of bytes, processed at once when skipping through bitmap
+_BLOCK_SIZE = 512
+
+if sys.version_info >= (3, 10):
+    _popcount = int.bit_count
+else:  # pragma: no cover
+    def _popcount(value: int) -> int:
+        """Return amount of set bits."""
+        return bin(value).count('1')
+
+
+def from_numbers(numbers: Collection[int]) -> int:
+    """Make bitmap from collection of numbers.
+
+    >>> from_numbers([0, 2, 3])
+    13
+    """
+    if not numbers:
+        return EMPTY
+
+    raw = bytearray(max(numbers) // 8 + 1)
+    for number in numbers:
+        raw[number >> 3] |= 1 << (number & 7)
+
+    return int.from_bytes(raw, 'little')
+
+
+def to_numbers(bitmap: int) -> array:
+    """Make compact sorted array of numbers from bitmap.
+
+    >>> to_numbers(13)
+    array('I', [0, 2, 3])
+    """
+    return array('I', iterate(bitmap))
+
+
+def full(size: int) -> int:
+    """Make bitmap with all numbers from 0 to size - 1.
+
+    >>> full(4)
+    15
+    """
+    return (1 << size) - 1
+
+
+def count(bitmap: int) -> int:
+    """Return amount of numbers in bitmap.
+
+    >>> count(13)
+    3
+    """
+    return _popcount(bitmap)
+
+
+def iterate(bitmap: int, skip: int = 0) -> Iterator[int]:
+    """Iterate over numbers in ascending order, skipping first ones.
+
+    >>> list(iterate(13, skip=1))
+    [2, 3]
+    """
+    raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+
+    for block_start in range(0, len(raw), _BLOCK_SIZE):
+        block = int.from_bytes(raw[block_start:block_start + _BLOCK_SIZE],
+                               'little')
+        if not block:
+            continue
+
+        if skip:
+            amount = _popcount(block)
+            if amount <= skip:
+                skip -= amount
+                continue
+
+        base = block_start * 8
+        while block:
+            lowest = block & -block
+            block ^= lowest
+
+            if skip:
+                skip -= 1
+                continue
+
+            yield base + lowest.bit_length() - 1
+
+
+def select(bitmap: int, start: int, stop: int) -> List[int]:
+    """Return numbers with ranks from start to stop (not including).
+
+    >>> select(0b1011010, 1, 3)
+    [3, 4]
+    """
+    if stop <= start:
+        return []
+    return list(islice(iterate(bitmap, skip=start), stop - start))
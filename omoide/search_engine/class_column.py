@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""Numeric attribute of all metas.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Optional, Sequence, Tuple, Union
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_predicate import Predicate
+
+__all__ = [
+    'Column',
+]
+
+Number = Union[int, float]
+
+# values are kept in arrays or in memory-mapped snapshot
+Values = Union[array, memoryview]
+
+
+class Column:
+    """Numeric attribute of all metas.
+
+    Values are ordered by meta number. Numbers of metas are also
+    kept sorted by value, so metas with values in given range
+    are found with two binary searches and come as a single slice.
+
+    Textual attributes are stored as codes of their labels.
+    """
+
+    def __init__(self, values: Values, order: Values,
+                 labels: Tuple[str, ...] = ()) -> None:
+        """Initialize instance."""
+        self.values = values
+        self.order = order
+        self.labels = tuple(labels)
+        self._keys = _SortedValues(values, order)
+
+    def __len__(self) -> int:
+        """Return total amount of values."""
+        return len(self.values)
+
+    @classmethod
+    def from_values(cls, typecode: str, values: Sequence,
+                    labels: Tuple[str, ...] = ()) -> 'Column':
+        """Create instance, sorting numbers by their values."""
+        values = array(typecode, values)
+        order = array('I', sorted(range(len(values)),
+                                  key=values.__getitem__))
+        return cls(values, order, labels)
+
+    @property
+    def typecode(self) -> str:
+        """Return type of the stored values."""
+        if isinstance(self.values, memoryview):
+            return self.values.format
+        return self.values.typecode
+
+    def get_part(self, start: int, stop: int) -> 'Column':
+        """Return column of metas with numbers from start to stop."""
+        return self.from_values(self.typecode, self.values[start:stop],
+                                self.labels)
+
+    def get_value(self, number: int) -> Any:
+        """Return value of the meta, labels are returned as text."""
+        value = self.values[number]
+        return self.labels[value] if self.labels else value
+
+    def compact(self, numbers: Sequence[int]) -> 'Column':
+        """Return column of given metas only."""
+        return self.from_values(self.typecode,
+                                [self.values[number] for number in numbers],
+                                self.labels)
+
+    def _convert(self, value: Union[Number, str, None]
+                 ) -> Optional[Number]:
+        """Return value as it is stored in the column."""
+        if isinstance(value, str):
+            if value not in self.labels:
+                return None
+            return self.labels.index(value)
+        return value
+
+    def get_range(self, predicate: Predicate) -> Tuple[int, int]:
+        """Return start and stop of the sorted numbers for predicate."""
+        low = self._convert(predicate.low)
+        high = self._convert(predicate.high)
+
+        if (predicate.low is not None and low is None) \
+                or (predicate.high is not None and high is None):
+            return 0, 0
+
+        if low is None:
+            start = 0
+        elif predicate.include_low:
+            start = bisect_left(self._keys, low)
+        else:
+            start = bisect_right(self._keys, low)
+
+        if high is None:
+            stop = len(self)
+        elif predicate.include_high:
+            stop = bisect_right(self._keys, high, lo=start)
+        else:
+            stop = bisect_left(self._keys, high, lo=start)
+
+        return start, max(start, stop)
+
+    def count(self, predicate: Predicate) -> int:
+        """Return amount of metas matching the predicate."""
+        start, stop = self.get_range(predicate)
+        return stop - start
+
+    def select(self, predicate: Predicate) -> int:
+        """Return bitmap of metas matching the predicate."""
+        start, stop = self.get_range(predicate)
+
+        # it is cheaper to exclude the rest for wide ranges
+        if stop - start > len(self) // 2:
+            rest = bitmaps.from_numbers(self.order[:start])
+            rest |= bitmaps.from_numbers(self.order[stop:])
+            return bitmaps.full(len(self)) & ~rest
+
+        return bitmaps.from_numbers(self.order[start:stop])
+
+
+class _SortedValues(Sequence):
+    """Values in ascending order, used for binary search."""
+
+    def __init__(self, values: Sequence, order: Sequence[int]) -> None:
+        """Initialize instance."""
+        self._values = values
+        self._order = order
+
+    def __len__(self) -> int:
+        """Return total amount of values."""
+        return len(self._order)
+
+    def __getitem__(self, position):
+        """Return value with given rank."""
+        return self._values[self._order[position]]
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""Changes of the index since its base was saved.
+"""
+from collections import defaultdict
+from typing import (
+    Any, Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Set,
+)
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_column import Column
+from omoide.search_engine.class_index import Index, ShallowMeta
+
+__all__ = [
+    'Delta',
+]
+
+
+class Delta:
+    """Changes of the index since its base was saved.
+
+    Added metas are numbered from zero inside the delta, removed
+    ones are given by their numbers in the base. Changed meta is
+    removed and added again. Synonyms are given only if they have
+    changed and replace the base ones completely.
+
+    Positions are numbers of the added metas in the full index,
+    that the delta was made for. They let compaction restore
+    the same order as a full rebuild would give.
+    """
+
+    def __init__(self, all_metas: Sequence[ShallowMeta],
+                 by_tags: Mapping[str, Collection[int]],
+                 removed: Collection[int],
+                 synonyms: Optional[Iterable[Collection[str]]] = None,
+                 columns: Optional[Mapping[str, Column]] = None,
+                 base: str = '',
+                 positions: Optional[Sequence[int]] = None) -> None:
+        """Initialize instance."""
+        self.all_metas = list(all_metas)
+        self.positions = None if positions is None else list(positions)
+        self.by_tags = {tag: sorted(numbers)
+                        for tag, numbers in by_tags.items()}
+        self.removed = sorted(removed)
+        self.synonyms = None if synonyms is None else [
+            sorted(group) for group in synonyms
+        ]
+        self.columns: Mapping[str, Column] = columns or {}
+        self.base = base
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return (f'<{type(self).__name__}, +{len(self.all_metas)}, '
+                f'-{len(self.removed)}>')
+
+    def __len__(self) -> int:
+        """Return total amount of added and removed metas."""
+        return len(self.all_metas) + len(self.removed)
+
+    def __bool__(self) -> bool:
+        """Return True if anything has changed."""
+        return bool(len(self) or self.synonyms is not None)
+
+    @classmethod
+    def from_indexes(cls, base: Index, target: Index,
+                     generation: str = '') -> 'Delta':
+        """Create instance, that turns base index into the target one."""
+        base_rows = _get_rows(base)
+        target_rows = _get_rows(target)
+        base_numbers = {meta.uuid: meta.number for meta in base.all_metas}
+
+        removed: Set[int] = set(base_numbers.values())
+        added: List[ShallowMeta] = []
+
+        for meta in target.all_metas:
+            number = base_numbers.get(meta.uuid)
+
+            if number is not None and _is_same(base, number, base_rows,
+                                               target, meta.number,
+                                               target_rows):
+                removed.discard(number)
+            else:
+                added.append(meta)
+
+        by_tags: Dict[str, List[int]] = defaultdict(list)
+        for position, meta in enumerate(added):
+            for tag in target_rows.get(meta.number, ()):
+                by_tags[tag].append(position)
+
+        columns = {}
+        for name, column in target.columns.items():
+            values = [column.values[meta.number] for meta in added]
+            columns[name] = Column.from_values(
+                typecode=column.typecode,
+                values=values,
+                labels=column.labels,
+            )
+
+        base_groups = set(base.synonyms.values())
+        target_groups = set(target.synonyms.values())
+
+        return cls(
+            all_metas=[
+                ShallowMeta(meta.uuid, position, meta.path_to_thumbnail)
+                for position, meta in enumerate(added)
+            ],
+            by_tags=by_tags,
+            removed=removed,
+            synonyms=None if base_groups == target_groups else target_groups,
+            columns=columns,
+            base=generation,
+            positions=[meta.number for meta in added],
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return serializable form."""
+        return {
+            'base': self.base,
+            'metas': [[meta.uuid, meta.path_to_thumbnail]
+                      for meta in self.all_metas],
+            'by_tags': self.by_tags,
+            'removed': self.removed,
+            'synonyms': self.synonyms,
+            'positions': self.positions,
+            'columns': {
+                name: {
+                    'typecode': column.typecode,
+                    'values': list(column.values),
+                    'labels': list(column.labels),
+                }
+                for name, column in self.columns.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'Delta':
+        """Create instance from serializable form."""
+        return cls(
+            all_metas=[
+                ShallowMeta(uuid, position, path_to_thumbnail)
+                for position, (uuid, path_to_thumbnail)
+                in enumerate(raw['metas'])
+            ],
+            by_tags=raw['by_tags'],
+            removed=raw['removed'],
+            synonyms=raw['synonyms'],
+            columns={
+                name: Column.from_values(typecode=info['typecode'],
+                                         values=info['values'],
+                                         labels=tuple(info['labels']))
+                for name, info in raw['columns'].items()
+            },
+            base=raw['base'],
+            # deltas of older versions have no positions
+            positions=raw.get('positions'),
+        )
+
+
+def _get_rows(index: Index) -> Dict[int, Set[str]]:
+    """Return tags of every meta."""
+    rows: Dict[int, Set[str]] = defaultdict(set)
+
+    for tag, posting in index.by_tags.items():
+        if isinstance(posting, int):
+            posting = bitmaps.to_numbers(posting)
+        for number in posting:
+            rows[number].add(tag)
+
+    return rows
+
+
+def _is_same(base: Index, base_number: int, base_rows: Dict[int, Set[str]],
+             target: Index, target_number: int,
+             target_rows: Dict[int, Set[str]]) -> bool:
+    """Return True if meta has not changed."""
+    if base_rows.get(base_number) != target_rows.get(target_number):
+        return False
+
+    first = base.all_metas[base_number]
+    second = target.all_metas[target_number]
+
+    if first.path_to_thumbnail != second.path_to_thumbnail:
+        return False
+
+    if set(base.columns) != set(target.columns):
+        return False
+
+    return all(
+        _get_value(column, base_number)
+        == _get_value(target.columns[name], target_number)
+        for name, column in base.columns.items()
+    )
+
+
+def _get_value(column: Column, number: int) -> Any:
+    """Return value of the meta, labels are compared by text."""
+    value = column.values[number]
+    if column.labels:
+        return column.labels[value]
+    return value
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""Tree of the search request.
+"""
+from typing import Collection, Iterable, List, Optional, Tuple, Union
+
+from omoide import constants
+
+__all__ = [
+    'Expression',
+    'Operand',
+    'GROUP_START',
+    'GROUP_END',
+]
+
+# markers of the parentheses in the query sequence,
+# start goes as a word, end goes as an operator
+GROUP_START = '('
+GROUP_END = ')'
+
+_KEYWORDS = {
+    'and': constants.KW_AND,
+    'or': constants.KW_OR,
+    'not': constants.KW_NOT,
+}
+
+# operators are accepted both as names and keywords
+_ATTRIBUTES = {
+    'and': 'and_', constants.KW_AND: 'and_',
+    'or': 'or_', constants.KW_OR: 'or_',
+    'not': 'not_', constants.KW_NOT: 'not_',
+}
+
+Operand = Union[str, 'Expression']
+
+
+def _sort_key(operand: Operand) -> str:
+    """Return key for stable ordering of mixed operands."""
+    return str(operand)
+
+
+class Expression:
+    """Tree of the search request.
+
+    Every node is a group of operands, where each operand is a tag
+    or another group. Result of the group is intersection of all
+    'and' operands and union of all 'or' operands without union of
+    all 'not' operands, same way as for the flat query.
+
+    Expressions are immutable and hashable, so equal subtrees
+    are the same key and get computed only once.
+    """
+    __slots__ = ('and_', 'or_', 'not_', '_hash', '_text')
+
+    def __init__(self,
+                 and_: Collection[Operand] = (),
+                 or_: Collection[Operand] = (),
+                 not_: Collection[Operand] = ()) -> None:
+        """Initialize instance."""
+        self.and_ = frozenset(and_)
+        self.or_ = frozenset(or_)
+        self.not_ = frozenset(not_)
+        self._hash = hash((self.and_, self.or_, self.not_))
+        self._text: Optional[str] = None
+
+    def __eq__(self, other) -> bool:
+        """Return True if expressions have same operands."""
+        if not isinstance(other, Expression):
+            return NotImplemented
+        return (self.and_ == other.and_
+                and self.or_ == other.or_
+                and self.not_ == other.not_)
+
+    def __hash__(self) -> int:
+        """Return hash of the operands."""
+        return self._hash
+
+    def __bool__(self) -> bool:
+        """Return True if expression has any operands."""
+        return bool(self.and_ or self.or_ or self.not_)
+
+    def __str__(self) -> str:
+        """Return canonical textual representation."""
+        if self._text is None:
+            self._text = '(' + ' '.join(
+                f'{_KEYWORDS[operator]} {operand}'
+                for operator, operand in self.operands()
+            ) + ')'
+        return self._text
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, {self}>'
+
+    def operands(self) -> List[Tuple[str, Operand]]:
+        """Return all operators and operands in stable order."""
+        return [
+            *(('and', x) for x in sorted(self.and_, key=_sort_key)),
+            *(('or', x) for x in sorted(self.or_, key=_sort_key)),
+            *(('not', x) for x in sorted(self.not_, key=_sort_key)),
+        ]
+
+    @property
+    def is_flat(self) -> bool:
+        """Return True if there are no nested groups."""
+        return all(isinstance(operand, str)
+                   for operand in (*self.and_, *self.or_, *self.not_))
+
+    def simplify(self) -> Operand:
+        """Return single operand instead of the group if possible."""
+        if not self.not_ and len(self.and_) + len(self.or_) == 1:
+            return next(iter(self.and_ or self.or_))
+        return self
+
+    @classmethod
+    def from_sequence(cls, sequence: Iterable[Tuple[str, str]]
+                      ) -> 'Expression':
+        """Parse ordered operators and words of the query.
+
+        Unbalanced parentheses are tolerated: extra closing ones
+        are ignored and not closed groups end with the query.
+        Groups deeper than allowed are merged into enclosing ones.
+        """
+        stack: List[Tuple[str, dict]] = [('and', _new_group())]
+        ignored = 0
+
+        def close_group() -> None:
+            """Add last group to the enclosing one."""
+            operator, operands = stack.pop()
+            node = cls(**operands)
+            if node:
+                stack[-1][1][_ATTRIBUTES[operator]].append(node.simplify())
+
+        for operator, word in sequence:
+            if word == GROUP_START:
+                if len(stack) > constants.MAX_QUERY_DEPTH:
+                    ignored += 1
+                else:
+                    stack.append((operator, _new_group()))
+            elif operator == GROUP_END:
+                if ignored:
+                    ignored -= 1
+                elif len(stack) > 1:
+                    close_group()
+            else:
+                stack[-1][1][_ATTRIBUTES[operator]].append(word.lower())
+
+        while len(stack) > 1:
+            close_group()
+
+        return cls(**stack[0][1])
+
+
+def _new_group() -> dict:
+    """Return storage for operands of the group."""
+    return {'and_': [], 'or_': [], 'not_': []}
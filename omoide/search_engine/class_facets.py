@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""Tags of every meta, used to count tags inside search results.
+"""
+import heapq
+from array import array
+from collections import Counter
+from itertools import accumulate, chain
+from typing import List, Sequence, Tuple, Union
+
+from omoide import constants
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_index import Index
+from omoide.search_engine.class_search_result import SearchResult
+
+__all__ = [
+    'Facets',
+]
+
+# rows are read one by one in python, for bigger results
+# it is cheaper to intersect bitmaps of the frequent tags
+ROWS_BUDGET = 50_000
+
+# columns of the matrix are kept in arrays or in memory-mapped snapshot
+Vector = Union[array, memoryview]
+
+
+class Facets:
+    """Tags of every meta, used to count tags inside search results.
+
+    Matrix of metas and tags in compressed sparse rows: tag ids of
+    the meta with number N are indices[indptr[N]:indptr[N + 1]].
+    Tag ids are given in order of descending frequency.
+
+    Small results are counted by their rows. For big ones tags are
+    checked from the most frequent, intersecting bitmaps, until
+    total frequency of the tag is too small to get into the top.
+    """
+
+    def __init__(self, tags: Sequence[str], frequencies: Vector,
+                 indptr: Vector, indices: Vector) -> None:
+        """Initialize instance."""
+        self.tags = tags
+        self.frequencies = frequencies
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self) -> int:
+        """Return total amount of tags."""
+        return len(self.tags)
+
+    @classmethod
+    def from_index(cls, index: Index) -> 'Facets':
+        """Create instance from posting lists of the index."""
+        counts = {
+            tag: index.count(tag)
+            for tag in index.by_tags
+            if not constants.IDENTITY_TAG_PATTERN.match(tag)
+        }
+        tags = sorted(counts, key=lambda x: (-counts[x], x))
+        degree = [0] * len(index)
+
+        def get_numbers(tag: str) -> Sequence[int]:
+            """Return all numbers of the tag."""
+            posting = index.by_tags[tag]
+            if isinstance(posting, int):
+                return bitmaps.to_numbers(posting)
+            return posting
+
+        for tag in tags:
+            for number in get_numbers(tag):
+                degree[number] += 1
+
+        indptr = array('I', accumulate(degree, initial=0))
+        indices = array('I', bytes(indptr.itemsize * indptr[-1]))
+        positions = list(indptr[:-1])
+
+        for tag_id, tag in enumerate(tags):
+            for number in get_numbers(tag):
+                indices[positions[number]] = tag_id
+                positions[number] += 1
+
+        return cls(tags=tuple(tags),
+                   frequencies=array('I', (counts[x] for x in tags)),
+                   indptr=indptr,
+                   indices=indices)
+
+    def top(self, index: Index, result: SearchResult,
+            limit: int = constants.FACETS_LIMIT) -> List[Tuple[str, int]]:
+        """Return most frequent tags inside the result.
+
+        Tags that are present in every found record
+        do not narrow the result and are skipped.
+        """
+        total = len(result)
+
+        if not total or not len(self.tags):
+            return []
+
+        average = len(self.indices) / max(len(self.indptr) - 1, 1)
+
+        if total * average <= ROWS_BUDGET:
+            candidates = self._count_rows(result)
+        else:
+            candidates = self._count_bitmaps(index, result.bitmap(),
+                                             total, limit)
+
+        return [
+            (self.tags[tag_id], amount)
+            for tag_id, amount in heapq.nlargest(
+                limit,
+                ((tag_id, amount) for tag_id, amount in candidates
+                 if amount < total),
+                key=lambda x: (x[1], -x[0]),
+            )
+        ]
+
+    def _count_rows(self, result: SearchResult) -> List[Tuple[int, int]]:
+        """Return tag ids and their amounts, reading all rows."""
+        indptr = self.indptr
+        indices = self.indices
+        numbers = result.numbers(slice(None))
+        counter = Counter(chain.from_iterable(
+            indices[indptr[number]:indptr[number + 1]]
+            for number in numbers
+        ))
+        return list(counter.items())
+
+    def _count_bitmaps(self, index: Index, bitmap: int, total: int,
+                       limit: int) -> List[Tuple[int, int]]:
+        """Return tag ids and their amounts for the most frequent tags."""
+        best: List[Tuple[int, int]] = []
+
+        for tag_id, frequency in enumerate(self.frequencies):
+            # tag cannot be found more often than it exists
+            if len(best) == limit and frequency <= best[0][0]:
+                break
+
+            amount = bitmaps.count(bitmap & index.get_by_tag(
+                self.tags[tag_id]
+            ))
+
+            if not amount or amount == total:
+                continue
+
+            if len(best) < limit:
+                heapq.heappush(best, (amount, tag_id))
+            elif amount > best[0][0]:
+                heapq.heapreplace(best, (amount, tag_id))
+
+        return [(tag_id, amount) for amount, tag_id in best]
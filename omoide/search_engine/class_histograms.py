@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""Latency distribution for every search phase.
+"""
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+from omoide import constants
+
+__all__ = [
+    'Histograms',
+]
+
+
+class Histograms:
+    """Latency distribution for every search phase.
+
+    Durations are not stored, only counted in fixed buckets,
+    so memory does not grow with the amount of requests.
+    Quantiles are estimated as upper bounds of the buckets.
+    Requests of different threads count their durations here
+    at the same time, so every change is made under the lock.
+    """
+
+    def __init__(self, bounds: Sequence[float] = constants.TIMING_BUCKETS
+                 ) -> None:
+        """Initialize instance."""
+        self.bounds = tuple(sorted(bounds))
+        self._counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, phases={sorted(self._counts)}>'
+
+    def observe(self, phase: str, duration: float) -> None:
+        """Count single duration of the phase."""
+        bucket = bisect_left(self.bounds, duration)
+
+        with self._lock:
+            counts = self._counts.get(phase)
+
+            if counts is None:
+                # last bucket is for everything slower than the bounds
+                counts = self._counts[phase] = [0] * (len(self.bounds) + 1)
+                self._sums[phase] = 0.0
+
+            counts[bucket] += 1
+            self._sums[phase] += duration
+
+    def _get_counts(self, phase: str) -> List[int]:
+        """Return copy of the bucket counts for the phase."""
+        with self._lock:
+            return list(self._counts.get(phase, ()))
+
+    def total(self, phase: str) -> int:
+        """Return amount of durations counted for the phase."""
+        return sum(self._get_counts(phase))
+
+    def quantile(self, phase: str, fraction: float) -> Optional[float]:
+        """Return upper bound of the duration for given fraction."""
+        return self._quantile(self._get_counts(phase), fraction)
+
+    def _quantile(self, counts: List[int],
+                  fraction: float) -> Optional[float]:
+        """Return upper bound of the duration for given counts."""
+        if not counts:
+            return None
+
+        target = fraction * sum(counts)
+        seen = 0
+        for bound, amount in zip(self.bounds, counts):
+            seen += amount
+            if seen >= target:
+                return bound
+
+        return float('inf')
+
+    def clear(self) -> None:
+        """Forget all counted durations."""
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return current state for monitoring."""
+        with self._lock:
+            all_counts = {phase: list(counts)
+                          for phase, counts in self._counts.items()}
+            sums = dict(self._sums)
+
+        result = {}
+        for phase, counts in sorted(all_counts.items()):
+            total = sum(counts)
+            result[phase] = {
+                'count': total,
+                'mean': round(sums[phase] / total, 6) if total else 0.0,
+                **{
+                    name: _finite(self._quantile(counts, fraction))
+                    for name, fraction in (('p50', 0.5), ('p95', 0.95),
+                                           ('p99', 0.99))
+                },
+                'buckets': {
+                    **{str(bound): amount
+                       for bound, amount in zip(self.bounds, counts)},
+                    'inf': counts[-1],
+                },
+            }
+        return result
+
+
+def _finite(value: Optional[float]) -> Optional[float]:
+    """Return None instead of infinity, which is not valid json."""
+    if value == float('inf'):
+        return None
+    return value
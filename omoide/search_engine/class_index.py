@@ -2,49 +2,302 @@
 
 """Fast search storage.
 """
-from typing import List, FrozenSet, Dict, Set
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import (
+    List, Dict, Collection, Union, Iterable, Mapping, Sequence, FrozenSet,
+    Set, Tuple, Optional, Hashable, Any, TYPE_CHECKING, cast,
+)
+
+from omoide import constants
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_column import Column
+from omoide.search_engine.class_meta_table import MetaTable
+from omoide.search_engine.class_predicate import Predicate
+from omoide.search_engine.class_ranked_bitmap import RankedBitmap
+from omoide.search_engine.class_shallow_meta import ShallowMeta
+
+if TYPE_CHECKING:
+    from omoide.search_engine.class_shards import Shards
 
 __all__ = [
     'ShallowMeta',
+    'Posting',
     'Index',
+    'group_synonyms',
 ]
 
+# tag is stored as bitmap when it covers more than 1/N of all metas,
+# otherwise sorted array of numbers takes less memory
+DENSITY_RATIO = 32
 
-class ShallowMeta:
-    """Typical metarecord, simplified form."""
-    __slots__ = ('uuid', 'number', 'path_to_thumbnail')
+# bitmap or sorted numbers (array or memoryview)
+Posting = Union[int, Sequence[int]]
 
-    def __init__(self, uuid: str, number: str, path_to_thumbnail: str) -> None:
-        """Initialize instance."""
-        self.uuid = uuid
-        self.number = number
-        self.path_to_thumbnail = path_to_thumbnail
 
-    def __eq__(self, other) -> bool:
-        """Return True if object has same uuid."""
-        return self.uuid == other.uuid
+def group_synonyms(groups: Iterable[Collection[str]]
+                   ) -> Dict[str, Tuple[str, ...]]:
+    """Return mapping of every value to its whole synonym group.
+
+    Groups with common values are merged into one.
+    """
+    owners: Dict[str, Set[str]] = {}
+
+    for group in groups:
+        merged = {value.lower() for value in group}
+        for value in list(merged):
+            merged |= owners.get(value, set())
+        for value in merged:
+            owners[value] = merged
+
+    # members of the same group share the same tuple
+    shared: Dict[int, Tuple[str, ...]] = {}
+    result: Dict[str, Tuple[str, ...]] = {}
+    for value, group in owners.items():
+        if len(group) > 1:
+            if id(group) not in shared:
+                shared[id(group)] = tuple(sorted(group))
+            result[value] = shared[id(group)]
 
-    def __hash__(self) -> int:
-        """Return hash of the uuid."""
-        return hash(self.uuid)
+    return result
 
 
 class Index:
     """Fast search storage.
+
+    Every meta is identified by its number (position in all_metas).
+    Each tag holds a posting list of these numbers: a bitmap for
+    frequent tags and a sorted array for the rare ones. All set
+    operations are made over bitmaps.
+
+    Synonyms are not stored in postings, every tag of the query
+    gets expanded into the union of its synonym group instead.
+
+    Words like 'size>5mb' are conditions on numeric attributes,
+    their bitmaps are made from columns of these attributes.
     """
 
-    def __init__(self, all_metas: List[ShallowMeta],
-                 by_tags: Dict[str, FrozenSet[str]]) -> None:
+    def __init__(self, all_metas: Sequence[ShallowMeta],
+                 by_tags: Mapping[str, Collection[int]],
+                 synonyms: Iterable[Collection[str]] = (),
+                 columns: Optional[Mapping[str, Column]] = None) -> None:
         """Initialize instance."""
-        self.all_metas = tuple(all_metas)
-        self.all_uuids = frozenset(x.uuid for x in all_metas)
+        threshold = max(len(all_metas) // DENSITY_RATIO, 1)
+        self._setup(
+            all_metas=MetaTable.from_metas(all_metas),
+            by_tags={
+                tag: self._pack(numbers, threshold)
+                for tag, numbers in by_tags.items()
+            },
+            synonyms=synonyms,
+            columns=columns,
+        )
+
+    def _setup(self, all_metas: Sequence[ShallowMeta],
+               by_tags: Mapping[str, Posting],
+               synonyms: Iterable[Collection[str]],
+               columns: Optional[Mapping[str, Column]]) -> None:
+        """Set inner storages."""
+        self.all_metas = all_metas
+        self.everything = bitmaps.full(len(all_metas))
         self.by_tags = by_tags
-        self.by_uuid = {meta.uuid: meta for meta in all_metas}
+        self.synonyms = group_synonyms(synonyms)
+        self.columns: Mapping[str, Column] = columns or {}
+        self._themes: Dict[str, int] = {}
+        self._masks: 'OrderedDict[FrozenSet[str], int]' = OrderedDict()
+        self._ranked: 'OrderedDict[FrozenSet[str], RankedBitmap]' = \
+            OrderedDict()
+        self._conditions: 'OrderedDict[str, int]' = OrderedDict()
+        self._lock = threading.Lock()
+        # worker processes with parts of this index
+        self.shards: Optional['Shards'] = None
+
+    @classmethod
+    def from_postings(cls, all_metas: Sequence[ShallowMeta],
+                      by_tags: Mapping[str, Posting],
+                      synonyms: Iterable[Collection[str]] = (),
+                      columns: Optional[Mapping[str, Column]] = None
+                      ) -> 'Index':
+        """Create instance from already packed posting lists."""
+        instance = cls.__new__(cls)
+        instance._setup(all_metas, by_tags, synonyms, columns)
+        return instance
 
     def __len__(self) -> int:
         """Return total amount of records."""
         return len(self.all_metas)
 
-    def get_by_tag(self, tag: str) -> Set[str]:
-        """Return UUIDs corresponding to this tag."""
-        return self.by_tags.get(tag, set())
+    @staticmethod
+    def _pack(numbers: Collection[int], threshold: int) -> Posting:
+        """Convert numbers into compact posting list."""
+        if len(numbers) >= threshold:
+            return bitmaps.from_numbers(numbers)
+        return array('I', sorted(numbers))
+
+    def compact(self) -> 'Index':
+        """Return plain index with the same contents."""
+        return self
+
+    def get_shard(self, start: int, stop: int) -> 'Index':
+        """Return index of metas with numbers from start to stop.
+
+        Numbers in the shard start from zero. Metas themselves are
+        not copied, shard is used only to compute bitmaps.
+        """
+        mask = bitmaps.full(stop - start)
+        by_tags: Dict[str, Posting] = {}
+
+        for tag, posting in self.by_tags.items():
+            if isinstance(posting, int):
+                by_tags[tag] = (posting >> start) & mask
+            else:
+                low = bisect_left(posting, start)
+                high = bisect_left(posting, stop, lo=low)
+                by_tags[tag] = array('I', (number - start
+                                           for number in posting[low:high]))
+
+        return Index.from_postings(
+            all_metas=cast(Sequence[ShallowMeta], range(start, stop)),
+            by_tags=by_tags,
+            synonyms=self.synonyms.values(),
+            columns={
+                name: column.get_part(start, stop)
+                for name, column in self.columns.items()
+            },
+        )
+
+    def get_by_tag(self, tag: str) -> int:
+        """Return bitmap of metas corresponding to this tag."""
+        posting = self.by_tags.get(tag)
+
+        if posting is None:
+            return self._get_by_condition(tag)
+
+        if isinstance(posting, int):
+            return posting
+
+        return bitmaps.from_numbers(posting)
+
+    def _get_column(self, tag: str) -> Tuple[Optional[Column],
+                                             Optional[Predicate]]:
+        """Return column and predicate for the condition word."""
+        if not self.columns:
+            return None, None
+
+        predicate = Predicate.parse(tag)
+
+        if predicate is None:
+            return None, None
+
+        return self.columns.get(predicate.column), predicate
+
+    def _get_by_condition(self, tag: str) -> int:
+        """Return bitmap of metas matching the condition word."""
+        column, predicate = self._get_column(tag)
+
+        if column is None or predicate is None:
+            return bitmaps.EMPTY
+
+        bitmap = self._recall(self._conditions, tag)
+
+        if bitmap is None:
+            bitmap = column.select(predicate)
+            self._remember(self._conditions, tag, bitmap)
+
+        return bitmap
+
+    def expand(self, tag: str) -> Tuple[str, ...]:
+        """Return tag itself followed by all of its synonyms."""
+        group = self.synonyms.get(tag)
+
+        if group is None:
+            return (tag,)
+
+        return (tag, *(x for x in group if x != tag))
+
+    def count(self, tag: str) -> int:
+        """Return amount of metas corresponding to this tag."""
+        posting = self.by_tags.get(tag)
+
+        if posting is None:
+            column, predicate = self._get_column(tag)
+            if column is None or predicate is None:
+                return 0
+            return column.count(predicate)
+
+        if isinstance(posting, int):
+            return bitmaps.count(posting)
+
+        return len(posting)
+
+    def get_theme(self, theme_uuid: str) -> int:
+        """Return bitmap of metas in this theme."""
+        bitmap = self._themes.get(theme_uuid)
+
+        if bitmap is None:
+            bitmap = self.get_by_tag(theme_uuid)
+            self._themes[theme_uuid] = bitmap
+
+        return bitmap
+
+    def _recall(self, storage: OrderedDict, key: Hashable) -> Any:
+        """Return stored value and mark it as recently used."""
+        with self._lock:
+            value = storage.get(key)
+            if value is not None:
+                storage.move_to_end(key)
+            return value
+
+    def _remember(self, storage: OrderedDict, key: Hashable,
+                  value: Any) -> None:
+        """Store value, dropping least recently used ones."""
+        with self._lock:
+            storage[key] = value
+            while len(storage) > constants.THEMES_MASKS_CACHE_SIZE:
+                storage.popitem(last=False)
+
+    def get_themes_mask(self, active_themes: Collection[str]) -> int:
+        """Return bitmap of metas in any of given themes.
+
+        Combined masks for recent theme selections are stored,
+        so usually it is just a lookup.
+        """
+        key = frozenset(active_themes)
+        mask = self._recall(self._masks, key)
+
+        if mask is None:
+            mask = bitmaps.EMPTY
+            for theme_uuid in key:
+                mask |= self.get_theme(theme_uuid)
+            self._remember(self._masks, key, mask)
+
+        return mask
+
+    def get_candidates(self, active_themes: Optional[Collection[str]]
+                       ) -> Sequence[int]:
+        """Return numbers of metas in any of given themes.
+
+        Numbers can be accessed by their position without
+        unpacking the whole mask. Unknown themes do not limit
+        anything.
+        """
+        if not active_themes:
+            return range(len(self))
+
+        key = frozenset(active_themes)
+        candidates = self._recall(self._ranked, key)
+
+        if candidates is None:
+            mask = self.get_themes_mask(key)
+            if not mask:
+                return range(len(self))
+            candidates = RankedBitmap(mask)
+            self._remember(self._ranked, key, candidates)
+
+        return candidates
+
+    def resolve(self, numbers: Iterable[int]) -> List[ShallowMeta]:
+        """Return metas for given numbers."""
+        return [self.all_metas[number] for number in numbers]
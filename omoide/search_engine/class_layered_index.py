@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+"""Index made of the base and changes on top of it.
+"""
+from array import array
+from typing import (
+    Any, Collection, Dict, Iterable, Iterator, List, Mapping, Optional,
+    Sequence, Union, overload,
+)
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_column import Column
+from omoide.search_engine.class_delta import Delta
+from omoide.search_engine.class_index import Index, ShallowMeta, Posting
+from omoide.search_engine.class_predicate import Predicate
+from omoide.search_engine.class_ranked_bitmap import RankedBitmap
+
+__all__ = [
+    'LayeredIndex',
+]
+
+
+class LayeredIndex(Index):
+    """Index made of the base and changes on top of it.
+
+    Base is never modified. Added metas get numbers after the last
+    one of the base, so posting lists of the delta are just shifted
+    and joined with the base ones. Removed metas are excluded from
+    'everything', every search starts from it, so they never get
+    into results. Counts of tags still include removed metas, they
+    are used only for planning.
+
+    Delta can be put on top of another layered index, compaction
+    merges all of them into the new plain index. Metas of the plain
+    index are ordered as a full rebuild would order them.
+    """
+
+    def __init__(self, base: Index, delta: Delta) -> None:
+        """Initialize instance."""
+        # pylint: disable=super-init-not-called
+        offset = len(base)
+        self.base = base
+        self.delta = delta
+
+        added = [
+            ShallowMeta(meta.uuid, offset + position, meta.path_to_thumbnail)
+            for position, meta in enumerate(delta.all_metas)
+        ]
+
+        synonyms: Iterable[Collection[str]]
+        if delta.synonyms is None:
+            synonyms = set(base.synonyms.values())
+        else:
+            synonyms = delta.synonyms
+
+        self._setup(
+            all_metas=_LayeredMetas(base.all_metas, added),
+            by_tags=_LayeredTags(base.by_tags, delta.by_tags, offset),
+            synonyms=synonyms,
+            columns={
+                name: _LayeredColumn(column, delta.columns.get(name),
+                                     offset)
+                for name, column in base.columns.items()
+            },
+        )
+        # metas removed by lower layers stay removed
+        self.everything = (
+            base.everything | (self.everything >> offset << offset)
+        ) & ~bitmaps.from_numbers(delta.removed)
+        self.removed = bitmaps.full(len(self)) & ~self.everything
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, n={len(self)}, {self.delta!r}>'
+
+    def get_theme(self, theme_uuid: str) -> int:
+        """Return bitmap of metas in this theme."""
+        bitmap = self._themes.get(theme_uuid)
+
+        if bitmap is None:
+            bitmap = self.get_by_tag(theme_uuid) & self.everything
+            self._themes[theme_uuid] = bitmap
+
+        return bitmap
+
+    def get_candidates(self, active_themes: Optional[Collection[str]]
+                       ) -> Sequence:
+        """Return numbers of metas in any of given themes."""
+        candidates = super().get_candidates(active_themes)
+
+        if not self.removed or not isinstance(candidates, range):
+            return candidates
+
+        # plain range would include removed metas
+        key: frozenset = frozenset()
+        candidates = self._recall(self._ranked, key)
+
+        if candidates is None:
+            candidates = RankedBitmap(self.everything)
+            self._remember(self._ranked, key, candidates)
+
+        return candidates
+
+    def get_order(self) -> List[int]:
+        """Return numbers of live metas in the order of full rebuild."""
+        base_order: Sequence[int]
+        if isinstance(self.base, LayeredIndex):
+            base_order = self.base.get_order()
+        else:
+            base_order = range(len(self.base))
+
+        removed = set(self.delta.removed)
+        kept = [number for number in base_order if number not in removed]
+        offset = len(self.base)
+        added = range(offset, offset + len(self.delta.all_metas))
+        positions = self.delta.positions
+        total = len(kept) + len(added)
+
+        if positions is None or len(positions) != len(added) \
+                or len(set(positions)) != len(positions) \
+                or any(not 0 <= x < total for x in positions):
+            # order is unknown, added metas go last
+            return [*kept, *added]
+
+        order: List[Optional[int]] = [None] * total
+        for position, number in zip(positions, added):
+            order[position] = number
+
+        remaining = iter(kept)
+        return [next(remaining) if number is None else number
+                for number in order]
+
+    def compact(self) -> Index:
+        """Return plain index with the same contents."""
+        live = self.get_order()
+        renumber = array('I', bytes(4 * len(self)))
+        for position, number in enumerate(live):
+            renumber[number] = position
+
+        all_metas = []
+        for position, number in enumerate(live):
+            meta = self.all_metas[number]
+            all_metas.append(ShallowMeta(meta.uuid, position,
+                                         meta.path_to_thumbnail))
+
+        by_tags = {}
+        for tag in self.by_tags:
+            numbers = bitmaps.to_numbers(self.get_by_tag(tag)
+                                         & self.everything)
+            if numbers:
+                by_tags[tag] = sorted(renumber[number] for number in numbers)
+
+        return Index(all_metas=all_metas,
+                     by_tags=by_tags,
+                     synonyms=set(self.synonyms.values()),
+                     columns={
+                         name: column.compact(live)
+                         for name, column in self.columns.items()
+                     })
+
+
+class _LayeredMetas(Sequence[ShallowMeta]):
+    """Metas of the base followed by added ones."""
+
+    def __init__(self, base: Sequence[ShallowMeta],
+                 added: List[ShallowMeta]) -> None:
+        """Initialize instance."""
+        self._base = base
+        self._added = added
+        self._offset = len(base)
+
+    def __len__(self) -> int:
+        """Return total amount of metas."""
+        return self._offset + len(self._added)
+
+    @overload
+    def __getitem__(self, item: int) -> ShallowMeta:
+        ...
+
+    @overload
+    def __getitem__(self, item: slice) -> List[ShallowMeta]:
+        ...
+
+    def __getitem__(self, item: Union[int, slice]
+                    ) -> Union[ShallowMeta, List[ShallowMeta]]:
+        """Return meta by its number."""
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+
+        if item < 0:
+            item += len(self)
+
+        if 0 <= item < self._offset:
+            return self._base[item]
+
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+
+        return self._added[item - self._offset]
+
+
+class _LayeredTags(Mapping[str, Posting]):
+    """Posting lists of the base joined with shifted ones of the delta."""
+
+    def __init__(self, base: Mapping[str, Posting],
+                 added: Dict[str, List[int]], offset: int) -> None:
+        """Initialize instance."""
+        self._base = base
+        self._added = added
+        self._offset = offset
+        self._new_tags = sorted(tag for tag in added if tag not in base)
+
+    def __getitem__(self, tag: str) -> Posting:
+        """Return posting list of the tag."""
+        numbers = self._added.get(tag)
+        posting = self._base.get(tag)
+
+        if numbers is None:
+            if posting is None:
+                raise KeyError(tag)
+            return posting
+
+        shifted = [self._offset + number for number in numbers]
+
+        if posting is None:
+            return array('I', shifted)
+
+        if isinstance(posting, int):
+            return posting | bitmaps.from_numbers(shifted)
+
+        # added numbers are always bigger, so order is kept
+        return array('I', [*posting, *shifted])
+
+    def __contains__(self, tag) -> bool:
+        """Return True if tag is known."""
+        return tag in self._added or tag in self._base
+
+    def __len__(self) -> int:
+        """Return total amount of tags."""
+        return len(self._base) + len(self._new_tags)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over all tags."""
+        yield from self._base
+        yield from self._new_tags
+
+
+class _LayeredColumn(Column):
+    """Numeric attribute of the base and added metas."""
+
+    def __init__(self, base: Column, added: Optional[Column],
+                 offset: int) -> None:
+        """Initialize instance."""
+        # pylint: disable=super-init-not-called
+        self._base = base
+        self._added = added
+        self._offset = offset
+        self.labels = base.labels
+
+    def __len__(self) -> int:
+        """Return total amount of values."""
+        return self._offset + (len(self._added) if self._added else 0)
+
+    def count(self, predicate: Predicate) -> int:
+        """Return amount of metas matching the predicate."""
+        total = self._base.count(predicate)
+        if self._added is not None:
+            total += self._added.count(predicate)
+        return total
+
+    def select(self, predicate: Predicate) -> int:
+        """Return bitmap of metas matching the predicate."""
+        bitmap = self._base.select(predicate)
+        if self._added is not None:
+            bitmap |= self._added.select(predicate) << self._offset
+        return bitmap
+
+    def get_value(self, number: int) -> Any:
+        """Return value of the meta, labels are returned as text."""
+        if number < self._offset:
+            return self._base.get_value(number)
+
+        if self._added is None:
+            # delta had no such attribute
+            return '' if self.labels else 0
+
+        return self._added.get_value(number - self._offset)
+
+    @property
+    def typecode(self) -> str:
+        """Return type of the stored values."""
+        return self._base.typecode
+
+    def compact(self, numbers: Sequence[int]) -> Column:
+        """Return plain column for given metas."""
+        values = [self.get_value(number) for number in numbers]
+
+        if not self.labels and not (self._added and self._added.labels):
+            return Column.from_values(self.typecode, values)
+
+        labels = list(self.labels)
+        codes = {label: code for code, label in enumerate(labels)}
+        for value in values:
+            if value not in codes:
+                codes[value] = len(labels)
+                labels.append(value)
+
+        return Column.from_values(self.typecode,
+                                  [codes[value] for value in values],
+                                  labels=tuple(labels))
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""Compact storage of all metas.
+"""
+import re
+import uuid as uuid_module
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple, Union, overload
+
+from omoide.search_engine.class_shallow_meta import ShallowMeta
+
+__all__ = [
+    'MetaTable',
+]
+
+# 'm_' + canonical uuid, so it can be stored as 16 bytes
+UUID_PATTERN = re.compile(
+    r'^(?P<prefix>[a-z]_)(?P<uuid>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}'
+    r'-[0-9a-f]{4}-[0-9a-f]{12})$'
+)
+
+UUID_SIZE = 16
+
+
+class MetaTable(Sequence[ShallowMeta]):
+    """Compact storage of all metas.
+
+    Number of the meta is its position, so it is not stored.
+    Uuids are kept as 16 raw bytes each. Thumbnail path is usually
+    '{folder}{uuid}{extension}', where folder is shared by the whole
+    group, so only ids of the folder and extension are kept.
+    Everything, that does not fit into this layout, is stored
+    as it is.
+
+    Metas are created only when requested.
+    """
+
+    def __init__(self, uuids: bytes, kinds: array, folders: array,
+                 extensions: array, names: Tuple[str, ...],
+                 irregular: Dict[int, Tuple[str, str]]) -> None:
+        """Initialize instance."""
+        self._uuids = uuids
+        self._kinds = kinds
+        self._folders = folders
+        self._extensions = extensions
+        self._names = names
+        self._irregular = irregular
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, n={len(self)}>'
+
+    def __len__(self) -> int:
+        """Return total amount of metas."""
+        return len(self._kinds)
+
+    @classmethod
+    def from_metas(cls, metas: Iterable[ShallowMeta]) -> 'MetaTable':
+        """Create instance from metas, ordered by number."""
+        uuids = bytearray()
+        kinds = array('H')
+        folders = array('I')
+        extensions = array('H')
+        names: Dict[str, int] = {}
+        irregular: Dict[int, Tuple[str, str]] = {}
+
+        def get_id(name: str) -> int:
+            """Return id of the repeating string."""
+            value = names.get(name)
+            if value is None:
+                value = names[name] = len(names)
+            return value
+
+        for number, meta in enumerate(metas):
+            match = UUID_PATTERN.match(meta.uuid)
+            path = meta.path_to_thumbnail
+            bare_uuid = match.group('uuid') if match else ''
+            position = path.rfind(bare_uuid) if bare_uuid else -1
+
+            if match is None or position < 0:
+                irregular[number] = (meta.uuid, path)
+                uuids.extend(bytes(UUID_SIZE))
+                kinds.append(0)
+                folders.append(0)
+                extensions.append(0)
+                continue
+
+            uuids.extend(uuid_module.UUID(bare_uuid).bytes)
+            kinds.append(get_id(match.group('prefix')))
+            folders.append(get_id(path[:position]))
+            extensions.append(get_id(path[position + len(bare_uuid):]))
+
+        return cls(uuids=bytes(uuids),
+                   kinds=kinds,
+                   folders=folders,
+                   extensions=extensions,
+                   names=tuple(names),
+                   irregular=irregular)
+
+    @overload
+    def __getitem__(self, item: int) -> ShallowMeta:
+        ...
+
+    @overload
+    def __getitem__(self, item: slice) -> List[ShallowMeta]:
+        ...
+
+    def __getitem__(self, item: Union[int, slice]
+                    ) -> Union[ShallowMeta, List[ShallowMeta]]:
+        """Return meta by its number."""
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+
+        if item < 0:
+            item += len(self)
+
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+
+        irregular = self._irregular.get(item)
+
+        if irregular is not None:
+            return ShallowMeta(irregular[0], item, irregular[1])
+
+        raw = self._uuids[item * UUID_SIZE:(item + 1) * UUID_SIZE]
+        bare_uuid = str(uuid_module.UUID(bytes=raw))
+        return ShallowMeta(
+            uuid=self._names[self._kinds[item]] + bare_uuid,
+            number=item,
+            path_to_thumbnail=(self._names[self._folders[item]]
+                               + bare_uuid
+                               + self._names[self._extensions[item]]),
+        )
+
+    def get_size(self) -> int:
+        """Return approximate amount of memory in bytes."""
+        return (len(self._uuids)
+                + self._kinds.itemsize * len(self._kinds)
+                + self._folders.itemsize * len(self._folders)
+                + self._extensions.itemsize * len(self._extensions)
+                + sum(len(name) for name in self._names)
+                + sum(len(uuid) + len(path)
+                      for uuid, path in self._irregular.values()))
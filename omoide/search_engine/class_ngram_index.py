@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""Lookup of similar tags for misspelled words.
+"""
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain
+from typing import Collection, Dict, List, Optional, Sequence, Set, Tuple
+
+from omoide import constants
+
+__all__ = [
+    'NgramIndex',
+    'edit_distance',
+]
+
+GRAM_SIZE = 3
+PADDING = '#' * (GRAM_SIZE - 1)
+
+# how many candidates are checked with edit distance
+MAX_CANDIDATES = 32
+
+
+def get_grams(word: str) -> Set[str]:
+    """Return character trigrams of the word.
+
+    >>> sorted(get_grams('cat'))
+    ['##c', '#ca', 'at#', 'cat', 't##']
+    """
+    padded = PADDING + word + PADDING
+    return {padded[i:i + GRAM_SIZE]
+            for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+def edit_distance(first: str, second: str, limit: int) -> int:
+    """Return edit distance or limit + 1 if it is bigger.
+
+    Swap of two adjacent characters counts as one edit.
+
+    >>> edit_distance('kitten', 'sitting', 5)
+    3
+    >>> edit_distance('kitten', 'sitting', 1)
+    2
+    >>> edit_distance('muose', 'mouse', 5)
+    1
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+
+    older: List[int] = []
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, start=1):
+        current = [i]
+        for j, second_char in enumerate(second, start=1):
+            value = min(previous[j] + 1,
+                        current[j - 1] + 1,
+                        previous[j - 1] + (first_char != second_char))
+            if (i > 1 and j > 1 and first_char == second[j - 2]
+                    and first[i - 2] == second_char):
+                value = min(value, older[j - 2] + 1)
+            current.append(value)
+
+        if min(current) > limit:
+            return limit + 1
+        older, previous = previous, current
+
+    return min(previous[-1], limit + 1)
+
+
+class NgramIndex:
+    """Lookup of similar tags for misspelled words.
+
+    Every tag is split into character trigrams, each trigram keeps
+    sorted array of tags that have it. One edit changes only a few
+    trigrams, so similar tag must share most of them with the word.
+    Candidates are collected only from the rarest trigrams of the word
+    and then verified with bounded edit distance.
+
+    Synonyms have no postings of their own, but they are
+    known words too and can be suggested as well.
+    """
+
+    def __init__(self, known: Collection[str],
+                 synonyms: Collection[str] = (),
+                 max_distance: int = constants.TYPO_MAX_DISTANCE) -> None:
+        """Initialize instance."""
+        self.max_distance = max_distance
+        self._known = known
+        self._synonyms = synonyms
+        self._tags: Tuple[str, ...] = tuple(sorted({
+            tag for tag in chain(known, synonyms)
+            if not constants.IDENTITY_TAG_PATTERN.match(tag)
+        }))
+
+        grams: Dict[str, List[int]] = defaultdict(list)
+        for position, tag in enumerate(self._tags):
+            for gram in get_grams(tag):
+                grams[gram].append(position)
+
+        self._grams = {
+            gram: array('I', positions)
+            for gram, positions in grams.items()
+        }
+
+    def __len__(self) -> int:
+        """Return total amount of tags."""
+        return len(self._tags)
+
+    def _get_limit(self, word: str) -> int:
+        """Return allowed amount of edits for this word."""
+        # short words are turning into something else too easily
+        return min(self.max_distance, max(len(word) - 2, 0) // 2)
+
+    def closest(self, word: str) -> Optional[str]:
+        """Return most similar known tag or None."""
+        limit = self._get_limit(word)
+
+        if not limit:
+            return None
+
+        grams = sorted(get_grams(word),
+                       key=lambda x: len(self._grams.get(x, ())))
+        # one edit changes up to GRAM_SIZE grams, swap changes one more
+        required = max(len(grams) - (GRAM_SIZE + 1) * limit, 1)
+
+        # tag that shares at least required grams must share
+        # at least one of the rarest (total - required + 1) grams
+        shared: Dict[int, int] = defaultdict(int)
+        rare_amount = len(grams) - required + 1
+
+        for gram in grams[:rare_amount]:
+            for position in self._grams.get(gram, ()):
+                shared[position] += 1
+
+        for gram in grams[rare_amount:]:
+            positions = self._grams.get(gram, ())
+            if len(positions) > len(shared):
+                for position in shared:
+                    # this gram is frequent, cheaper to check candidates
+                    if _contains(positions, position):
+                        shared[position] += 1
+            else:
+                for position in positions:
+                    if position in shared:
+                        shared[position] += 1
+
+        candidates = sorted(
+            (position for position, amount in shared.items()
+             if amount >= required),
+            key=lambda x: -shared[x],
+        )[:MAX_CANDIDATES]
+
+        best = None
+        best_key = None
+        for position in candidates:
+            tag = self._tags[position]
+            distance = edit_distance(word, tag, limit)
+            key = (distance, -shared[position], tag)
+            if distance <= limit and (best_key is None or key < best_key):
+                best = tag
+                best_key = key
+
+        return best
+
+    def resolve(self, word: str) -> Optional[str]:
+        """Return replacement for unknown word or None."""
+        if word in self._known or word in self._synonyms:
+            return None
+        return self.closest(word)
+
+
+def _contains(numbers: Sequence[int], number: int) -> bool:
+    """Return True if sorted array contains number."""
+    position = bisect_left(numbers, number)
+    return position < len(numbers) and numbers[position] == number
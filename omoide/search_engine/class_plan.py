@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""Execution plan for the search query.
+"""
+from typing import (
+    Collection, Iterator, List, Optional, Sequence, Set, Dict,
+)
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_expression import Expression, Operand
+from omoide.search_engine.class_index import Index
+from omoide.search_engine.class_query import Query
+
+__all__ = [
+    'Step',
+    'Plan',
+]
+
+
+class Step:
+    """Single set operation of the plan.
+
+    Union of the step tags gets intersected with the working set,
+    or subtracted from it for the 'not' operator. For the single
+    query word tags are the word itself and all its synonyms.
+    Nested groups of the query are kept as separate plans.
+    """
+    __slots__ = ('operator', 'tags', 'estimate', 'groups')
+
+    def __init__(self, operator: str, tags: Sequence[str],
+                 estimate: int, groups: Sequence['Plan'] = ()) -> None:
+        """Initialize instance."""
+        self.operator = operator
+        self.tags = tuple(tags)
+        self.estimate = estimate
+        self.groups = tuple(groups)
+
+    def __str__(self) -> str:
+        """Return textual representation."""
+        if self.operator in ('and', 'not') and not self.groups:
+            synonyms = f'+{len(self.tags) - 1}' if len(self.tags) > 1 else ''
+            return (f'{self.operator} {self.tags[0]!r}{synonyms}'
+                    f' ~{self.estimate}')
+
+        if self.operator in ('and', 'not') and not self.tags \
+                and len(self.groups) == 1:
+            return f'{self.operator} [{self.groups[0]}] ~{self.estimate}'
+
+        total = len(self.tags) + len(self.groups)
+        return f'{self.operator} ({total}) ~{self.estimate}'
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, {self}>'
+
+    def get_bitmap(self, index: Index) -> int:
+        """Return union of all step tags and groups."""
+        if self.operator == 'themes':
+            return index.get_themes_mask(self.tags)
+
+        result = bitmaps.EMPTY
+        for tag in self.tags:
+            result |= index.get_by_tag(tag)
+
+        for group in self.groups:
+            result |= group.evaluate(index)
+
+        return result
+
+    def apply(self, index: Index, target: int) -> int:
+        """Return working set after this step."""
+        if self.operator == 'not':
+            return target & ~self.get_bitmap(index)
+        return target & self.get_bitmap(index)
+
+
+class Plan:
+    """Ordered sequence of set operations for the query.
+
+    Posting list sizes are used to put the most selective
+    intersections first, so the working set gets small (or empty)
+    as fast as possible. Subtractions are always made last.
+    Every word of the query is expanded with its synonyms.
+
+    Nested groups are compiled into their own plans. Equal groups
+    share the same plan, that is evaluated only once, and groups
+    that could not find anything are thrown away in advance.
+    """
+
+    def __init__(self, steps: List[Step], estimate: int) -> None:
+        """Initialize instance."""
+        self.steps = steps
+        self.estimate = estimate
+        self._result: Optional[int] = None
+
+    def __iter__(self) -> Iterator[Step]:
+        """Iterate over steps."""
+        return iter(self.steps)
+
+    def __len__(self) -> int:
+        """Return total amount of steps."""
+        return len(self.steps)
+
+    def __str__(self) -> str:
+        """Return textual representation."""
+        return ' -> '.join(str(step) for step in self.steps)
+
+    def evaluate(self, index: Index) -> int:
+        """Return bitmap of all metas, matching this plan."""
+        if self._result is None:
+            target = index.everything
+            for step in self.steps:
+                if not target:
+                    break
+                target = step.apply(index, target)
+            self._result = target
+        return self._result
+
+    @staticmethod
+    def _make_union(operator: str, words: Collection[str],
+                    index: Index) -> Step:
+        """Return step for union of words and their synonyms.
+
+        Unknown tags are skipped, step without any known tag
+        gets zero estimate.
+        """
+        counts = {
+            tag: index.count(tag)
+            for word in sorted(words)
+            for tag in index.expand(word)
+        }
+        found = [tag for tag, amount in counts.items() if amount]
+
+        if not found:
+            return Step(operator, sorted(words), 0)
+
+        estimate = min(sum(counts.values()), len(index))
+        return Step(operator, found, estimate)
+
+    @classmethod
+    def _make_group(cls, expression: Expression, index: Index,
+                    compiled: Dict[Expression, 'Plan']) -> 'Plan':
+        """Return plan for nested group, reusing equal ones."""
+        plan = compiled.get(expression)
+
+        if plan is None:
+            plan = cls.compile(expression, index, None, compiled)
+            compiled[expression] = plan
+
+        return plan
+
+    @classmethod
+    def _make_step(cls, operator: str, operand: Operand, index: Index,
+                   compiled: Dict[Expression, 'Plan']) -> Optional[Step]:
+        """Return step for single operand or None if it changes nothing."""
+        if isinstance(operand, str):
+            return cls._make_union(operator, [operand], index)
+
+        plan = cls._make_group(operand, index, compiled)
+
+        # group without steps matches everything
+        if not plan.steps:
+            if operator == 'and':
+                return None
+            return Step(operator, [], len(index), [plan])
+
+        if not plan.estimate:
+            return Step(operator, [], 0)
+
+        # plain union does not need separate plan
+        first = plan.steps[0]
+        if len(plan.steps) == 1 and first.operator == 'or' \
+                and not first.groups:
+            return Step(operator, first.tags, first.estimate)
+
+        return Step(operator, [], plan.estimate, [plan])
+
+    @classmethod
+    def _make_or(cls, operands: Collection[Operand], index: Index,
+                 compiled: Dict[Expression, 'Plan']) -> Optional[Step]:
+        """Return step for union of all operands or None."""
+        words = [x for x in operands if isinstance(x, str)]
+        groups = [
+            cls._make_group(x, index, compiled)
+            for x in sorted(operands, key=str)
+            if isinstance(x, Expression)
+        ]
+
+        # union with everything does not limit anything
+        if any(not plan.steps for plan in groups):
+            return None
+
+        step = cls._make_union('or', words, index)
+        groups = [plan for plan in groups if plan.estimate]
+
+        if not groups:
+            return step if step.estimate else None
+
+        tags = step.tags if step.estimate else ()
+        estimate = min(step.estimate + sum(x.estimate for x in groups),
+                       len(index))
+        return Step('or', tags, estimate, groups)
+
+    @classmethod
+    def build(cls, query: Query, index: Index,
+              active_themes: Optional[Set[str]]) -> 'Plan':
+        """Create plan for given query."""
+        return cls.compile(query.expression, index, active_themes)
+
+    @classmethod
+    def compile(cls, expression: Expression, index: Index,
+                active_themes: Optional[Set[str]] = None,
+                compiled: Optional[Dict[Expression, 'Plan']] = None
+                ) -> 'Plan':
+        """Create plan for given expression."""
+        if compiled is None:
+            compiled = {}
+
+        made = [
+            cls._make_step('and', operand, index, compiled)
+            for operand in sorted(expression.and_, key=str)
+        ]
+        intersections = [x for x in made if x is not None]
+
+        if active_themes:
+            mask = index.get_themes_mask(active_themes)
+            if mask:
+                intersections.append(Step('themes', sorted(active_themes),
+                                          bitmaps.count(mask)))
+
+        # unions without any known tag do not limit anything
+        step = cls._make_or(expression.or_, index, compiled)
+        if step is not None:
+            intersections.append(step)
+
+        intersections.sort(key=lambda x: x.estimate)
+
+        made = [
+            cls._make_step('not', operand, index, compiled)
+            for operand in sorted(expression.not_, key=str)
+        ]
+        subtractions = [x for x in made if x is not None and x.estimate]
+        subtractions.sort(key=lambda x: x.estimate, reverse=True)
+
+        estimate = min((x.estimate for x in intersections),
+                       default=len(index))
+        return cls(intersections + subtractions, estimate)
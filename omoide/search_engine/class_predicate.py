@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""Condition on numeric attribute of the meta.
+"""
+import re
+from typing import Optional, Tuple, Union
+
+__all__ = [
+    'Predicate',
+    'ATTRIBUTES',
+]
+
+Value = Union[int, float, str]
+
+# name in query -> name of the column and kind of the value
+ATTRIBUTES = {
+    'size': ('size', 'size'),
+    'width': ('width', 'number'),
+    'height': ('height', 'number'),
+    'resolution': ('resolution', 'number'),
+    'mp': ('resolution', 'number'),
+    'ratio': ('ratio', 'number'),
+    'date': ('date', 'date'),
+    'type': ('type', 'label'),
+}
+
+PATTERN = re.compile(r'^(?P<name>[a-z]+)(?P<operator>>=|<=|>|<|=|:)'
+                     r'(?P<value>\S+)$')
+SIZE_PATTERN = re.compile(r'^(?P<amount>\d+(?:\.\d+)?)(?P<unit>[kmgt]?i?b)?$')
+DATE_PATTERN = re.compile(r'^(?P<year>\d{4})(?:-(?P<month>\d{1,2}))?'
+                          r'(?:-(?P<day>\d{1,2}))?$')
+
+UNITS = {'b': 1, 'kb': 1024, 'mb': 1024 ** 2,
+         'gb': 1024 ** 3, 'tb': 1024 ** 4}
+
+
+class Predicate:
+    """Condition on numeric attribute of the meta.
+
+    Every value in the query means some interval: date '2019' means
+    the whole year, so 'date>2019' starts from the next one.
+    Dates are compared as numbers like 20190131.
+    """
+    __slots__ = ('column', 'low', 'high', 'include_low', 'include_high')
+
+    def __init__(self, column: str,
+                 low: Optional[Value] = None,
+                 high: Optional[Value] = None,
+                 include_low: bool = True,
+                 include_high: bool = True) -> None:
+        """Initialize instance."""
+        self.column = column
+        self.low = low
+        self.high = high
+        self.include_low = include_low
+        self.include_high = include_high
+
+    def __eq__(self, other) -> bool:
+        """Return True if predicates are the same."""
+        if not isinstance(other, Predicate):
+            return NotImplemented
+        return all(getattr(self, x) == getattr(other, x)
+                   for x in self.__slots__)
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        left = '[' if self.include_low else '('
+        right = ']' if self.include_high else ')'
+        return (f'<{type(self).__name__}, {self.column} '
+                f'{left}{self.low}, {self.high}{right}>')
+
+    @classmethod
+    def parse(cls, word: str) -> Optional['Predicate']:
+        """Make predicate from query word like 'size>5mb' or None."""
+        match = PATTERN.match(word.lower())
+
+        if match is None or match.group('name') not in ATTRIBUTES:
+            return None
+
+        column, kind = ATTRIBUTES[match.group('name')]
+        operator = match.group('operator')
+        value = match.group('value')
+
+        try:
+            if operator in (':', '=') and '..' in value:
+                first, last = value.split('..', 1)
+                low = _parse_value(kind, first)[0] if first else None
+                high = _parse_value(kind, last)[1] if last else None
+                if kind == 'label' or (low is None and high is None):
+                    return None
+                return cls(column, low=low, high=high)
+
+            start, end = _parse_value(kind, value)
+        except ValueError:
+            return None
+
+        if operator in (':', '='):
+            return cls(column, low=start, high=end)
+
+        if kind == 'label':
+            return None
+
+        if operator == '>':
+            return cls(column, low=end, include_low=False)
+
+        if operator == '>=':
+            return cls(column, low=start)
+
+        if operator == '<':
+            return cls(column, high=start, include_high=False)
+
+        return cls(column, high=end)
+
+
+def _parse_value(kind: str, value: str) -> Tuple[Value, Value]:
+    """Return first and last values of the interval."""
+    if kind == 'label':
+        return value, value
+
+    if kind == 'date':
+        match = DATE_PATTERN.match(value)
+
+        if match is None:
+            raise ValueError(value)
+
+        year = int(match.group('year')) * 10000
+        month = match.group('month')
+        day = match.group('day')
+
+        if month is None:
+            return year + 101, year + 1231
+
+        year += int(month) * 100
+
+        if day is None:
+            return year + 1, year + 31
+
+        return year + int(day), year + int(day)
+
+    if kind == 'size':
+        match = SIZE_PATTERN.match(value)
+
+        if match is None:
+            raise ValueError(value)
+
+        unit = (match.group('unit') or 'b').replace('i', '')
+        amount = int(float(match.group('amount')) * UNITS[unit])
+        return amount, amount
+
+    number = float(value)
+    if number.is_integer() and '.' not in value:
+        number = int(number)
+    return number, number
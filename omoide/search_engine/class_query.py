@@ -3,9 +3,12 @@
 """Fully processed user search request.
 """
 from itertools import chain
-from typing import Collection, Dict, List, FrozenSet, Tuple
+from typing import Collection, Dict, List, FrozenSet, Tuple, Optional
 
 from omoide import constants
+from omoide.search_engine.class_expression import (
+    Expression, GROUP_START, GROUP_END,
+)
 
 
 class Query:
@@ -15,18 +18,43 @@ class Query:
                  and_: Collection[str],
                  or_: Collection[str],
                  not_: Collection[str],
-                 sequence: List[Tuple[str, str]]) -> None:
+                 sequence: List[Tuple[str, str]],
+                 corrections: Optional[Dict[str, str]] = None) -> None:
         """Initialize instance."""
         self.and_: FrozenSet[str] = frozenset(and_)
         self.or_: FrozenSet[str] = frozenset(or_)
         self.not_: FrozenSet[str] = frozenset(not_)
         self.sequence: Tuple[Tuple[str, str], ...] = tuple(sequence)
+        # unknown words, that were replaced with existing tags
+        self.corrections: Dict[str, str] = dict(corrections or {})
+
+        if self.sequence:
+            self.expression = Expression.from_sequence(self.sequence)
+        else:
+            self.expression = Expression(self.and_, self.or_, self.not_)
 
     def __str__(self) -> str:
         """Reconstruct query from known arguments."""
+        if not self.expression.is_flat:
+            return ' '.join(self._stringify_sequence())
         keywords = chain.from_iterable(self.as_keywords().values())
         return ' '.join(keywords)
 
+    def _stringify_sequence(self) -> List[str]:
+        """Return query words in original order."""
+        keywords = {'and': constants.KW_AND,
+                    'or': constants.KW_OR,
+                    'not': constants.KW_NOT}
+        components = []
+        for operator, word in self.sequence:
+            if operator == GROUP_END:
+                components.append(GROUP_END)
+            elif word == GROUP_START:
+                components.append(f'{keywords[operator]} {GROUP_START}')
+            else:
+                components.append(f'{keywords[operator]} {word}')
+        return components
+
     def __repr__(self) -> str:
         """Return textual representation."""
         return f'<{type(self).__name__}, n={self.total_items()}>'
@@ -63,7 +91,8 @@ class Query:
 
         sequence = list(self.sequence) + [(operator, x) for x in new_values]
 
-        return cls(**values, sequence=sequence)
+        return cls(**values, sequence=sequence,
+                   corrections=self.corrections)
 
     def total_items(self) -> int:
         """Return total amount of registered items."""
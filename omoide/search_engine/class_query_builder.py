@@ -3,10 +3,13 @@
 """Helper class that stores query parameters.
 """
 import re
-from typing import TypeVar, Generic, Type, List, Dict, Set, Tuple
+from typing import (
+    TypeVar, Generic, Type, List, Dict, Set, Tuple, Optional, Callable
+)
 
 from omoide import constants
-from omoide.utils import group_to_size
+from omoide.search_engine.class_expression import GROUP_START, GROUP_END
+from omoide.search_engine.class_predicate import Predicate
 
 QueryType = TypeVar('QueryType')
 
@@ -15,32 +18,114 @@ class QueryBuilder(Generic[QueryType]):
     """Helper class that makes query instances.
     """
     string = '|'.join(r'\s\{}\s?'.format(x) for x in constants.OPERATORS)
-    pattern = re.compile('(' + string + ')')
+    pattern = re.compile(r'(' + string + r'|(?<=\s)[()](?=\s))')
 
     search_map = {constants.KW_AND: 'and_',
                   constants.KW_OR: 'or_',
                   constants.KW_NOT: 'not_'}
 
-    def __init__(self, target_type: Type[QueryType]) -> None:
-        """Initialize instance."""
-        self.target_type = target_type
+    def __init__(self, target_type: Type[QueryType],
+                 resolver: Optional[Callable[[str], Optional[str]]] = None
+                 ) -> None:
+        """Initialize instance.
+
+        Resolver is optional and should return replacement
+        for unknown word or None if word must stay as it is.
+        """
+        self.target_type: Callable[..., QueryType] = target_type
+        self.resolver = resolver
 
     def split_request_into_parts(self, query_text: str) -> List[str]:
-        """Turn user request into series of words."""
-        # adding space to help regex
-        parts = self.pattern.split(' ' + query_text)
+        """Turn user request into series of words.
+
+        Every word and every opening parenthesis gets an operator
+        before it. If operator is omitted, it becomes 'and' for the
+        group of one element and 'or' otherwise.
+        """
+        query_text = self.separate_groups(query_text)
+
+        # adding spaces to help regex
+        parts = self.pattern.split(' ' + query_text + ' ')
         parts = [x.strip() for x in parts if x.strip()]
 
         if not parts:
             return []
 
-        if parts[0] not in constants.OPERATORS:
-            if len(parts) == 1:
-                parts.insert(0, constants.KW_AND)
+        sizes = self._get_group_sizes(parts)
+        result: List[str] = []
+        groups = [0]
+
+        for position, part in enumerate(parts):
+            if part == GROUP_END:
+                if len(groups) > 1:
+                    groups.pop()
+                result.append(part)
+                continue
+
+            if part not in constants.OPERATORS \
+                    and (not result or result[-1] not in constants.OPERATORS):
+                if sizes[groups[-1]] == 1:
+                    result.append(constants.KW_AND)
+                else:
+                    result.append(constants.KW_OR)
+
+            result.append(part)
+
+            if part == GROUP_START:
+                groups.append(position + 1)
+
+        return result
+
+    @staticmethod
+    def separate_groups(query_text: str) -> str:
+        """Put spaces around parentheses, that mean grouping.
+
+        Parentheses are treated as grouping only on the word boundaries
+        and when they are balanced, so they still could be used in tags.
+        """
+        components = []
+        depth = 0
+        padded = ' ' + query_text + ' '
+
+        for position in range(1, len(padded) - 1):
+            before = padded[position - 1]
+            char = padded[position]
+            after = padded[position + 1]
+
+            if char == GROUP_START and (
+                    before.isspace() or before == GROUP_START
+                    or (before in constants.OPERATORS
+                        and padded[position - 2].isspace())):
+                depth += 1
+                components.append(f' {char} ')
+
+            elif char == GROUP_END and depth \
+                    and (after.isspace() or after == GROUP_END):
+                depth -= 1
+                components.append(f' {char} ')
+
             else:
-                parts.insert(0, constants.KW_OR)
+                components.append(char)
+
+        return ''.join(components)
+
+    @staticmethod
+    def _get_group_sizes(parts: List[str]) -> Dict[int, int]:
+        """Return amount of operands for every group start."""
+        sizes = {0: 0}
+        groups = [0]
+
+        for position, part in enumerate(parts):
+            if part == GROUP_END:
+                if len(groups) > 1:
+                    groups.pop()
+            elif part not in constants.OPERATORS:
+                sizes[groups[-1]] += 1
+                if part == GROUP_START:
+                    groups.append(position + 1)
+                    sizes[position + 1] = 0
 
-        return parts
+        return sizes
 
     def update_sets(self, operator: str, word: str,
                     sets: Dict[str, Set[str]]) -> None:
@@ -51,26 +136,54 @@ class QueryBuilder(Generic[QueryType]):
         if target:
             sets[target].add(word)
 
+    def resolve(self, word: str, corrections: Dict[str, str]) -> str:
+        """Return existing tag for unknown word, remembering replacement."""
+        # conditions like 'size>5mb' are not tags
+        if self.resolver is None or Predicate.parse(word) is not None:
+            return word
+
+        replacement = self.resolver(word.lower())
+
+        if replacement is None:
+            return word
+
+        corrections[word.lower()] = replacement
+        return replacement
+
     def from_query(self, query_text: str) -> QueryType:
         """Make instance representing given query."""
-        sets = dict(and_=set(),
-                    or_=set(),
-                    not_=set())
+        sets: Dict[str, Set[str]] = dict(and_=set(),
+                                         or_=set(),
+                                         not_=set())
 
         sequence: List[Tuple[str, str]] = []
+        corrections: Dict[str, str] = {}
         parts = self.split_request_into_parts(query_text)
+        operator = constants.KW_AND
+
+        for part in parts:
+            if part in constants.OPERATORS:
+                operator = part
+                continue
+
+            if part == GROUP_END:
+                sequence.append((GROUP_END, ''))
+                continue
+
+            if part != GROUP_START:
+                part = self.resolve(part, corrections)
+                self.update_sets(operator, part, sets)
 
-        for operator, word in group_to_size(parts):
-            self.update_sets(operator, word, sets)
             if operator == constants.KW_AND:
                 _operator = 'and'
             elif operator == constants.KW_OR:
                 _operator = 'or'
             else:
                 _operator = 'not'
-            sequence.append((_operator, word))
+            sequence.append((_operator, part))
 
         return self.target_type(and_=set(sets['and_']),
                                 or_=set(sets['or_']),
                                 not_=set(sets['not_']),
-                                sequence=sequence)
+                                sequence=sequence,
+                                corrections=corrections)
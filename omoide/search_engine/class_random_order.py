@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""Stable random ordering of records.
+"""
+import random
+from typing import List, Sequence, Union, overload
+
+from omoide.search_engine.class_index import Index, ShallowMeta
+
+__all__ = [
+    'RandomOrder',
+]
+
+# more rounds give better shuffling, but take more time
+ROUNDS = 4
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _mix(value: int) -> int:
+    """Return well scrambled 64 bit value."""
+    value = (value * 0x9E3779B97F4A7C15) & _MASK_64
+    value ^= value >> 29
+    value = (value * 0xBF58476D1CE4E5B9) & _MASK_64
+    value ^= value >> 32
+    return value
+
+
+class RandomOrder(Sequence[ShallowMeta]):
+    """Stable random ordering of records.
+
+    Candidates are never shuffled or copied. Every position gets
+    mapped onto the candidate with a seeded permutation (small
+    Feistel network), so the same seed always gives the same order
+    and any page costs only as much as the amount of records on it.
+    """
+
+    def __init__(self, index: Index, candidates: Sequence,
+                 seed: int) -> None:
+        """Initialize instance."""
+        self.seed = seed
+        self._index = index
+        self._candidates = candidates
+        self._total = len(candidates)
+
+        generator = random.Random(seed)
+        self._keys = [generator.getrandbits(64) for _ in range(ROUNDS)]
+
+        # permutation covers even amount of bits, not more than
+        # four times bigger than needed
+        self._half = max(((self._total - 1).bit_length() + 1) // 2, 1)
+        self._half_mask = (1 << self._half) - 1
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, n={len(self)}, seed={self.seed}>'
+
+    def __len__(self) -> int:
+        """Return total amount of records."""
+        return self._total
+
+    def _encrypt(self, value: int) -> int:
+        """Return position after one pass of the permutation."""
+        left = value >> self._half
+        right = value & self._half_mask
+
+        for key in self._keys:
+            left, right = right, left ^ (_mix(right ^ key) & self._half_mask)
+
+        return (left << self._half) | right
+
+    def permute(self, position: int) -> int:
+        """Return position of the candidate for given position."""
+        value = self._encrypt(position)
+
+        # cycle walking, values outside of the range are encrypted again
+        while value >= self._total:
+            value = self._encrypt(value)
+
+        return value
+
+    @overload
+    def __getitem__(self, item: int) -> ShallowMeta:
+        ...
+
+    @overload
+    def __getitem__(self, item: slice) -> List[ShallowMeta]:
+        ...
+
+    def __getitem__(self, item: Union[int, slice]
+                    ) -> Union[ShallowMeta, List[ShallowMeta]]:
+        """Return record or list of records."""
+        if isinstance(item, slice):
+            return self._index.resolve(self.numbers(item))
+
+        if item < 0:
+            item += self._total
+
+        if not 0 <= item < self._total:
+            raise IndexError(item)
+
+        return self._index.all_metas[self._candidates[self.permute(item)]]
+
+    def numbers(self, item: slice) -> List[int]:
+        """Return numbers for given slice."""
+        return [self._candidates[self.permute(position)]
+                for position in range(*item.indices(self._total))]
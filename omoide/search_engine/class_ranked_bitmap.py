@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""Bitmap with fast access to numbers by their rank.
+"""
+import sys
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Sequence, Union, overload
+
+from omoide.search_engine import bitmaps
+
+__all__ = [
+    'RankedBitmap',
+]
+
+WORD_BITS = 64
+
+
+class RankedBitmap(Sequence[int]):
+    """Bitmap with fast access to numbers by their rank.
+
+    Bitmap is split into 64 bit words and amount of numbers before
+    every word is stored next to it. Word with requested rank is
+    found with binary search and the number is taken right from it,
+    so access does not depend on the size of the bitmap.
+    """
+
+    def __init__(self, bitmap: int) -> None:
+        """Initialize instance."""
+        self.bitmap = bitmap
+        total_words = (bitmap.bit_length() + WORD_BITS - 1) // WORD_BITS
+        self._words = array('Q', bitmap.to_bytes(total_words * 8, 'little'))
+
+        if sys.byteorder != 'little':  # pragma: no cover
+            self._words.byteswap()
+
+        self._ranks = array('I', accumulate(
+            (bitmaps.count(word) for word in self._words), initial=0
+        ))
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, n={len(self)}>'
+
+    def __len__(self) -> int:
+        """Return total amount of numbers."""
+        return self._ranks[-1]
+
+    @overload
+    def __getitem__(self, item: int) -> int:
+        ...
+
+    @overload
+    def __getitem__(self, item: slice) -> List[int]:
+        ...
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[int, List[int]]:
+        """Return number with given rank."""
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+
+        if item < 0:
+            item += len(self)
+
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+
+        position = bisect_right(self._ranks, item) - 1
+        word = self._words[position]
+
+        # drop lower numbers of the word
+        for _ in range(item - self._ranks[position]):
+            word &= word - 1
+
+        return position * WORD_BITS + (word & -word).bit_length() - 1
+
+    @property
+    def size(self) -> int:
+        """Return approximate size in bytes."""
+        return (self._words.itemsize * len(self._words)
+                + self._ranks.itemsize * len(self._ranks))
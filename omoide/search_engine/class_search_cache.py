@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""Bounded storage for search results.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional, Set, Tuple, Dict, Any
+
+from omoide import constants
+from omoide.search_engine.class_index import Index
+from omoide.search_engine.class_query import Query
+from omoide.search_engine.class_search_result import SearchResult
+
+__all__ = [
+    'SearchCache',
+]
+
+# query text followed by sorted uuids of the active themes
+Key = Tuple[str, ...]
+
+
+class SearchCache:
+    """Bounded storage for search results.
+
+    Least recently used results get evicted when total size of the
+    stored results exceeds the limit. All results belong to a single
+    index and get dropped when another index is used.
+    """
+
+    def __init__(self,
+                 max_bytes: int = constants.SEARCH_CACHE_BYTES) -> None:
+        """Initialize instance."""
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._index: Optional[Index] = None
+        self._storage: 'OrderedDict[Key, Tuple[SearchResult, int]]' = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return total amount of stored results."""
+        return len(self._storage)
+
+    @staticmethod
+    def make_key(query: Query,
+                 active_themes: Optional[Set[str]]) -> Key:
+        """Return canonical form of the search request."""
+        return (str(query.expression),
+                *sorted(active_themes or ()))
+
+    def bind(self, index: Index) -> None:
+        """Drop all results if they were made for another index."""
+        with self._lock:
+            if self._index is not index:
+                self._index = index
+                self._storage.clear()
+                self.total_bytes = 0
+
+    def clear(self) -> None:
+        """Drop all stored results."""
+        with self._lock:
+            self._storage.clear()
+            self.total_bytes = 0
+
+    def get(self, key: Key) -> Optional[SearchResult]:
+        """Return stored result or None."""
+        with self._lock:
+            value = self._storage.get(key)
+
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._storage.move_to_end(key)
+            return value[0]
+
+    def put(self, key: Key, result: SearchResult) -> None:
+        """Store result, evicting old ones if needed."""
+        size = result.size + sys.getsizeof(key) + sum(
+            sys.getsizeof(part) for part in key
+        )
+
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._storage.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+
+            self._storage[key] = (result, size)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._storage.popitem(last=False)
+                self.total_bytes -= evicted_size
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return current state for monitoring."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'entries': len(self._storage),
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""Lazy ordered collection of found records.
+"""
+import sys
+from bisect import bisect_right
+from typing import List, Optional, Sequence, Union, overload
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_index import (
+    Index, ShallowMeta, Posting, DENSITY_RATIO,
+)
+
+__all__ = [
+    'SearchResult',
+]
+
+
+class SearchResult(Sequence[ShallowMeta]):
+    """Lazy ordered collection of found records.
+
+    Holds only numbers of the metas (as bitmap or sorted array),
+    actual records are created for the requested slice, usually
+    a single page. Numbers are ordered by design, so nothing
+    ever gets sorted.
+    """
+
+    def __init__(self, index: Index, posting: Posting) -> None:
+        """Initialize instance."""
+        self._index = index
+        self._posting = posting
+        self._total: Optional[int] = None
+
+    @classmethod
+    def from_bitmap(cls, index: Index, bitmap: int) -> 'SearchResult':
+        """Create instance, choosing the most compact storage."""
+        if bitmaps.count(bitmap) < len(index) // DENSITY_RATIO:
+            return cls(index, bitmaps.to_numbers(bitmap))
+        return cls(index, bitmap)
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, n={len(self)}>'
+
+    def __len__(self) -> int:
+        """Return total amount of found records."""
+        if self._total is None:
+            if isinstance(self._posting, int):
+                self._total = bitmaps.count(self._posting)
+            else:
+                self._total = len(self._posting)
+        return self._total
+
+    @overload
+    def __getitem__(self, item: int) -> ShallowMeta:
+        ...
+
+    @overload
+    def __getitem__(self, item: slice) -> List[ShallowMeta]:
+        ...
+
+    def __getitem__(self, item: Union[int, slice]
+                    ) -> Union[ShallowMeta, List[ShallowMeta]]:
+        """Return record or list of records."""
+        if isinstance(item, slice):
+            return self._index.resolve(self.numbers(item))
+
+        if item < 0:
+            item += len(self)
+
+        if not 0 <= item < len(self):
+            raise IndexError(item)
+
+        return self._index.all_metas[self.select(item, item + 1)[0]]
+
+    def bitmap(self) -> int:
+        """Return all numbers as bitmap."""
+        if isinstance(self._posting, int):
+            return self._posting
+        return bitmaps.from_numbers(self._posting)
+
+    def select(self, start: int, stop: int) -> List[int]:
+        """Return numbers with positions from start to stop."""
+        if isinstance(self._posting, int):
+            return bitmaps.select(self._posting, start, stop)
+        return list(self._posting[start:stop])
+
+    def after(self, number: int, limit: int) -> List[int]:
+        """Return up to limit numbers, that are bigger than given one."""
+        if isinstance(self._posting, int):
+            start = number + 1
+            return bitmaps.select(self._posting >> start << start, 0, limit)
+        position = bisect_right(self._posting, number)
+        return list(self._posting[position:position + limit])
+
+    def numbers(self, item: slice) -> List[int]:
+        """Return numbers for given slice."""
+        positions = range(*item.indices(len(self)))
+
+        if not positions:
+            return []
+
+        if positions.step == 1:
+            return self.select(positions.start, positions.stop)
+
+        low = min(positions[0], positions[-1])
+        high = max(positions[0], positions[-1])
+        chunk = self.select(low, high + 1)
+        return [chunk[position - low] for position in positions]
+
+    @property
+    def size(self) -> int:
+        """Return approximate size of the result in bytes."""
+        return sys.getsizeof(self._posting)
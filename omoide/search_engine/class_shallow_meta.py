@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""Typical metarecord, simplified form.
+"""
+from typing import Dict, Union
+
+__all__ = [
+    'ShallowMeta',
+]
+
+
+class ShallowMeta:
+    """Typical metarecord, simplified form."""
+    __slots__ = ('uuid', 'number', 'path_to_thumbnail')
+
+    def __init__(self, uuid: str, number: int, path_to_thumbnail: str) -> None:
+        """Initialize instance."""
+        self.uuid = uuid
+        self.number = number
+        self.path_to_thumbnail = path_to_thumbnail
+
+    def __eq__(self, other) -> bool:
+        """Return True if object has same uuid."""
+        return self.uuid == other.uuid
+
+    def __hash__(self) -> int:
+        """Return hash of the uuid."""
+        return hash(self.uuid)
+
+    def as_dict(self) -> Dict[str, Union[str, int]]:
+        """Return json compatible description."""
+        return {
+            'uuid': self.uuid,
+            'number': self.number,
+            'path_to_thumbnail': self.path_to_thumbnail,
+        }
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""Parallel search over parts of the index.
+"""
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from omoide import constants
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_index import Index
+from omoide.search_engine.class_plan import Plan
+
+__all__ = [
+    'Shards',
+]
+
+# index that is being split, forked workers inherit it
+_SOURCE: Optional[Index] = None
+_SOURCE_LOCK = threading.Lock()
+
+# part of the index, that belongs to the current worker process
+_SHARD: Optional[Index] = None
+
+
+def _load_shard(start: int, stop: int) -> None:
+    """Cut own part of the inherited index."""
+    global _SHARD, _SOURCE  # pylint: disable=global-statement
+    assert _SOURCE is not None, 'Worker was forked without index'
+    _SHARD = _SOURCE.get_shard(start, stop)
+    _SOURCE = None
+
+
+def _get_shard() -> Index:
+    """Return part of the index, that belongs to this worker."""
+    assert _SHARD is not None, 'Worker has no shard'
+    return _SHARD
+
+
+def _get_size() -> int:
+    """Return amount of metas in the shard."""
+    return len(_get_shard())
+
+
+def _evaluate(plan: Plan) -> int:
+    """Return bitmap of matching metas in the shard."""
+    return plan.evaluate(_get_shard())
+
+
+def _shutdown(executors: List[ProcessPoolExecutor],
+              pending: Set[Future]) -> None:
+    """Stop all worker processes."""
+    for future in list(pending):
+        future.cancel()
+
+    for executor in executors:
+        executor.shutdown(wait=False)
+
+
+class Shards:
+    """Parallel search over parts of the index.
+
+    Index is split by number ranges, every range is held by its own
+    worker process. Workers are forked, so they share memory pages
+    of the parent (memory-mapped snapshot included) and copy only
+    bitmaps of their own range. Query is evaluated by all workers
+    at once, partial bitmaps are already ordered and do not overlap,
+    so merging is just shifting them back into place.
+
+    Plan is built once for the whole index and sent to the workers
+    as it is. Shard may have no metas for some tags or themes of the
+    plan, such steps give empty sets there instead of being dropped.
+
+    Workers are stopped when the index gets garbage collected.
+    """
+
+    def __init__(self, index: Index, amount: int) -> None:
+        """Initialize instance."""
+        total = len(index)
+        self.bounds: List[Tuple[int, int]] = [
+            (total * i // amount, total * (i + 1) // amount)
+            for i in range(amount)
+        ]
+        self._executors: List[ProcessPoolExecutor] = []
+        self._pending: Set[Future] = set()
+        context = multiprocessing.get_context('fork')
+        global _SOURCE  # pylint: disable=global-statement
+
+        with _SOURCE_LOCK:
+            _SOURCE = index
+            try:
+                for start, stop in self.bounds:
+                    self._executors.append(ProcessPoolExecutor(
+                        max_workers=1,
+                        mp_context=context,
+                        initializer=_load_shard,
+                        initargs=(start, stop),
+                    ))
+
+                # workers are forked on the first task,
+                # source must be available at that moment
+                futures = [executor.submit(_get_size)
+                           for executor in self._executors]
+                for future in futures:
+                    future.result()
+            except Exception:
+                _shutdown(self._executors, self._pending)
+                raise
+            finally:
+                _SOURCE = None
+
+        self._finalizer = weakref.finalize(self, _shutdown,
+                                           self._executors, self._pending)
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, n={len(self)}>'
+
+    def __len__(self) -> int:
+        """Return amount of shards."""
+        return len(self.bounds)
+
+    @classmethod
+    def attach(cls, index: Index, amount: int) -> Index:
+        """Start shards for the index if it is worth it."""
+        if amount > 1 and len(index) >= constants.SHARDS_MIN_METAS:
+            index.shards = cls(index, amount)
+        return index
+
+    def evaluate(self, plan: Plan) -> int:
+        """Return bitmap of all metas, matching the plan."""
+        futures = [executor.submit(_evaluate, plan)
+                   for executor in self._executors]
+        # kept to be cancelled on shutdown
+        for future in futures:
+            self._pending.add(future)
+            future.add_done_callback(self._pending.discard)
+
+        target = bitmaps.EMPTY
+        for (start, _), future in zip(self.bounds, futures):
+            target |= future.result() << start
+
+        return target
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        self._finalizer()
+
+    def detach(self) -> None:
+        """Forget worker processes without stopping them.
+
+        Used in forked child, workers still belong to the parent.
+        """
+        self._finalizer.detach()
+        self._executors = []
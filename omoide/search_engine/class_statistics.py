@@ -49,12 +49,10 @@ class Statistics:
         if not isinstance(other, cls):
             return NotImplemented
 
-        resulting_tags = defaultdict(int)
-        for tag, amount in self.tags.items():
-            resulting_tags[tag] = amount
-
-        for tag, amount in other.tags.items():
-            resulting_tags[tag] += amount
+        resulting_tags = dict(self._tags)
+        # pylint: disable=protected-access
+        for tag, amount in other._tags.items():
+            resulting_tags[tag] = resulting_tags.get(tag, 0) + amount
 
         instance = cls(tags=resulting_tags)
         instance.min_date = min(self.min_date or other.min_date,
@@ -106,7 +104,7 @@ class Statistics:
         """Update inner storages."""
         # frequency -----------------------------------------------------------
 
-        self._tags_by_freq = list(self.tags.items())
+        self._tags_by_freq = list(self._tags.items())
 
         # sorting items by alphabet
         self._tags_by_freq.sort(key=lambda x: x[0], reverse=False)
@@ -152,4 +150,4 @@ class Statistics:
     @property
     def tags(self) -> Dict[str, int]:
         """Return copy of inner tags."""
-        return dict(self._tags.copy())
+        return dict(self._tags)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""Statistics of all themes, ready to be combined.
+"""
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Collection, Dict, FrozenSet, Optional, Tuple
+
+from omoide import constants
+from omoide.search_engine.class_statistics import Statistics
+
+__all__ = [
+    'StatisticsTable',
+]
+
+
+class StatisticsTable:
+    """Statistics of all themes, ready to be combined.
+
+    Every tag gets an id by its alphabetical position, every theme
+    keeps ids of its tags with their counts as two parallel arrays.
+    Selection of themes is combined by adding these counts into one
+    list, so merged tags come already sorted by alphabet and no
+    dictionaries are copied. Combined statistics are stored for
+    recent selections, sorting of their tags happens only once
+    and only when the page asks for it.
+    """
+
+    def __init__(self, tags: Tuple[str, ...],
+                 summaries: Dict[str, Statistics],
+                 tag_ids: Dict[str, array],
+                 counts: Dict[str, array]) -> None:
+        """Initialize instance."""
+        self.tags = tags
+        self._summaries = summaries
+        self._tag_ids = tag_ids
+        self._counts = counts
+        self._merged: 'OrderedDict[Optional[FrozenSet[str]], Statistics]' \
+            = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return (f'<{type(self).__name__}, themes={len(self)}, '
+                f'tags={len(self.tags)}>')
+
+    def __len__(self) -> int:
+        """Return total amount of themes."""
+        return len(self._summaries)
+
+    @classmethod
+    def from_dicts(cls, sources: Dict[str, Dict[str, Any]]
+                   ) -> 'StatisticsTable':
+        """Create instance from statistics of every theme as dicts."""
+        tags = tuple(sorted({
+            tag for source in sources.values() for tag in source['tags']
+        }))
+        positions = {tag: position for position, tag in enumerate(tags)}
+
+        summaries = {}
+        tag_ids = {}
+        counts = {}
+        for theme, source in sources.items():
+            summaries[theme] = Statistics.from_dict({**source, 'tags': {}})
+            ordered = sorted((positions[tag], amount)
+                             for tag, amount in source['tags'].items())
+            tag_ids[theme] = array('I', (tag_id for tag_id, _ in ordered))
+            counts[theme] = array('Q', (amount for _, amount in ordered))
+
+        return cls(tags, summaries, tag_ids, counts)
+
+    def merge(self, themes: Collection[str]) -> Statistics:
+        """Return combined statistics for given themes.
+
+        Unknown themes are ignored.
+        """
+        totals = [0] * len(self.tags)
+        result = Statistics()
+
+        for theme in themes:
+            summary = self._summaries.get(theme)
+
+            if summary is None:
+                continue
+
+            result += summary
+            for tag_id, amount in zip(self._tag_ids[theme],
+                                      self._counts[theme]):
+                totals[tag_id] += amount
+
+        return Statistics(
+            min_date=result.min_date,
+            max_date=result.max_date,
+            total_items=result.total_items,
+            total_size=result.total_size,
+            tags={
+                tag: amount
+                for tag, amount in zip(self.tags, totals)
+                if amount
+            },
+        )
+
+    def get(self, active_themes: Optional[Collection[str]]) -> Statistics:
+        """Return combined statistics, None means all themes.
+
+        Result is shared between requests and must not be changed.
+        """
+        key = None if active_themes is None else frozenset(active_themes)
+
+        with self._lock:
+            statistics = self._merged.get(key)
+            if statistics is not None:
+                self._merged.move_to_end(key)
+                return statistics
+
+        statistics = self.merge(self._summaries if key is None else key)
+
+        with self._lock:
+            self._merged[key] = statistics
+            while len(self._merged) > constants.STATISTICS_CACHE_SIZE:
+                self._merged.popitem(last=False)
+
+        return statistics
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""Prefix lookup of tags for autocompletion.
+"""
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Mapping, List, Tuple, Optional, Dict, Callable
+
+__all__ = [
+    'TagTrie',
+]
+
+# best completions are precomputed for prefixes of this length or shorter,
+# they match too many tags to scan them on every keystroke
+PRECOMPUTED_DEPTH = 2
+
+# how many globally frequent tags are recounted for the limited search
+CANDIDATES_FACTOR = 5
+
+
+class TagTrie:
+    """Prefix lookup of tags for autocompletion.
+
+    Flattened form of the trie: all tags are sorted, so every trie node
+    is a contiguous range of tags, found with binary search. Frequencies
+    are kept in a parallel array. Nodes close to the root cover too many
+    tags, so their top completions are computed in advance.
+    """
+
+    def __init__(self, frequencies: Mapping[str, int],
+                 limit: int = 10) -> None:
+        """Initialize instance."""
+        self.limit = limit
+        self._tags: Tuple[str, ...] = tuple(sorted(frequencies))
+        self._frequencies = array('I', (frequencies[x] for x in self._tags))
+        self._top: Dict[str, Tuple[int, ...]] = {}
+
+        prefixes = {
+            tag[:depth]
+            for tag in self._tags
+            for depth in range(1, PRECOMPUTED_DEPTH + 1)
+            if len(tag) >= depth
+        }
+
+        for prefix in prefixes:
+            start, stop = self._get_range(prefix)
+            self._top[prefix] = tuple(self._best(
+                range(start, stop), self.limit * CANDIDATES_FACTOR
+            ))
+
+    def __len__(self) -> int:
+        """Return total amount of tags."""
+        return len(self._tags)
+
+    def _get_range(self, prefix: str) -> Tuple[int, int]:
+        """Return positions of the first and after the last tag."""
+        start = bisect_left(self._tags, prefix)
+        # all tags with prefix are less than prefix + max character
+        stop = bisect_left(self._tags, prefix + '\U0010ffff', lo=start)
+        return start, stop
+
+    def _best(self, positions, limit: int) -> List[int]:
+        """Return positions of the most frequent tags."""
+        return heapq.nlargest(limit, positions,
+                              key=lambda x: (self._frequencies[x],
+                                             -x))
+
+    def suggest(self, prefix: str, limit: Optional[int] = None,
+                counter: Optional[Callable[[str], int]] = None
+                ) -> List[Tuple[str, int]]:
+        """Return most frequent tags, that start with given prefix.
+
+        If counter is given (for example for selected themes), most
+        frequent tags are recounted with it and tags with zero
+        frequency are dropped.
+        """
+        limit = limit or self.limit
+        prefix = prefix.strip().lower()
+
+        if not prefix:
+            return []
+
+        if counter is None:
+            return self._suggest(prefix, limit)
+
+        candidates = self._suggest(prefix, limit * CANDIDATES_FACTOR)
+        recounted = ((tag, counter(tag)) for tag, _ in candidates)
+        return heapq.nlargest(limit, (x for x in recounted if x[1] > 0),
+                              key=lambda x: x[1])
+
+    def _suggest(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """Return most frequent tags, that start with given prefix."""
+        positions: Optional[Tuple[int, ...]] = self._top.get(prefix)
+
+        if positions is None or limit > self.limit * CANDIDATES_FACTOR:
+            start, stop = self._get_range(prefix)
+            positions = tuple(self._best(range(start, stop), limit))
+
+        return [(self._tags[x], self._frequencies[x])
+                for x in positions[:limit]]
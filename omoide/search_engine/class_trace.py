@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""Timings of the search phases.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from omoide import utils
+from omoide.search_engine.class_histograms import Histograms
+
+__all__ = [
+    'Span',
+    'Trace',
+]
+
+
+class Span:
+    """Single measured phase of the search.
+
+    Total is the amount of records after the phase,
+    details are used only to describe the phase to user.
+    """
+    __slots__ = ('phase', 'duration', 'total', 'details')
+
+    def __init__(self, phase: str, duration: float = 0.0,
+                 total: Optional[int] = None,
+                 details: Optional[Dict[str, Any]] = None) -> None:
+        """Initialize instance."""
+        self.phase = phase
+        self.duration = duration
+        self.total = total
+        self.details = details or {}
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return (f'<{type(self).__name__}, {self.phase}, '
+                f'n={self.total}, {self.duration:0.4f} sec>')
+
+    def describe(self) -> str:
+        """Return human readable description of the phase."""
+        total = utils.sep_digits(self.total or 0)
+        took = f'in {self.duration:0.4f} sec.'
+        details = self.details
+
+        if details.get('skipped'):
+            return f'Skipped {details["step"]}, nothing left to search.'
+
+        if self.phase == 'index':
+            return f'Found {total} records in index.'
+
+        if self.phase == 'cache' and self.total is None:
+            return f'Nothing found in cache {took}'
+
+        if self.phase == 'cache':
+            return f'Found {total} records in cache {took}'
+
+        if self.phase == 'plan':
+            return (f'Planned {details["steps"]} steps {took[:-1]}: '
+                    f'{details["plan"]}')
+
+        if self.phase == 'themes' and 'step' not in details:
+            themes = utils.sep_digits(details['themes'])
+            return f'Found {total} records on {themes} themes {took}'
+
+        if 'step' in details:
+            return f'Found {total} records after {details["step"]} {took}'
+
+        if self.phase == 'shards':
+            shards = utils.sep_digits(details['shards'])
+            return f'Found {total} records on {shards} shards {took}'
+
+        if self.phase == 'shuffle':
+            return f'Complete shuffling with seed {details["seed"]} {took}'
+
+        if self.phase == 'sort':
+            return f'Complete ordering {took}'
+
+        if self.phase == 'paginate':
+            return f'Selected {total} records for the page {took}'
+
+        return f'Complete {self.phase} {took}'
+
+
+class Trace:
+    """Timings of the search phases.
+
+    Spans are collected during the search and the textual report
+    is made from them only when it is needed. Every finished span
+    also goes into the latency histograms, if they are given.
+    """
+
+    def __init__(self, histograms: Optional[Histograms] = None) -> None:
+        """Initialize instance."""
+        self.spans: List[Span] = []
+        self.notes: List[str] = []
+        self._histograms = histograms
+
+    def __repr__(self) -> str:
+        """Return textual representation."""
+        return f'<{type(self).__name__}, {len(self.spans)} spans>'
+
+    def __iter__(self) -> Iterator[Span]:
+        """Iterate over all spans."""
+        return iter(self.spans)
+
+    def __len__(self) -> int:
+        """Return total amount of spans."""
+        return len(self.spans)
+
+    def note(self, text: str) -> None:
+        """Add message for the user, that is not a phase."""
+        self.notes.append(text)
+
+    def add(self, phase: str, total: Optional[int] = None,
+            **details: Any) -> Span:
+        """Add span without duration, it does not go to histograms."""
+        span = Span(phase, total=total, details=details)
+        self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, phase: str, **details: Any) -> Iterator[Span]:
+        """Measure duration of the block, total is set by the caller."""
+        span = Span(phase, details=details)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - start
+            self.spans.append(span)
+
+            if self._histograms is not None:
+                self._histograms.observe(phase, span.duration)
+
+    def report(self) -> List[str]:
+        """Return human readable description of the search."""
+        return [*self.notes, *(span.describe() for span in self.spans)]
@@ -2,166 +2,89 @@
 
 """Actual search operations.
 """
-import random
-import time
-from typing import List, Tuple, Set, Optional
+from typing import Tuple, Set, Optional
 
 from omoide import search_engine
-from omoide import utils
+from omoide.search_engine import bitmaps
 
 
-# pylint: disable=too-many-locals
-# pylint: disable=too-many-branches
-# pylint: disable=too-many-statements
 def random_records(index: search_engine.Index,
                    active_themes: Optional[Set[str]],
-                   amount: int
-                   ) -> Tuple[List[search_engine.ShallowMeta], List[str]]:
-    """Select random X records from index."""
-    target_uuids = index.all_uuids
-
-    total = utils.sep_digits(len(target_uuids))
-    report = [f'Found {total} records in index.']
+                   seed: int,
+                   trace: Optional[search_engine.Trace] = None,
+                   ) -> Tuple[search_engine.RandomOrder, search_engine.Trace]:
+    """Return all records in stable random order for given seed."""
+    trace = trace if trace is not None else search_engine.Trace()
+    trace.add('index', total=len(index))
 
     if active_themes is not None:
-        themes_start = time.perf_counter()
-        total_themes = utils.sep_digits(len(active_themes))
-        temporary_or_ = set()
-        for theme_uuid in active_themes:
-            with_theme = index.get_by_tag(theme_uuid)
-            if with_theme:
-                temporary_or_ = temporary_or_.union(with_theme)
-
-        if temporary_or_:
-            target_uuids = target_uuids.intersection(temporary_or_)
-
-        total = utils.sep_digits(len(target_uuids))
-        duration = time.perf_counter() - themes_start
-        report.append(f'Found {total} records on {total_themes} '
-                      f'themes in {duration:0.4f} sec.')
-
-        # note that size of the index might be smaller than
-        # amount and random.sample will throw and exception
-        shuffling_start = time.perf_counter()
-        adequate_amount = min(amount, len(target_uuids))
-        chosen_uuids = random.sample(tuple(target_uuids), adequate_amount)
-        chosen_records = [index.by_uuid[x] for x in chosen_uuids]
-
-        duration = time.perf_counter() - shuffling_start
-        report.append(f'Complete shuffling in {duration:0.4f} sec.')
-
+        with trace.span('themes', themes=len(active_themes)) as span:
+            candidates = index.get_candidates(active_themes)
+            span.total = len(candidates)
     else:
-        shuffling_start = time.perf_counter()
-        adequate_amount = min(amount, len(index))
-        chosen_records = random.sample(index.all_metas, adequate_amount)
+        candidates = index.get_candidates(None)
 
-        duration = time.perf_counter() - shuffling_start
-        report.append(f'Complete shuffling in {duration:0.4f} sec.')
+    # records are not shuffled here, every page
+    # will be taken from the permutation on demand
+    with trace.span('shuffle', seed=seed) as span:
+        result = search_engine.RandomOrder(index, candidates, seed)
+        span.total = len(result)
 
-    return chosen_records, report
+    return result, trace
 
 
-# pylint: disable=too-many-locals
-# pylint: disable=too-many-branches
-# pylint: disable=too-many-statements
 def specific_records(query: search_engine.Query,
                      index: search_engine.Index,
-                     active_themes: Set[str]) \
-        -> Tuple[List[search_engine.ShallowMeta], List[str]]:
+                     active_themes: Set[str],
+                     cache: Optional[search_engine.SearchCache] = None,
+                     trace: Optional[search_engine.Trace] = None,
+                     ) -> Tuple[search_engine.SearchResult,
+                                search_engine.Trace]:
     """Return all records, that match to a given query."""
-    target_uuids = index.all_uuids
-    total = utils.sep_digits(len(target_uuids))
-    report = [f'Found {total} records in index.']
-
-    if active_themes is not None and active_themes:
-        themes_start = time.perf_counter()
-        total_themes = utils.sep_digits(len(active_themes))
-        temporary_or_ = set()
-        for theme_uuid in active_themes:
-            with_theme = index.get_by_tag(theme_uuid)
-            if with_theme:
-                temporary_or_ = temporary_or_.union(with_theme)
-
-        if temporary_or_:
-            target_uuids = target_uuids.intersection(temporary_or_)
-
-        total = utils.sep_digits(len(target_uuids))
-        duration = time.perf_counter() - themes_start
-        report.append(f'Found {total} records on {total_themes} '
-                      f'themes in {duration:0.4f} sec.')
-
-    # OR ----------------------------------------------------------------------
-
-    if query.or_:
-        or_start = time.perf_counter()
-        temporary_or_ = set()
-        for tag in query.or_:
-            start = time.perf_counter()
-            with_tag = index.get_by_tag(tag)
-            if with_tag:
-                temporary_or_ = temporary_or_.union(with_tag)
-                duration = time.perf_counter() - start
-                total = utils.sep_digits(len(with_tag))
-                report.append('> Found {} records '
-                              'by tag {} in {:0.4f} sec.'.format(total,
-                                                                 repr(tag),
-                                                                 duration))
-        if temporary_or_:
-            target_uuids = target_uuids.intersection(temporary_or_)
-
-        total = utils.sep_digits(len(target_uuids))
-        duration = time.perf_counter() - or_start
-        report.append(
-            f'Found {total} records after OR in {duration:0.4f} sec.'
-        )
-
-    # AND ---------------------------------------------------------------------
-
-    if query.and_:
-        and_start = time.perf_counter()
-        for tag in query.and_:
-            start = time.perf_counter()
-            with_tag = index.get_by_tag(tag)
-            target_uuids = target_uuids.intersection(with_tag)
-            duration = time.perf_counter() - start
-            total = utils.sep_digits(len(with_tag))
-            report.append('> Found {} records '
-                          'by tag {} in {:0.4f} sec.'.format(total,
-                                                             repr(tag),
-                                                             duration))
-        total = utils.sep_digits(len(target_uuids))
-        duration = time.perf_counter() - and_start
-        report.append(
-            f'Found {total} records after AND in {duration:0.4f} sec.'
-        )
-
-    # NOT ---------------------------------------------------------------------
-
-    if query.not_:
-        not_start = time.perf_counter()
-        for tag in query.not_:
-            start = time.perf_counter()
-            with_tag = index.get_by_tag(tag)
-            if with_tag:
-                target_uuids -= with_tag
-                duration = time.perf_counter() - start
-                total = utils.sep_digits(len(with_tag))
-                report.append('> Found {} records '
-                              'by tag {} in {:0.4f} sec.'.format(total,
-                                                                 repr(tag),
-                                                                 duration))
-        total = utils.sep_digits(len(target_uuids))
-        duration = time.perf_counter() - not_start
-        report.append(
-            f'Found {total} records after NOT in {duration:0.4f} sec.'
-        )
-
-    # -------------------------------------------------------------------------
-
-    sort_start = time.perf_counter()
-    chosen_records = [index.by_uuid[x] for x in target_uuids]
-    chosen_records.sort(key=lambda meta: meta.number)
-    duration = time.perf_counter() - sort_start
-    report.append(f'Complete sorting in {duration:0.4f} sec.')
-
-    return chosen_records, report
+    trace = trace if trace is not None else search_engine.Trace()
+
+    for wrong, right in query.corrections.items():
+        trace.note(f'Did you mean {right!r}? '
+                   f'Searching for it instead of {wrong!r}.')
+
+    key = search_engine.SearchCache.make_key(query, active_themes)
+    if cache is not None:
+        with trace.span('cache') as span:
+            cache.bind(index)
+            result = cache.get(key)
+            span.total = len(result) if result is not None else None
+
+        if result is not None:
+            return result, trace
+
+    target = index.everything
+    trace.add('index', total=len(index))
+
+    with trace.span('plan') as span:
+        plan = search_engine.Plan.build(query, index, active_themes)
+        span.details.update(steps=len(plan), plan=plan)
+
+    if index.shards is not None:
+        with trace.span('shards', shards=len(index.shards)) as span:
+            target = index.shards.evaluate(plan)
+            span.total = bitmaps.count(target)
+    else:
+        for step in plan:
+            if not target:
+                trace.add(step.operator, step=step, skipped=True)
+                continue
+
+            with trace.span(step.operator, step=step) as span:
+                target = step.apply(index, target)
+                span.total = bitmaps.count(target)
+
+    # numbers are already ordered, records for the page
+    # will be selected from the bitmap on demand
+    with trace.span('sort') as span:
+        result = search_engine.SearchResult.from_bitmap(index, target)
+        span.total = len(result)
+
+    if cache is not None:
+        cache.put(key, result)
+
+    return result, trace
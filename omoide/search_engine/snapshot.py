@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+
+"""Binary snapshot of the search index.
+
+Snapshot is created once by freeze and then memory-mapped by every
+worker in read-only mode, so all of them share the same physical
+pages and start without reading the database.
+
+Layout of the file:
+    header
+    meta table  - one fixed size record per meta, ordered by number
+    tag table   - one fixed size record per tag, sorted by tag
+    data        - meta strings, tag strings, posting lists,
+                  numeric columns and catalog (as json)
+
+Catalog describes synonym groups, location of every column
+and of the facets matrix (if it was saved).
+
+Every snapshot gets unique generation. Delta is a small json file
+with changes since the snapshot of some generation, it is written
+by freeze instead of the whole new snapshot when changes are few.
+Compaction later merges delta into the new snapshot on disk, so
+workers keep sharing mapped pages instead of holding own copies.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid as uuid_module
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import (
+    Iterator, List, Mapping, Optional, Sequence, Tuple, Union, overload,
+)
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_column import Column
+from omoide.search_engine.class_delta import Delta
+from omoide.search_engine.class_facets import Facets
+from omoide.search_engine.class_index import Index, ShallowMeta, Posting
+from omoide.search_engine.class_layered_index import LayeredIndex
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+__all__ = [
+    'save',
+    'load',
+    'load_facets',
+    'get_generation',
+    'save_delta',
+    'load_delta',
+    'compact',
+    'lock',
+    'SnapshotError',
+]
+
+MAGIC = b'OMOIDEIX'
+VERSION = 3
+
+KIND_BITMAP = 0
+KIND_ARRAY = 1
+
+# magic, version, is little endian, total metas, total tags,
+# catalog offset, catalog size
+HEADER = struct.Struct('<8sIIIIQQ')
+# data offset, uuid length, path length
+META_RECORD = struct.Struct('<QII')
+# tag offset, posting offset, posting size, tag length, count, kind
+TAG_RECORD = struct.Struct('<QQQIIB3x')
+
+
+class SnapshotError(Exception):
+    """Snapshot cannot be used."""
+
+
+def _encode_posting(posting: Posting, size: int) -> Tuple[int, bytes, int]:
+    """Return kind, raw bytes and count of the posting list."""
+    if isinstance(posting, int):
+        return (KIND_BITMAP,
+                posting.to_bytes((size + 7) // 8, 'little'),
+                bitmaps.count(posting))
+
+    numbers = array('I', posting)
+    return KIND_ARRAY, numbers.tobytes(), len(numbers)
+
+
+def save(path: str, index: Index, facets: Optional[Facets] = None) -> int:
+    """Write index into binary file, return its size in bytes."""
+    tags = sorted(index.by_tags.keys(), key=lambda x: x.encode('utf-8'))
+    total_metas = len(index.all_metas)
+
+    data_start = (HEADER.size
+                  + META_RECORD.size * total_metas
+                  + TAG_RECORD.size * len(tags))
+    data = bytearray()
+    meta_records = bytearray()
+    tag_records = bytearray()
+
+    for meta in index.all_metas:
+        uuid = meta.uuid.encode('utf-8')
+        thumbnail = meta.path_to_thumbnail.encode('utf-8')
+        meta_records += META_RECORD.pack(data_start + len(data),
+                                         len(uuid), len(thumbnail))
+        data += uuid + thumbnail
+
+    for tag in tags:
+        encoded_tag = tag.encode('utf-8')
+        tag_offset = data_start + len(data)
+        data += encoded_tag
+
+        # array postings must be aligned to be casted in place
+        data += bytes(-(data_start + len(data)) % array('I').itemsize)
+
+        kind, raw, count = _encode_posting(index.by_tags[tag], total_metas)
+        tag_records += TAG_RECORD.pack(tag_offset, data_start + len(data),
+                                       len(raw), len(encoded_tag),
+                                       count, kind)
+        data += raw
+
+    def add_array(values: Union[array, memoryview]) -> List[int]:
+        """Put aligned array into data, return its location."""
+        data.extend(bytes(-(data_start + len(data)) % 8))
+        offset = data_start + len(data)
+        data.extend(values.tobytes())
+        return [offset, len(values) * values.itemsize]
+
+    catalog = {
+        'generation': uuid_module.uuid4().hex,
+        'synonyms': sorted(set(index.synonyms.values())),
+        'columns': {
+            name: {
+                'typecode': column.typecode,
+                'values': add_array(column.values),
+                'order': add_array(column.order),
+                'labels': column.labels,
+            }
+            for name, column in sorted(index.columns.items())
+        },
+    }
+
+    if facets is not None:
+        catalog['facets'] = {
+            'tags': list(facets.tags),
+            'frequencies': add_array(facets.frequencies),
+            'indptr': add_array(facets.indptr),
+            'indices': add_array(facets.indices),
+        }
+
+    encoded_catalog = json.dumps(catalog, ensure_ascii=False).encode('utf-8')
+    catalog_offset = data_start + len(data)
+    data += encoded_catalog
+
+    header = HEADER.pack(MAGIC, VERSION, sys.byteorder == 'little',
+                         total_metas, len(tags),
+                         catalog_offset, len(encoded_catalog))
+
+    temporary_path = path + '.tmp'
+    with open(temporary_path, mode='wb') as file:
+        file.write(header)
+        file.write(meta_records)
+        file.write(tag_records)
+        file.write(data)
+
+    # readers must never see half written file
+    os.replace(temporary_path, path)
+    return data_start + len(data)
+
+
+def save_delta(path: str, delta: Delta) -> int:
+    """Write delta into json file, return its size in bytes."""
+    encoded = json.dumps(delta.as_dict(), ensure_ascii=False).encode('utf-8')
+
+    temporary_path = path + '.tmp'
+    with open(temporary_path, mode='wb') as file:
+        file.write(encoded)
+
+    os.replace(temporary_path, path)
+    return len(encoded)
+
+
+def load_delta(path: str) -> Delta:
+    """Read delta from json file."""
+    try:
+        with open(path, mode='rb') as file:
+            return Delta.from_dict(json.loads(file.read()))
+    except (ValueError, KeyError, TypeError) as exc:
+        raise SnapshotError(f'Delta is broken: {path}') from exc
+
+
+class SnapshotMetas(Sequence[ShallowMeta]):
+    """Lazy sequence of metas, stored in the snapshot."""
+
+    def __init__(self, view: memoryview, total: int) -> None:
+        """Initialize instance."""
+        self._view = view
+        self._total = total
+
+    def __len__(self) -> int:
+        """Return total amount of metas."""
+        return self._total
+
+    @overload
+    def __getitem__(self, item: int) -> ShallowMeta:
+        ...
+
+    @overload
+    def __getitem__(self, item: slice) -> List[ShallowMeta]:
+        ...
+
+    def __getitem__(self, item: Union[int, slice]
+                    ) -> Union[ShallowMeta, List[ShallowMeta]]:
+        """Return meta by its number."""
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(self._total))]
+
+        if item < 0:
+            item += self._total
+
+        if not 0 <= item < self._total:
+            raise IndexError(item)
+
+        offset, uuid_len, path_len = META_RECORD.unpack_from(
+            self._view, HEADER.size + META_RECORD.size * item
+        )
+        raw = bytes(self._view[offset:offset + uuid_len + path_len])
+        return ShallowMeta(uuid=raw[:uuid_len].decode('utf-8'),
+                           number=item,
+                           path_to_thumbnail=raw[uuid_len:].decode('utf-8'))
+
+
+class SnapshotTags(Mapping[str, Posting]):
+    """Read-only mapping of tags to posting lists, stored in the snapshot.
+    """
+
+    def __init__(self, view: memoryview, start: int, total: int) -> None:
+        """Initialize instance."""
+        self._view = view
+        self._start = start
+        self._total = total
+        self._keys = _TagKeys(self)
+
+    def record(self, position: int) -> tuple:
+        """Return raw tag record."""
+        return TAG_RECORD.unpack_from(
+            self._view, self._start + TAG_RECORD.size * position
+        )
+
+    def raw_tag(self, position: int) -> bytes:
+        """Return encoded tag string."""
+        tag_offset, _, _, tag_len, _, _ = self.record(position)
+        return bytes(self._view[tag_offset:tag_offset + tag_len])
+
+    def _find(self, tag: str) -> int:
+        """Return position of the tag record or -1."""
+        encoded = tag.encode('utf-8')
+        position = bisect_left(self._keys, encoded)
+        if position < self._total and self.raw_tag(position) == encoded:
+            return position
+        return -1
+
+    def __getitem__(self, tag: str) -> Posting:
+        """Return posting list for the tag."""
+        position = self._find(tag)
+
+        if position < 0:
+            raise KeyError(tag)
+
+        _, offset, size, _, _, kind = self.record(position)
+        raw = self._view[offset:offset + size]
+
+        if kind == KIND_BITMAP:
+            return int.from_bytes(raw, 'little')
+
+        return raw.cast('I')
+
+    def __contains__(self, tag) -> bool:
+        """Return True if tag is in the snapshot."""
+        return isinstance(tag, str) and self._find(tag) >= 0
+
+    def __len__(self) -> int:
+        """Return total amount of tags."""
+        return self._total
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over all tags in sorted order."""
+        for position in range(self._total):
+            yield self.raw_tag(position).decode('utf-8')
+
+
+class _TagKeys(Sequence):
+    """Encoded tags in order, used for binary search."""
+
+    def __init__(self, tags: SnapshotTags) -> None:
+        """Initialize instance."""
+        self._tags = tags
+
+    def __len__(self) -> int:
+        """Return total amount of tags."""
+        return len(self._tags)
+
+    def __getitem__(self, position):
+        """Return encoded tag."""
+        return self._tags.raw_tag(position)
+
+
+def _open(path: str) -> Tuple[memoryview, tuple, dict]:
+    """Map binary file into memory, return it with header and catalog."""
+    with open(path, mode='rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:
+            raise SnapshotError(f'Snapshot is empty: {path}') from exc
+
+    view = memoryview(mapped)
+
+    if len(view) < HEADER.size:
+        raise SnapshotError(f'Snapshot is too short: {path}')
+
+    header = HEADER.unpack_from(view, 0)
+    magic, version, little, _, _, catalog_offset, catalog_size = header
+
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f'Unsupported snapshot format: {path}')
+
+    if bool(little) != (sys.byteorder == 'little'):
+        raise SnapshotError(f'Snapshot has different byte order: {path}')
+
+    if catalog_offset + catalog_size > len(view):
+        raise SnapshotError(f'Snapshot is truncated: {path}')
+
+    try:
+        catalog = json.loads(
+            bytes(view[catalog_offset:catalog_offset + catalog_size])
+        )
+    except ValueError as exc:
+        raise SnapshotError(f'Snapshot catalog is broken: {path}') from exc
+
+    if not isinstance(catalog, dict):
+        raise SnapshotError(f'Snapshot catalog is broken: {path}')
+
+    return view, header, catalog
+
+
+def _get_array(view: memoryview, location: List[int],
+               typecode: str) -> memoryview:
+    """Return array, stored in the snapshot."""
+    offset, size = location
+
+    if offset < 0 or size < 0 or offset + size > len(view):
+        raise ValueError(f'Array is out of bounds: {location}')
+
+    return view[offset:offset + size].cast(typecode)  # type: ignore
+
+
+def load(path: str) -> Index:
+    """Map binary file into memory and make index from it."""
+    view, header, catalog = _open(path)
+    total_metas, total_tags = header[3:5]
+    tags_start = HEADER.size + META_RECORD.size * total_metas
+
+    if tags_start + TAG_RECORD.size * total_tags > len(view):
+        raise SnapshotError(f'Snapshot is truncated: {path}')
+
+    try:
+        columns = {
+            name: Column(values=_get_array(view, info['values'],
+                                           info['typecode']),
+                         order=_get_array(view, info['order'], 'I'),
+                         labels=tuple(info['labels']))
+            for name, info in catalog['columns'].items()
+        }
+        synonyms = catalog['synonyms']
+    except (KeyError, TypeError, ValueError, struct.error) as exc:
+        raise SnapshotError(f'Snapshot is broken: {path}') from exc
+
+    return Index.from_postings(
+        all_metas=SnapshotMetas(view, total_metas),
+        by_tags=SnapshotTags(view, tags_start, total_tags),
+        synonyms=synonyms,
+        columns=columns,
+    )
+
+
+def get_generation(path: str) -> str:
+    """Return unique identifier of the snapshot."""
+    _, _, catalog = _open(path)
+    return catalog.get('generation', '')
+
+
+def load_facets(path: str) -> Facets:
+    """Map binary file into memory and make facets from it."""
+    view, _, catalog = _open(path)
+    info = catalog.get('facets')
+
+    if info is None:
+        raise SnapshotError(f'Snapshot has no facets: {path}')
+
+    try:
+        return Facets(tags=tuple(info['tags']),
+                      frequencies=_get_array(view, info['frequencies'], 'I'),
+                      indptr=_get_array(view, info['indptr'], 'I'),
+                      indices=_get_array(view, info['indices'], 'I'))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise SnapshotError(f'Snapshot facets are broken: {path}') from exc
+
+
+@contextmanager
+def lock(path: str, blocking: bool = True) -> Iterator[bool]:
+    """Hold exclusive lock of the snapshot and its delta.
+
+    Give False if the lock belongs to another process and waiting
+    was not requested. Nothing is locked where fcntl is unavailable.
+    """
+    if fcntl is None:  # pragma: no cover
+        yield True
+        return
+
+    with open(path + '.lock', mode='a', encoding='utf-8') as file:
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX if blocking
+                        else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def compact(path: str, delta_path: str) -> int:
+    """Merge delta into the new snapshot generation, return its size.
+
+    Delta is removed afterwards. Zero means that there was nothing
+    to merge. Must be called under the lock.
+    """
+    if not os.path.exists(delta_path):
+        return 0
+
+    delta = load_delta(delta_path)
+    if delta.base != get_generation(path):
+        raise SnapshotError(
+            f'Delta was made for another snapshot: {delta_path}'
+        )
+
+    index = LayeredIndex(load(path), delta).compact()
+    size = save(path, index, Facets.from_index(index))
+
+    # readers, that see new snapshot with old delta, reject the pair
+    os.remove(delta_path)
+    return size
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide import constants
+from omoide.application.app_factory import fill_note, fill_report
+
+
+def test_fill_report():
+    marker = constants.SEARCH_REPORT_MARKER.encode('utf-8')
+    body = b'<div>' + marker + b'</div>'
+
+    assert fill_report(body, ['Found 2 records.', 'a < b']) \
+        == b'<div>Found 2 records.<br>a &lt; b<br></div>'
+    assert fill_report(body, []) == b'<div></div>'
+    assert fill_report(b'<div></div>', ['unused']) == b'<div></div>'
+
+
+def test_fill_note():
+    marker = constants.SEARCH_NOTE_MARKER.encode('utf-8')
+    body = b'<span>' + marker + b'</span>'
+
+    assert fill_note(body, 'Found 2 records in 0.0010 seconds') \
+        == b'<span>Found 2 records in 0.0010 seconds</span>'
+    assert fill_note(body, 'a < b') == b'<span>a &lt; b</span>'
+    assert fill_note(b'<span></span>', 'unused') == b'<span></span>'
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import asyncio
+
+import flask
+import pytest
+
+from omoide.application.class_asgi_adapter import AsgiAdapter
+
+
+@pytest.fixture
+def adapter():
+    app = flask.Flask('test')
+
+    @app.route('/echo', methods=['GET', 'POST'])
+    def echo():
+        return flask.jsonify({
+            'q': flask.request.args.get('q'),
+            'body': flask.request.get_data(as_text=True),
+            'header': flask.request.headers.get('X-Test'),
+        })
+
+    @app.route('/stream')
+    def stream():
+        return flask.Response((f'{i}\n' for i in range(3)),
+                              mimetype='application/x-ndjson')
+
+    instance = AsgiAdapter(app, threads=2)
+    yield instance
+    instance.close()
+
+
+def request(adapter, path, method='GET', query=b'', body=b'', headers=()):
+    messages = []
+    incoming = [
+        {'type': 'http.request', 'body': body[:2], 'more_body': True},
+        {'type': 'http.request', 'body': body[2:], 'more_body': False},
+    ]
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': list(headers),
+    }
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(adapter(scope, receive, send))
+    return messages
+
+
+def test_asgi_adapter_request(adapter):
+    messages = request(adapter, '/echo', method='POST', query=b'q=cat',
+                       body=b'hello', headers=[(b'x-test', b'yes')])
+
+    assert messages[0]['type'] == 'http.response.start'
+    assert messages[0]['status'] == 200
+    assert (b'content-type', b'application/json') in messages[0]['headers']
+    body = b''.join(x.get('body', b'') for x in messages[1:])
+    assert flask.json.loads(body) == {'q': 'cat', 'body': 'hello',
+                                      'header': 'yes'}
+    assert messages[-1]['more_body'] is False
+
+
+def test_asgi_adapter_streaming(adapter):
+    messages = request(adapter, '/stream')
+    chunks = [x['body'] for x in messages[1:] if x['body']]
+
+    assert chunks == [b'0\n', b'1\n', b'2\n']
+
+
+def test_asgi_adapter_not_found(adapter):
+    assert request(adapter, '/unknown')[0]['status'] == 404
+
+
+def test_asgi_adapter_write():
+    def legacy_app(environ, start_response):
+        write = start_response('201 Created', [('X-Legacy', 'yes')])
+        write(b'first ')
+        write(b'second ')
+        return [b'third']
+
+    instance = AsgiAdapter(legacy_app, threads=1)
+    messages = request(instance, '/')
+    instance.close()
+
+    assert messages[0]['status'] == 201
+    assert (b'x-legacy', b'yes') in messages[0]['headers']
+    assert [x['body'] for x in messages[1:]] \
+        == [b'first ', b'second ', b'third', b'']
+    assert [x['type'] for x in messages].count('http.response.start') == 1
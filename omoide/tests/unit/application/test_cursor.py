@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.application import logic
+from omoide.application.class_cursor import Cursor
+from omoide.search_engine import bitmaps
+from omoide.search_engine import (
+    Index, RandomOrder, SearchResult, ShallowMeta,
+)
+
+
+@pytest.fixture
+def index():
+    metas = [ShallowMeta(f'm_{i}', i, f'/{i}.jpg') for i in range(100)]
+    return Index(all_metas=metas, by_tags={})
+
+
+def test_cursor_encode_decode():
+    cursor = Cursor(number=15, uuid='m_15', position=3, seed=42)
+    assert Cursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize('text', [
+    'zzz', '', 'WzEsMl0=', 'WyJhIiwiYiIsMSxudWxsXQ==',
+])
+def test_cursor_malformed(text):
+    with pytest.raises(ValueError):
+        Cursor.decode(text)
+
+
+def test_cursor_export_resumes(index):
+    result = SearchResult(index, bitmaps.from_numbers(range(0, 100, 3)))
+    lines = ''.join(logic.iterate_export(index, result, chunk_size=4))
+    numbers = [int(line.split('"number":')[1].split(',')[0])
+               for line in lines.splitlines()]
+    assert numbers == list(range(0, 100, 3))
+
+    order = RandomOrder(index, range(100), seed=7)
+    chunks = list(logic.iterate_export(index, order, chunk_size=30))
+    assert len(chunks) == 4
+    assert ''.join(chunks).count('\n') == 100
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.application.class_group_window import GroupWindow
+from omoide.application.class_paginator import Paginator
+
+
+def test_group_window_paginator():
+    total = 1000
+    current = 500
+    uuids = {
+        ordinal: f'm_{ordinal}'
+        for ordinal in [1, total, *range(current - 15, current + 16)]
+    }
+    window = GroupWindow(total, uuids)
+    paginator = Paginator(window, current_page=current, items_per_page=1)
+
+    values = [page['value'] for page in paginator.iterate_over_pages()
+              if not page['is_dummy']]
+    assert values[0] == 'm_1'
+    assert values[-1] == 'm_1000'
+    assert 'm_500' in values
+    assert paginator.first_value == 'm_1'
+    assert paginator.last_value == 'm_1000'
+
+    with pytest.raises(KeyError):
+        _ = window[100]
+
+    with pytest.raises(IndexError):
+        _ = window[total]
+
+    assert window[498:501] == ['m_499', 'm_500', 'm_501']
+    assert Paginator(window, current_page=current, items_per_page=1).page \
+        == ['m_500']
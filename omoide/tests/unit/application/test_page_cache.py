@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.application.class_page_cache import PageCache
+from omoide.application.class_web_query import WebQuery
+
+
+def test_page_cache_eviction():
+    cache = PageCache(max_bytes=10)
+    cache.put('first', b'12345', 'text/html')
+    cache.put('second', b'12345', 'text/html')
+
+    assert cache.get('first') == (b'12345', 'text/html')
+
+    cache.put('third', b'123', 'text/html')
+    cache.put('huge', b'12345678901', 'text/html')
+
+    assert cache.get('second') is None
+    assert cache.get('huge') is None
+    assert cache.total_bytes == 8
+    assert cache.as_dict()['hits'] == 1
+    assert cache.as_dict()['misses'] == 2
+
+
+def test_page_cache_etag():
+    key = ('/tags', WebQuery({'b': '2', 'a': '1'}).get_key())
+
+    assert key == ('/tags', WebQuery({'a': '1', 'b': '2'}).get_key())
+    assert PageCache.make_etag('first', key) \
+        == PageCache.make_etag('first', key)
+    assert PageCache.make_etag('first', key) \
+        != PageCache.make_etag('second', key)
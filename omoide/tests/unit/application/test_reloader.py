@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import os
+from unittest import mock
+
+from omoide import constants
+from omoide.application.class_reloader import Reloader
+
+
+def make_reloader(folder, loader):
+    now = [0.0]
+    reloader = Reloader(folder=str(folder),
+                        current=mock.Mock(name='first'),
+                        loader=loader,
+                        interval=10.0,
+                        clock=lambda: now[0])
+    return reloader, now
+
+
+def publish(folder, content):
+    path = folder / 'new.db'
+    path.write_bytes(content)
+    os.replace(path, folder / constants.STATIC_DB_FILE_NAME)
+
+
+def test_reloader_swaps_state(tmp_path):
+    publish(tmp_path, b'first')
+    second = mock.Mock(name='second')
+    second.compact.return_value = second
+    reloader, now = make_reloader(tmp_path, lambda: second)
+    first = reloader.current
+
+    publish(tmp_path, b'second')
+    assert not reloader.check()
+
+    now[0] = 11.0
+    assert reloader.check()
+    reloader.wait()
+
+    assert reloader.current is second
+    assert reloader.generation == 2
+    first.engine.dispose.assert_called_once()
+
+    now[0] = 22.0
+    assert not reloader.check()
+
+
+def test_reloader_keeps_state_on_failure(tmp_path):
+    publish(tmp_path, b'first')
+
+    def loader():
+        raise ValueError('broken file')
+
+    reloader, now = make_reloader(tmp_path, loader)
+    first = reloader.current
+
+    publish(tmp_path, b'broken')
+    now[0] = 11.0
+    assert reloader.check()
+    reloader.wait()
+
+    assert reloader.current is first
+    assert reloader.failures == 1
+
+    # same broken file is not loaded again
+    now[0] = 22.0
+    assert not reloader.check()
+
+
+def test_reloader_compacts_state(tmp_path):
+    publish(tmp_path, b'first')
+    reloader, _ = make_reloader(tmp_path, mock.Mock())
+    first = reloader.current
+    compacted = mock.Mock(name='compacted', engine=first.engine)
+    first.compact.return_value = compacted
+
+    assert reloader.compact()
+    reloader.wait()
+
+    assert reloader.current is compacted
+    first.engine.dispose.assert_not_called()
+
+
+def test_reloader_after_fork(tmp_path):
+    publish(tmp_path, b'first')
+    reloader, _ = make_reloader(tmp_path, mock.Mock())
+    current = reloader.current
+    shards = current.index.shards
+    pool = current.engine.pool
+    current.compact.return_value = current
+
+    # lock, taken by the thread of the parent, is never released in child
+    reloader._lock.acquire()
+    assert not reloader.compact()
+
+    with mock.patch('omoide.search_engine.Shards.attach') as attach:
+        reloader.after_fork()
+
+    current.engine.dispose.assert_not_called()
+    assert current.engine.pool is pool.recreate.return_value
+    shards.detach.assert_called_once()
+    attach.assert_called_once_with(current.index, current.shards)
+    assert reloader.compact()
+    reloader.wait()
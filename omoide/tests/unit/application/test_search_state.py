@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from unittest import mock
+
+from omoide import constants
+from omoide.application.class_search_state import SearchState
+from omoide.search_engine import snapshot
+from omoide.search_engine.class_delta import Delta
+from omoide.search_engine.class_index import Index, ShallowMeta
+from omoide.search_engine.class_layered_index import LayeredIndex
+
+
+def make_state(folder):
+    index = Index(all_metas=[ShallowMeta(f'm_{i}', i, '') for i in range(4)],
+                  by_tags={'cat': [0, 1], 'dog': [2, 3]})
+    path = str(folder / constants.INDEX_SNAPSHOT_FILE_NAME)
+    snapshot.save(path, index)
+    delta = Delta([], {}, removed=[1], base=snapshot.get_generation(path))
+    snapshot.save_delta(str(folder / constants.INDEX_DELTA_FILE_NAME), delta)
+    return SearchState(engine=None, maker=None,
+                       index=LayeredIndex(snapshot.load(path), delta),
+                       tag_trie=None, facets=None, statistics=None,
+                       query_builder=None, folder=str(folder))
+
+
+def test_search_state_compact_on_disk(tmp_path):
+    state = make_state(tmp_path)
+
+    assert state.compact() is state
+    assert not (tmp_path / constants.INDEX_DELTA_FILE_NAME).exists()
+    loaded = snapshot.load(str(tmp_path / constants.INDEX_SNAPSHOT_FILE_NAME))
+    assert [meta.uuid for meta in loaded.all_metas] == ['m_0', 'm_2', 'm_3']
+
+
+def test_search_state_compact_in_memory(tmp_path):
+    state = make_state(tmp_path)
+
+    with mock.patch.object(snapshot, 'save',
+                           side_effect=OSError('Read-only file system')):
+        compacted = state.compact()
+
+    assert compacted is not state
+    assert not isinstance(compacted.index, LayeredIndex)
+    assert [meta.uuid for meta in compacted.index.all_metas] \
+        == ['m_0', 'm_2', 'm_3']
+    assert compacted.facets is not None
+    assert (tmp_path / constants.INDEX_DELTA_FILE_NAME).exists()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.benchmarks import runner
+from omoide.benchmarks.class_corpus import Corpus
+from omoide.benchmarks.class_workload import Workload
+
+
+def test_corpus_generate():
+    corpus = Corpus.generate(metas=500, tags=50, themes=3, seed=1)
+    again = Corpus.generate(metas=500, tags=50, themes=3, seed=1)
+
+    assert len(corpus.all_metas) == 500
+    assert corpus.by_tags == again.by_tags
+    assert len(corpus.themes) == 3
+    assert sum(len(corpus.by_tags[x]) for x in corpus.themes) == 500
+
+    # most popular tag is used more than the least popular one
+    counts = [len(corpus.by_tags.get(word, ())) for word in corpus.words]
+    assert counts[0] > counts[-1]
+
+    index = corpus.build_index()
+    assert len(index) == 500
+    assert index.count('size>0') == 500
+
+
+def test_workload_generate():
+    corpus = Corpus.generate(metas=100, tags=20, themes=2)
+    workload = Workload.generate(corpus, total=50, seed=3)
+
+    assert len(workload) == 100
+    assert workload.requests == Workload.generate(corpus, 50, seed=3).requests
+    assert len(workload.by_kind()['random']) == 50
+
+
+def test_runner_run():
+    results = runner.run(metas=300, tags=30, themes=2, queries=20,
+                         log=lambda _: None)
+
+    assert results['config']['metas'] == 300
+    assert results['operations']['random']['count'] == 20
+    assert results['operations']['specific.cached']['count'] == 20
+    assert results['build']['peak_rss_bytes'] > 0
+
+    lines = runner.compare(results, results)
+    assert all('(+0.0%)' in line for line in lines)
+
+
+def test_runner_summarize():
+    summary = runner.summarize([0.001 * x for x in range(1, 101)])
+
+    assert summary['count'] == 100
+    assert summary['p50_ms'] == 51.0
+    assert summary['p99_ms'] == 100.0
+    assert runner.summarize([]) == {'count': 0}
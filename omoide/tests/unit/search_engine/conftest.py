@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+
+import pytest
+
+from omoide.search_engine.class_column import Column
+from omoide.search_engine.class_index import Index, ShallowMeta
+from omoide.search_engine.class_query import Query
+from omoide.search_engine.class_query_builder import QueryBuilder
+
+
+@pytest.fixture
+def index_metas():
+    """Ten metas ordered by number."""
+    return [
+        ShallowMeta(f'm_{i}', i, f'/thumbnails/t/g/m_{i}.jpg')
+        for i in range(10)
+    ]
+
+
+@pytest.fixture
+def index_tags():
+    """Tags and numbers of metas that have them."""
+    return {
+        't_animals': list(range(10)),
+        'cat': [0, 1, 2, 3],
+        'dog': [4, 5, 6],
+        'white': [1, 4, 7],
+        'night': [3, 9],
+    }
+
+
+@pytest.fixture
+def index(index_metas, index_tags):
+    """Small search index."""
+    return Index(all_metas=index_metas, by_tags=index_tags)
+
+
+@pytest.fixture
+def synonym_index(index_metas, index_tags):
+    """Small search index with synonyms."""
+    return Index(all_metas=index_metas,
+                 by_tags={**index_tags, 'kitty': [8]},
+                 synonyms=[['Cat', 'kitten'], ['kitten', 'kitty'],
+                           ['dog', 'puppy']])
+
+
+@pytest.fixture
+def column_index(index_metas, index_tags):
+    """Small search index with numeric attributes."""
+    return Index(all_metas=index_metas,
+                 by_tags=index_tags,
+                 columns={
+                     'size': Column.from_values('Q', [
+                         x * 1024 ** 2 for x in range(10)
+                     ]),
+                     'date': Column.from_values('I', [
+                         20180101 + x * 10000 for x in range(10)
+                     ]),
+                 })
+
+
+@pytest.fixture
+def query_builder():
+    """Builder of the queries without typo resolving."""
+    return QueryBuilder(Query)
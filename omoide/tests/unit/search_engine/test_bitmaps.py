@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine import bitmaps
+
+
+def test_bitmaps_conversion():
+    numbers = [0, 5, 17, 4099, 9000]
+    bitmap = bitmaps.from_numbers(numbers)
+    assert list(bitmaps.to_numbers(bitmap)) == numbers
+    assert bitmaps.count(bitmap) == 5
+    assert bitmaps.from_numbers([]) == bitmaps.EMPTY
+
+
+def test_bitmaps_iterate_skip():
+    numbers = list(range(0, 20_000, 3))
+    bitmap = bitmaps.from_numbers(numbers)
+    assert list(bitmaps.iterate(bitmap)) == numbers
+    assert list(bitmaps.iterate(bitmap, skip=1500)) == numbers[1500:]
+    assert list(bitmaps.iterate(bitmap, skip=len(numbers))) == []
+
+
+def test_bitmaps_select():
+    numbers = list(range(0, 20_000, 7))
+    bitmap = bitmaps.from_numbers(numbers)
+    assert bitmaps.select(bitmap, 100, 200) == numbers[100:200]
+    assert bitmaps.select(bitmap, 2800, 3000) == numbers[2800:]
+    assert bitmaps.select(bitmap, 10, 10) == []
+    assert bitmaps.select(bitmaps.full(4), 0, 100) == [0, 1, 2, 3]
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_column import Column
+from omoide.search_engine.class_predicate import Predicate
+
+
+def test_column_select():
+    column = Column.from_values('d', [3.0, 1.0, 2.0, 2.0, 5.0, 0.5])
+
+    def select(**kwargs):
+        bitmap = column.select(Predicate('x', **kwargs))
+        return list(bitmaps.iterate(bitmap))
+
+    assert select(low=2.0) == [0, 2, 3, 4]
+    assert select(low=2.0, include_low=False) == [0, 4]
+    assert select(high=2.0, include_high=False) == [1, 5]
+    assert select(low=1.0, high=3.0) == [0, 1, 2, 3]
+    assert select(low=4.0, high=1.0) == []
+    assert column.count(Predicate('x', low=2.0)) == 4
+
+
+def test_column_labels():
+    column = Column.from_values('B', [0, 1, 0], labels=('image', 'video'))
+    bitmap = column.select(Predicate('type', low='image', high='image'))
+    assert list(bitmaps.iterate(bitmap)) == [0, 2]
+    assert column.count(Predicate('type', low='gif', high='gif')) == 0
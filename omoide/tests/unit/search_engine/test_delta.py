@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine.class_delta import Delta
+from omoide.search_engine.class_index import Index, ShallowMeta
+
+
+def make_target(index_metas, index_tags):
+    metas = [meta for meta in index_metas if meta.number != 2]
+    metas.append(ShallowMeta('m_new', 10, '/thumbnails/t/g/m_new.jpg'))
+    metas = [ShallowMeta(meta.uuid, number, meta.path_to_thumbnail)
+             for number, meta in enumerate(metas)]
+    numbers = {meta.uuid: meta.number for meta in metas}
+
+    by_tags = {
+        tag: [numbers[f'm_{x}'] for x in values if x != 2]
+        for tag, values in index_tags.items()
+    }
+    # m_5 got new tag, m_new is a white cat
+    by_tags['white'].append(numbers['m_5'])
+    by_tags['cat'].append(numbers['m_new'])
+    by_tags['white'].append(numbers['m_new'])
+    by_tags['t_animals'].append(numbers['m_new'])
+    return Index(all_metas=metas, by_tags=by_tags)
+
+
+def test_delta_from_indexes(index, index_metas, index_tags):
+    target = make_target(index_metas, index_tags)
+    delta = Delta.from_indexes(index, target, generation='abc')
+
+    assert [meta.uuid for meta in delta.all_metas] == ['m_5', 'm_new']
+    assert delta.removed == [2, 5]
+    assert delta.by_tags['white'] == [0, 1]
+    assert delta.by_tags['cat'] == [1]
+    assert delta.synonyms is None
+    assert delta.base == 'abc'
+    assert len(delta) == 4
+
+
+def test_delta_no_changes(index):
+    delta = Delta.from_indexes(index, index)
+    assert not delta
+    assert len(delta) == 0
+
+
+def test_delta_as_dict(index, index_metas, index_tags):
+    target = make_target(index_metas, index_tags)
+    delta = Delta.from_indexes(index, target, generation='abc')
+    restored = Delta.from_dict(delta.as_dict())
+
+    assert restored.as_dict() == delta.as_dict()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide import constants
+from omoide.search_engine.class_expression import Expression
+
+
+def test_expression_from_sequence():
+    expression = Expression.from_sequence([
+        ('or', '('), ('or', 'Cat'), ('or', 'dog'), (')', ''),
+        ('and', 'outdoor'),
+        ('not', 'night'),
+    ])
+
+    assert expression == Expression(
+        and_=['outdoor'],
+        or_=[Expression(or_=['cat', 'dog'])],
+        not_=['night'],
+    )
+    assert str(expression) == '(+ outdoor | (| cat | dog) - night)'
+    assert not expression.is_flat
+
+
+def test_expression_simplify():
+    expression = Expression.from_sequence([
+        ('and', '('), ('and', '('), ('and', 'cat'), (')', ''), (')', ''),
+        ('not', '('), (')', ''),
+    ])
+    assert expression == Expression(and_=['cat'])
+    assert expression.is_flat
+
+
+def test_expression_unbalanced():
+    expression = Expression.from_sequence([
+        (')', ''), ('and', 'cat'), ('not', '('), ('or', 'dog'),
+    ])
+    assert expression == Expression(and_=['cat'], not_=['dog'])
+
+
+def test_expression_hash():
+    first = Expression(and_=['a', Expression(or_=['b', 'c'])])
+    second = Expression(and_=[Expression(or_=['c', 'b']), 'a'])
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first, second}) == 1
+
+
+def test_expression_depth():
+    depth = constants.MAX_QUERY_DEPTH + 10
+    sequence = []
+    for i in range(depth):
+        sequence.extend([('and', '('), ('and', f'w{i}')])
+    sequence.extend([(')', '')] * depth)
+    expression = Expression.from_sequence(sequence)
+
+    levels = 1
+    while not expression.is_flat:
+        levels += 1
+        expression = next(x for x in expression.and_
+                          if isinstance(x, Expression))
+    assert levels == constants.MAX_QUERY_DEPTH + 1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine import bitmaps
+from omoide.search_engine import class_facets
+from omoide.search_engine.class_facets import Facets
+from omoide.search_engine.class_search_result import SearchResult
+
+
+def test_facets_from_index(index):
+    facets = Facets.from_index(index)
+
+    assert facets.tags == ('t_animals', 'cat', 'dog', 'white', 'night')
+    assert list(facets.frequencies) == [10, 4, 3, 3, 2]
+    assert len(facets.indptr) == len(index) + 1
+    assert [facets.tags[x] for x in
+            facets.indices[facets.indptr[4]:facets.indptr[5]]] \
+        == ['t_animals', 'dog', 'white']
+
+
+def test_facets_top_rows(index):
+    facets = Facets.from_index(index)
+    result = SearchResult(index, [1, 3, 4, 9])
+
+    # tags found in every record do not narrow the result
+    assert facets.top(index, result) == [
+        ('cat', 2), ('white', 2), ('night', 2), ('dog', 1),
+    ]
+    assert facets.top(index, result, limit=1) == [('cat', 2)]
+
+
+def test_facets_top_bitmaps(index, monkeypatch):
+    facets = Facets.from_index(index)
+    numbers = [1, 3, 4, 9]
+    result = SearchResult(index, bitmaps.from_numbers(numbers))
+    expected = facets.top(index, SearchResult(index, numbers))
+
+    monkeypatch.setattr(class_facets, 'ROWS_BUDGET', 0)
+    assert facets.top(index, result) == expected
+    assert facets.top(index, result, limit=2) == expected[:2]
+
+
+def test_facets_top_empty(index):
+    facets = Facets.from_index(index)
+    assert facets.top(index, SearchResult(index, [])) == []
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine import find
+from omoide.search_engine.class_histograms import Histograms
+from omoide.search_engine.class_search_cache import SearchCache
+from omoide.search_engine.class_trace import Trace
+
+
+def numbers(records):
+    return [x.number for x in records]
+
+
+def test_find_specific_and(index, query_builder):
+    query = query_builder.from_query('+ cat + white')
+    records, trace = find.specific_records(query, index, set())
+    assert numbers(records) == [1]
+    assert [x.phase for x in trace] == ['index', 'plan', 'and', 'and', 'sort']
+    assert [x.total for x in trace][-3:] == [3, 1, 1]
+    assert trace.report()[0] == 'Found 10 records in index.'
+
+
+def test_find_specific_or_not(index, query_builder):
+    query = query_builder.from_query('cat | dog - white')
+    records, _ = find.specific_records(query, index, set())
+    assert numbers(records) == [0, 2, 3, 5, 6]
+
+
+def test_find_specific_unknown_tag(index, query_builder):
+    query = query_builder.from_query('+ cat + unknown')
+    records, _ = find.specific_records(query, index, set())
+    assert not records
+
+
+def test_find_specific_themes(index, query_builder):
+    query = query_builder.from_query('+ white')
+    records, _ = find.specific_records(query, index, {'t_animals'})
+    assert numbers(records) == [1, 4, 7]
+
+
+def test_find_random(index):
+    records, _ = find.random_records(index, {'t_animals'}, seed=5)
+    assert len(records) == 10
+    assert len(set(numbers(records[:5]))) == 5
+    assert sorted(numbers(records)) == list(range(10))
+
+    again, _ = find.random_records(index, {'t_animals'}, seed=5)
+    assert numbers(again[5:]) == numbers(records[5:])
+
+
+def test_find_random_themes(index):
+    records, _ = find.random_records(index, {'cat'}, seed=1)
+    assert sorted(numbers(records)) == [0, 1, 2, 3]
+
+
+def test_find_specific_cache(index, query_builder):
+    cache = SearchCache()
+    query = query_builder.from_query('cat | dog - white')
+
+    first, _ = find.specific_records(query, index, set(), cache)
+    second, trace = find.specific_records(query, index, set(), cache)
+
+    assert second is first
+    assert [x.phase for x in trace] == ['cache']
+    assert 'in cache' in trace.report()[0]
+    assert numbers(second[1:3]) == [2, 3]
+    assert cache.as_dict()['hits'] == 1
+    assert cache.as_dict()['misses'] == 1
+
+
+def test_find_specific_groups(index, query_builder):
+    query = query_builder.from_query('(cat | dog) + white - (night | dog)')
+    records, _ = find.specific_records(query, index, set())
+    assert numbers(records) == [1]
+
+
+def test_find_specific_conditions(column_index, query_builder):
+    query = query_builder.from_query('+ cat + size>=2mb | date:2019..2020')
+    records, _ = find.specific_records(query, column_index, set())
+    assert numbers(records) == [2]
+
+
+def test_find_specific_skipped(index, query_builder):
+    timings = Histograms()
+    query = query_builder.from_query('+ cat + dog + night')
+    records, trace = find.specific_records(query, index, set(),
+                                           trace=Trace(timings))
+    assert not records
+    assert trace.report()[-2].startswith('Skipped')
+    assert timings.total('and') == 2
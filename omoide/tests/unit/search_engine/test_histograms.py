@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import threading
+
+from omoide.search_engine.class_histograms import Histograms
+
+
+def test_histograms_quantile():
+    timings = Histograms(bounds=[0.001, 0.01, 0.1])
+
+    for _ in range(90):
+        timings.observe('and', 0.0005)
+    for _ in range(9):
+        timings.observe('and', 0.05)
+    timings.observe('and', 5.0)
+
+    assert timings.total('and') == 100
+    assert timings.quantile('and', 0.5) == 0.001
+    assert timings.quantile('and', 0.95) == 0.1
+    assert timings.quantile('and', 1.0) == float('inf')
+    assert timings.quantile('or', 0.5) is None
+
+
+def test_histograms_as_dict():
+    timings = Histograms(bounds=[0.001, 0.01])
+    timings.observe('sort', 0.002)
+    timings.observe('sort', 0.5)
+
+    state = timings.as_dict()['sort']
+    assert state['count'] == 2
+    assert state['p50'] == 0.01
+    assert state['p99'] is None
+    assert state['buckets'] == {'0.001': 0, '0.01': 1, 'inf': 1}
+
+    timings.clear()
+    assert timings.as_dict() == {}
+
+
+def test_histograms_threads():
+    timings = Histograms(bounds=[0.001, 0.01])
+
+    def work():
+        for _ in range(10_000):
+            timings.observe('and', 0.0005)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert timings.total('and') == 80_000
+    assert timings.as_dict()['and']['buckets']['0.001'] == 80_000
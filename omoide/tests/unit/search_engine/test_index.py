@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_index import group_synonyms
+
+
+def test_index_get_by_tag(index):
+    assert list(bitmaps.iterate(index.get_by_tag('dog'))) == [4, 5, 6]
+    assert index.get_by_tag('unknown') == bitmaps.EMPTY
+    assert index.count('cat') == 4
+    assert index.count('unknown') == 0
+
+
+def test_index_themes_mask(index):
+    mask = index.get_themes_mask({'cat', 'night'})
+    assert list(bitmaps.iterate(mask)) == [0, 1, 2, 3, 9]
+    assert index.get_themes_mask(['night', 'cat']) is mask
+    assert index.get_themes_mask({'unknown'}) == bitmaps.EMPTY
+
+
+def test_group_synonyms():
+    synonyms = group_synonyms([['a', 'B'], ['c', 'd'], ['b', 'e'], ['f']])
+    assert synonyms == {
+        'a': ('a', 'b', 'e'),
+        'b': ('a', 'b', 'e'),
+        'e': ('a', 'b', 'e'),
+        'c': ('c', 'd'),
+        'd': ('c', 'd'),
+    }
+    assert synonyms['a'] is synonyms['e']
+
+
+def test_index_expand(synonym_index):
+    assert synonym_index.expand('kitty') == ('kitty', 'cat', 'kitten')
+    assert synonym_index.expand('white') == ('white',)
+
+
+def test_index_candidates(index):
+    assert index.get_candidates(None) == range(10)
+    assert index.get_candidates({'unknown'}) == range(10)
+
+    candidates = index.get_candidates({'dog', 'night'})
+    assert list(candidates) == [3, 4, 5, 6, 9]
+    assert index.get_candidates(['night', 'dog']) is candidates
+
+
+def test_index_conditions(column_index):
+    bitmap = column_index.get_by_tag('size>5mb')
+    assert list(bitmaps.iterate(bitmap)) == [6, 7, 8, 9]
+    assert column_index.get_by_tag('size>5mb') is bitmap
+    assert column_index.count('date:2019..2020') == 2
+    assert column_index.count('ratio>1') == 0
+    assert column_index.get_by_tag('ratio>1') == bitmaps.EMPTY
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_column import Column
+from omoide.search_engine.class_delta import Delta
+from omoide.search_engine.class_index import Index, ShallowMeta
+from omoide.search_engine.class_layered_index import LayeredIndex
+from omoide.search_engine.class_predicate import Predicate
+
+
+def make_delta():
+    return Delta(
+        all_metas=[ShallowMeta('m_3', 0, ''), ShallowMeta('m_new', 1, '')],
+        by_tags={'cat': [0, 1], 't_animals': [0, 1], 'new': [1]},
+        removed=[3, 5],
+    )
+
+
+def test_layered_index_search(index):
+    layered = LayeredIndex(index, make_delta())
+
+    assert len(layered) == 12
+    assert layered.all_metas[11].uuid == 'm_new'
+    assert layered.all_metas[11].number == 11
+    assert 'new' in layered.by_tags
+    assert len(layered.by_tags) == len(index.by_tags) + 1
+
+    alive = layered.everything
+    assert bitmaps.to_numbers(alive & layered.get_by_tag('cat')).tolist() \
+        == [0, 1, 2, 10, 11]
+    assert bitmaps.to_numbers(alive & layered.get_by_tag('dog')).tolist() \
+        == [4, 6]
+
+
+def test_layered_index_candidates(index):
+    layered = LayeredIndex(index, make_delta())
+
+    assert 3 not in list(layered.get_candidates(None))
+    assert len(layered.get_candidates(None)) == 10
+    assert len(layered.get_candidates({'t_animals'})) == 10
+    assert len(layered.get_candidates({'unknown'})) == 10
+
+
+def test_layered_index_compact(index):
+    assert index.compact() is index
+    layered = LayeredIndex(index, make_delta())
+    compacted = LayeredIndex(layered, Delta([], {}, removed=[0])).compact()
+
+    assert [meta.uuid for meta in compacted.all_metas] == [
+        'm_1', 'm_2', 'm_4', 'm_6', 'm_7', 'm_8', 'm_9', 'm_3', 'm_new',
+    ]
+    assert [meta.number for meta in compacted.all_metas] == list(range(9))
+    assert bitmaps.to_numbers(compacted.get_by_tag('cat')).tolist() \
+        == [0, 1, 7, 8]
+    assert compacted.count('night') == 1
+
+
+def test_layered_index_columns(column_index):
+    delta = Delta(
+        all_metas=[ShallowMeta('m_new', 0, '')],
+        by_tags={},
+        removed=[9],
+        columns={'size': Column.from_values('Q', [20 * 1024 ** 2])},
+    )
+    layered = LayeredIndex(column_index, delta)
+
+    assert layered.count('size>=8mb') == 3
+    assert bitmaps.to_numbers(
+        layered.everything & layered.get_by_tag('size>=8mb')
+    ).tolist() == [8, 10]
+
+    compacted = layered.compact()
+    assert list(compacted.columns['size'].values)[-1] == 20 * 1024 ** 2
+    assert compacted.columns['date'].values[-1] == 0
+    assert compacted.columns['size'].count(Predicate('size', low=0)) == 10
+
+
+def test_layered_index_compact_keeps_order(index, index_metas, index_tags):
+    # full rebuild puts new meta in the middle, m_5 gets new tag
+    uuids = [meta.uuid for meta in index_metas if meta.uuid != 'm_2']
+    uuids.insert(4, 'm_new')
+    numbers = {uuid: number for number, uuid in enumerate(uuids)}
+    by_tags = {
+        tag: [numbers[f'm_{x}'] for x in values if x != 2]
+        for tag, values in index_tags.items()
+    }
+    by_tags['white'] += [numbers['m_5'], numbers['m_new']]
+    by_tags['t_animals'].append(numbers['m_new'])
+    target = Index(
+        all_metas=[ShallowMeta(uuid, number, f'/thumbnails/t/g/{uuid}.jpg')
+                   for number, uuid in enumerate(uuids)],
+        by_tags=by_tags,
+    )
+
+    delta = Delta.from_dict(Delta.from_indexes(index, target).as_dict())
+    assert [meta.uuid for meta in delta.all_metas] == ['m_new', 'm_5']
+    compacted = LayeredIndex(index, delta).compact()
+
+    assert [meta.uuid for meta in compacted.all_metas] == uuids
+    assert [meta.path_to_thumbnail for meta in compacted.all_metas] \
+        == [meta.path_to_thumbnail for meta in target.all_metas]
+    assert sorted(compacted.by_tags) == sorted(target.by_tags)
+    for tag in target.by_tags:
+        assert compacted.get_by_tag(tag) == target.get_by_tag(tag)
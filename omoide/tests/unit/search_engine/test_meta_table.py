@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine.class_meta_table import MetaTable
+from omoide.search_engine.class_shallow_meta import ShallowMeta
+
+UUID_1 = '8b5a7a6e-2f4c-4bd8-9a8e-1f0e5bb3c7a1'
+UUID_2 = 'c3f1e0d2-5a6b-4c7d-8e9f-0a1b2c3d4e5f'
+
+
+@pytest.fixture
+def metas():
+    return [
+        ShallowMeta(f'm_{UUID_1}', 0, f'/thumbnails/t_x/m_{UUID_1}.jpg'),
+        ShallowMeta(f'm_{UUID_2}', 1, f'/thumbnails/t_x/m_{UUID_2}.png'),
+        ShallowMeta('m_not_an_uuid', 2, '/thumbnails/t_x/strange.jpg'),
+        ShallowMeta(f'm_{UUID_1}', 3, '/thumbnails/t_x/other.jpg'),
+    ]
+
+
+def test_meta_table_restores_metas(metas):
+    table = MetaTable.from_metas(metas)
+
+    assert len(table) == 4
+    for original, restored in zip(metas, table):
+        assert restored.uuid == original.uuid
+        assert restored.number == original.number
+        assert restored.path_to_thumbnail == original.path_to_thumbnail
+
+
+def test_meta_table_indexing(metas):
+    table = MetaTable.from_metas(metas)
+
+    assert table[-1].number == 3
+    assert [meta.number for meta in table[1:3]] == [1, 2]
+    assert table.index(metas[1]) == 1
+
+    with pytest.raises(IndexError):
+        _ = table[4]
+
+
+def test_meta_table_is_compact(metas):
+    table = MetaTable.from_metas(metas)
+
+    # folder of the group is stored once
+    assert table.get_size() < sum(len(meta.uuid + meta.path_to_thumbnail)
+                                  for meta in metas)
+    assert sorted(table._irregular) == [2, 3]
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine import find
+from omoide.search_engine.class_ngram_index import NgramIndex, edit_distance
+from omoide.search_engine.class_query import Query
+from omoide.search_engine.class_query_builder import QueryBuilder
+
+
+@pytest.fixture
+def ngram_index():
+    return NgramIndex({'gerbil', 'gerbils', 'mouse', 'house', 'cat',
+                       'landscape', 'landscapes painting',
+                       't_650b7cdb-bd34-4626-95f7-be5d5b8ae74f'})
+
+
+def test_edit_distance():
+    assert edit_distance('cat', 'cat', 2) == 0
+    assert edit_distance('gerbli', 'gerbil', 2) == 1
+    assert edit_distance('kitten', 'sitting', 1) == 2
+    assert edit_distance('landscape', 'house', 2) == 3
+
+
+def test_ngram_index_closest(ngram_index):
+    assert len(ngram_index) == 7
+    assert ngram_index.closest('gerbill') in ('gerbil', 'gerbils')
+    assert ngram_index.closest('gerbli') == 'gerbil'
+    assert ngram_index.closest('lanscape') == 'landscape'
+    assert ngram_index.closest('mousse') == 'mouse'
+    assert ngram_index.closest('airplane') is None
+
+
+def test_ngram_index_resolve(ngram_index):
+    assert ngram_index.resolve('mouse') is None
+    assert ngram_index.resolve('cta') is None
+    assert ngram_index.resolve('muose') == 'mouse'
+
+
+
+def test_ngram_index_synonyms(synonym_index):
+    ngram_index = NgramIndex(synonym_index.by_tags, synonym_index.synonyms)
+    query_builder = QueryBuilder(Query, resolver=ngram_index.resolve)
+
+    # synonym has no posting of its own, but it is not a typo
+    query = query_builder.from_query('puppy')
+    assert not query.corrections
+    assert query.as_dict()['and_'] == ['puppy']
+
+    records, _ = find.specific_records(query, synonym_index, set())
+    expected, _ = find.specific_records(query_builder.from_query('dog'),
+                                        synonym_index, set())
+    assert records and list(records) == list(expected)
+
+    assert ngram_index.resolve('kitten') is None
+    assert ngram_index.resolve('pupyp') == 'puppy'
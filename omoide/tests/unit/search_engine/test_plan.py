@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_plan import Plan
+from omoide.search_engine.class_query import Query
+
+
+def make_query(and_=(), or_=(), not_=()):
+    return Query(and_=and_, or_=or_, not_=not_, sequence=[])
+
+
+def test_plan_orders_by_cardinality(index):
+    query = make_query(and_=['t_animals', 'night', 'cat'],
+                       or_=['dog', 'white'],
+                       not_=['white', 'night'])
+    plan = Plan.build(query, index, None)
+
+    assert [(x.operator, x.tags) for x in plan] == [
+        ('and', ('night',)),
+        ('and', ('cat',)),
+        ('or', ('dog', 'white')),
+        ('and', ('t_animals',)),
+        ('not', ('white',)),
+        ('not', ('night',)),
+    ]
+    assert str(plan).startswith("and 'night' ~2 -> and 'cat' ~4")
+
+
+def test_plan_skips_unknown(index):
+    query = make_query(or_=['unknown'], not_=['unknown'])
+    plan = Plan.build(query, index, {'t_unknown'})
+    assert len(plan) == 0
+
+    plan = Plan.build(make_query(and_=['cat', 'unknown']), index, None)
+    assert [x.estimate for x in plan] == [0, 4]
+
+
+def test_plan_apply(index):
+    plan = Plan.build(make_query(and_=['cat'], not_=['night']), index,
+                      {'t_animals'})
+    target = index.everything
+    for step in plan:
+        target = step.apply(index, target)
+    assert target == 0b111
+
+
+def test_plan_expands_synonyms(synonym_index):
+    query = make_query(and_=['kitten'], or_=['puppy'], not_=['kitty'])
+    plan = Plan.build(query, synonym_index, None)
+
+    assert [(x.operator, x.tags) for x in plan] == [
+        ('or', ('dog',)),
+        ('and', ('cat', 'kitty')),
+        ('not', ('kitty', 'cat')),
+    ]
+    assert str(plan).startswith("or (1) ~3 -> and 'cat'+1 ~5")
+
+    target = synonym_index.everything
+    for step in plan:
+        target = step.apply(synonym_index, target)
+    assert target == 0
+
+
+def test_plan_groups(index, query_builder):
+    query = query_builder.from_query('+ (cat | dog) - (+ white + night)')
+    plan = Plan.build(query, index, None)
+
+    assert [(x.operator, x.tags, len(x.groups)) for x in plan] == [
+        ('and', ('cat', 'dog'), 0),
+        ('not', (), 1),
+    ]
+    assert str(plan) == ("and 'cat'+1 ~7 -> "
+                         "not [and 'night' ~2 -> and 'white' ~3] ~2")
+
+
+def test_plan_groups_reuse(index, query_builder):
+    query = query_builder.from_query(
+        '+ (cat | (+ dog + white)) - (+ (+ dog + white) + night)'
+    )
+    plan = Plan.build(query, index, None)
+    first, second = [step.groups[0] for step in plan]
+    assert first.steps[0].groups[0] is second.steps[-1].groups[0]
+
+
+def test_plan_groups_folding(index, query_builder):
+    query = query_builder.from_query('| cat | (+ unknown + dog) - (unknown)')
+    plan = Plan.build(query, index, None)
+    assert [(x.operator, x.tags, x.groups) for x in plan] == [
+        ('or', ('cat',), ()),
+    ]
+
+    query = query_builder.from_query('+ cat + (+ unknown + dog)')
+    plan = Plan.build(query, index, None)
+    assert [x.estimate for x in plan] == [0, 4]
+    assert plan.estimate == 0
+
+
+def test_plan_evaluate(index, query_builder):
+    query = query_builder.from_query('(cat | dog) - (+ white + (dog | night))')
+    plan = Plan.build(query, index, None)
+    assert list(bitmaps.iterate(plan.evaluate(index))) == [0, 1, 2, 3, 5, 6]
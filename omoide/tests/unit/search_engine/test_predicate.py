@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine.class_predicate import Predicate
+
+
+@pytest.mark.parametrize('word, reference', [
+    ('size>5mb', Predicate('size', low=5 * 1024 ** 2, include_low=False)),
+    ('size<=1.5KiB', Predicate('size', high=1536)),
+    ('ratio>1.5', Predicate('ratio', low=1.5, include_low=False)),
+    ('width>=1920', Predicate('width', low=1920)),
+    ('mp<10', Predicate('resolution', high=10, include_high=False)),
+    ('date:2019..2020', Predicate('date', low=20190101, high=20201231)),
+    ('date:2019-05', Predicate('date', low=20190501, high=20190531)),
+    ('date>2019', Predicate('date', low=20191231, include_low=False)),
+    ('date<2019-05-03', Predicate('date', high=20190503,
+                                  include_high=False)),
+    ('date:..2019', Predicate('date', high=20191231)),
+    ('type:image', Predicate('type', low='image', high='image')),
+])
+def test_predicate_parse(word, reference):
+    assert Predicate.parse(word) == reference
+
+
+@pytest.mark.parametrize('word', [
+    'cat', 'size>', 'colour>5', 'size>5xb', 'date:2019-1-1-1',
+    'type>image', 'type:a..b', 'ratio:..', 'width>wide',
+])
+def test_predicate_parse_wrong(word):
+    assert Predicate.parse(word) is None
@@ -79,3 +79,37 @@ def test_query_builder_empty(query_builder, empty_query_dict):
     query = query_builder.from_query(text)
     assert query.as_dict() == empty_query_dict
     assert str(query) == ''
+
+
+def test_query_builder_resolver():
+    corrections = {'gerbli': 'gerbil'}
+    query_builder = QueryBuilder(Query, resolver=corrections.get)
+    query = query_builder.from_query('Gerbli - cat')
+
+    assert query.as_dict() == {'and_': [],
+                               'or_': ['gerbil'],
+                               'not_': ['cat']}
+    assert query.corrections == {'gerbli': 'gerbil'}
+    assert query.append_and('dog').corrections == query.corrections
+
+
+def test_query_builder_groups(query_builder):
+    text = '(cat | dog) + outdoor - night'
+    assert query_builder.split_request_into_parts(text) == [
+        '|', '(', '|', 'cat', '|', 'dog', ')', '+', 'outdoor', '-', 'night',
+    ]
+
+    query = query_builder.from_query(text)
+    assert query.sequence == (('or', '('), ('or', 'cat'), ('or', 'dog'),
+                              (')', ''), ('and', 'outdoor'),
+                              ('not', 'night'))
+    assert str(query) == '| ( | cat | dog ) + outdoor - night'
+    assert str(query.expression) == '(+ outdoor | (| cat | dog) - night)'
+
+
+def test_query_builder_parentheses_in_tags(query_builder):
+    query = query_builder.from_query('cat(black) + x)(')
+    assert query.as_dict() == {'and_': ['x)('],
+                               'or_': ['cat(black)'],
+                               'not_': []}
+    assert query.expression.is_flat
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine.class_random_order import RandomOrder
+
+
+@pytest.mark.parametrize('total', [1, 2, 10, 17, 1000])
+def test_random_order_is_permutation(index, total):
+    order = RandomOrder(index, range(total), seed=42)
+    assert sorted(order.permute(i) for i in range(total)) == list(range(total))
+
+
+def test_random_order_seed(index):
+    first = RandomOrder(index, range(1000), seed=1)
+    second = RandomOrder(index, range(1000), seed=2)
+    same = RandomOrder(index, range(1000), seed=1)
+
+    positions = range(30)
+    assert [first.permute(i) for i in positions] \
+        == [same.permute(i) for i in positions]
+    assert [first.permute(i) for i in positions] \
+        != [second.permute(i) for i in positions]
+
+
+def test_random_order_records(index):
+    order = RandomOrder(index, [1, 4, 7], seed=3)
+    assert len(order) == 3
+    assert sorted(x.number for x in order[:]) == [1, 4, 7]
+    assert order[-1].number == order.numbers(slice(2, 3))[0]
+
+    with pytest.raises(IndexError):
+        order[3]
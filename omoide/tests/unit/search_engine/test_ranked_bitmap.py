@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_ranked_bitmap import RankedBitmap
+
+
+def test_ranked_bitmap():
+    numbers = [0, 3, 63, 64, 65, 200, 1000, 1001]
+    ranked = RankedBitmap(bitmaps.from_numbers(numbers))
+
+    assert len(ranked) == len(numbers)
+    assert [ranked[i] for i in range(len(numbers))] == numbers
+    assert ranked[-1] == 1001
+    assert ranked[2:5] == [63, 64, 65]
+
+    with pytest.raises(IndexError):
+        ranked[len(numbers)]
+
+
+def test_ranked_bitmap_empty():
+    assert len(RankedBitmap(bitmaps.EMPTY)) == 0
+
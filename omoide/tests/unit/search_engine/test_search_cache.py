@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from array import array
+
+from omoide.search_engine.class_query import Query
+from omoide.search_engine.class_search_cache import SearchCache
+from omoide.search_engine.class_search_result import SearchResult
+
+
+def make_result(index, *numbers):
+    return SearchResult(index, array('I', numbers))
+
+
+def test_search_cache_key_is_canonical():
+    first = Query(and_=['b', 'a'], or_=[], not_=['c'],
+                  sequence=[('and', 'b'), ('and', 'a'), ('not', 'c')])
+    second = Query(and_=['a', 'b'], or_=[], not_=['c'],
+                   sequence=[('not', 'c'), ('and', 'a'), ('and', 'b')])
+
+    assert SearchCache.make_key(first, {'t_2', 't_1'}) \
+           == SearchCache.make_key(second, {'t_1', 't_2'})
+    assert SearchCache.make_key(first, None) \
+           == SearchCache.make_key(second, set())
+
+
+def test_search_cache_eviction(index):
+    result = make_result(index, 1, 2, 3)
+    cache = SearchCache(max_bytes=400)
+    cache.bind(index)
+
+    cache.put(('a',), result)
+    cache.put(('b',), result)
+    assert cache.get(('a',)) is result
+    cache.put(('c',), result)
+
+    assert cache.get(('b',)) is None
+    assert cache.get(('a',)) is result
+    assert cache.total_bytes <= 400
+    assert cache.as_dict()['hits'] == 2
+
+
+def test_search_cache_bind(index, index_metas, index_tags):
+    cache = SearchCache()
+    cache.bind(index)
+    cache.put(('a',), make_result(index, 1))
+    cache.bind(index)
+    assert len(cache) == 1
+
+    cache.bind(type(index)(index_metas, index_tags))
+    assert len(cache) == 0
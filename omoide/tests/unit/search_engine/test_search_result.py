@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine.class_index import Index, ShallowMeta
+from omoide.search_engine.class_search_result import SearchResult
+
+
+@pytest.fixture
+def big_index():
+    metas = [ShallowMeta(f'm_{i}', i, '') for i in range(10_000)]
+    return Index(all_metas=metas, by_tags={})
+
+
+def test_search_result_bitmap(big_index):
+    numbers = list(range(0, 10_000, 2))
+    result = SearchResult.from_bitmap(big_index,
+                                      bitmaps.from_numbers(numbers))
+
+    assert len(result) == 5_000
+    assert result[0].number == 0
+    assert result[-1].number == 9_998
+    assert [x.number for x in result[100:103]] == [200, 202, 204]
+    assert [x.number for x in result[10:4:-3]] == [20, 14]
+    assert result[5_000:] == []
+
+    with pytest.raises(IndexError):
+        _ = result[5_000]
+
+
+def test_search_result_array(big_index):
+    result = SearchResult.from_bitmap(big_index,
+                                      bitmaps.from_numbers([7, 9000]))
+    assert len(result) == 2
+    assert [x.uuid for x in result] == ['m_7', 'm_9000']
+
+
+def test_search_result_after(big_index):
+    dense = SearchResult(big_index, bitmaps.from_numbers(range(0, 10_000, 2)))
+    sparse = SearchResult.from_bitmap(big_index,
+                                      bitmaps.from_numbers([7, 9000, 9001]))
+
+    assert dense.after(101, 3) == [102, 104, 106]
+    assert dense.after(9_998, 3) == []
+    assert sparse.after(7, 1) == [9000]
+    assert sparse.after(0, 5) == [7, 9000, 9001]
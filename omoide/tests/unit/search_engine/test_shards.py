@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine import bitmaps
+from omoide.search_engine import find
+from omoide.search_engine.class_index import Index
+from omoide.search_engine.class_plan import Plan
+from omoide.search_engine.class_shards import Shards
+
+QUERIES = [
+    'cat',
+    'cat | dog - white',
+    '+ size>3mb + date<2024',
+    't_animals - ( cat | night )',
+]
+
+
+def test_index_get_shard(column_index):
+    shard = column_index.get_shard(3, 7)
+
+    assert len(shard) == 4
+    assert list(bitmaps.iterate(shard.get_by_tag('cat'))) == [0]
+    assert list(bitmaps.iterate(shard.get_by_tag('dog'))) == [1, 2, 3]
+    assert list(bitmaps.iterate(shard.get_by_tag('size>5mb'))) == [3]
+
+
+@pytest.mark.parametrize('text', QUERIES)
+def test_shards_evaluate(column_index, query_builder, text):
+    query = query_builder.from_query(text)
+    shards = Shards(column_index, 3)
+
+    try:
+        assert shards.bounds == [(0, 3), (3, 6), (6, 10)]
+        assert shards.evaluate(Plan.build(query, column_index, set())) \
+            == Plan.build(query, column_index, set()).evaluate(column_index)
+    finally:
+        shards.close()
+
+
+@pytest.mark.parametrize('text, themes, expected', [
+    ('fox | owl', set(), [0, 1, 2]),
+    ('cat - ( fox | owl )', set(), [3]),
+    ('- cat', {'t_a'}, [4]),
+    ('fox', {'t_a'}, [0]),
+    ('dog', {'t_a'}, [4]),
+])
+def test_shards_evaluate_missing_in_shard(index_metas, index_tags,
+                                          query_builder, text, themes,
+                                          expected):
+    index = Index(all_metas=index_metas,
+                  by_tags={**index_tags, 'fox': [0, 1], 'owl': [2],
+                           't_a': [0, 3, 4]})
+    query = query_builder.from_query(text)
+    plan = Plan.build(query, index, themes)
+    shards = Shards(index, 3)
+
+    try:
+        assert list(bitmaps.iterate(plan.evaluate(index))) == expected
+        assert shards.evaluate(Plan.build(query, index, themes)) \
+            == plan.evaluate(index)
+    finally:
+        shards.close()
+
+
+def test_shards_in_specific_records(column_index, query_builder):
+    query = query_builder.from_query('cat | dog - white')
+    expected, _ = find.specific_records(query, column_index, set())
+    column_index.shards = Shards(column_index, 2)
+
+    try:
+        result, trace = find.specific_records(query, column_index, set())
+        assert list(result.numbers(slice(None))) \
+            == list(expected.numbers(slice(None)))
+        assert 'on 2 shards' in trace.report()[2]
+    finally:
+        column_index.shards.close()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine import snapshot
+from omoide.search_engine.class_delta import Delta
+from omoide.search_engine.class_facets import Facets
+
+
+def test_snapshot_roundtrip(index, tmp_path):
+    path = str(tmp_path / 'index.bin')
+    snapshot.save(path, index)
+    loaded = snapshot.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.all_metas[3].uuid == 'm_3'
+    assert loaded.all_metas[3].number == 3
+    assert loaded.all_metas[-1].path_to_thumbnail == '/thumbnails/t/g/m_9.jpg'
+    assert sorted(loaded.by_tags) == sorted(index.by_tags)
+
+    for tag in index.by_tags:
+        assert loaded.get_by_tag(tag) == index.get_by_tag(tag)
+
+    assert loaded.get_by_tag('unknown') == 0
+    assert 'cat' in loaded.by_tags
+    assert 'ca' not in loaded.by_tags
+
+
+def test_snapshot_wrong_file(tmp_path):
+    path = tmp_path / 'index.bin'
+    path.write_bytes(b'something else entirely')
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.load(str(path))
+
+
+@pytest.mark.parametrize('cut', [1, 100, 1000])
+def test_snapshot_truncated(index, tmp_path, cut):
+    path = tmp_path / 'index.bin'
+    snapshot.save(str(path), index)
+    content = path.read_bytes()
+    path.write_bytes(content[:-cut])
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.load(str(path))
+
+
+def test_snapshot_broken_catalog(index, tmp_path):
+    path = tmp_path / 'index.bin'
+    snapshot.save(str(path), index)
+    content = path.read_bytes()
+    path.write_bytes(content[:-1] + b'#')
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.load(str(path))
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.load_facets(str(path))
+
+
+def test_snapshot_array_out_of_bounds(column_index, tmp_path):
+    path = tmp_path / 'index.bin'
+    snapshot.save(str(path), column_index)
+    content = path.read_bytes()
+    # same length, so catalog stays where header expects it
+    broken = content.replace(b'"values": [', b'"values":[9', 1)
+    path.write_bytes(broken)
+
+    with pytest.raises(snapshot.SnapshotError, match='broken') as info:
+        snapshot.load(str(path))
+
+    assert 'out of bounds' in str(info.value.__cause__)
+
+
+def test_snapshot_synonyms(synonym_index, tmp_path):
+    path = str(tmp_path / 'index.bin')
+    snapshot.save(path, synonym_index)
+    loaded = snapshot.load(path)
+
+    assert loaded.synonyms == synonym_index.synonyms
+    assert loaded.expand('puppy') == ('puppy', 'dog')
+
+
+def test_snapshot_columns(column_index, tmp_path):
+    path = str(tmp_path / 'index.bin')
+    snapshot.save(path, column_index)
+    loaded = snapshot.load(path)
+
+    assert sorted(loaded.columns) == ['date', 'size']
+    assert list(loaded.columns['size'].values) \
+        == list(column_index.columns['size'].values)
+    assert loaded.get_by_tag('date>2020') \
+        == column_index.get_by_tag('date>2020')
+
+
+def test_snapshot_facets(index, tmp_path):
+    path = str(tmp_path / 'index.bin')
+    facets = Facets.from_index(index)
+    snapshot.save(path, index, facets)
+    loaded = snapshot.load_facets(path)
+
+    assert loaded.tags == facets.tags
+    assert list(loaded.indptr) == list(facets.indptr)
+    assert list(loaded.indices) == list(facets.indices)
+
+    snapshot.save(path, index)
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.load_facets(path)
+
+
+def test_snapshot_delta(index, tmp_path):
+    path = str(tmp_path / 'index.bin')
+    snapshot.save(path, index)
+    generation = snapshot.get_generation(path)
+    assert generation
+
+    delta_path = str(tmp_path / 'index.delta.json')
+    delta = Delta([], {}, removed=[1, 2], base=generation)
+    snapshot.save_delta(delta_path, delta)
+    loaded = snapshot.load_delta(delta_path)
+
+    assert loaded.removed == [1, 2]
+    assert loaded.base == generation
+
+    snapshot.save(path, index)
+    assert snapshot.get_generation(path) != generation
+
+
+def test_snapshot_compact(index, tmp_path):
+    path = str(tmp_path / 'index.bin')
+    delta_path = str(tmp_path / 'index.delta.json')
+    snapshot.save(path, index)
+    generation = snapshot.get_generation(path)
+    assert snapshot.compact(path, delta_path) == 0
+
+    snapshot.save_delta(delta_path, Delta([], {}, removed=[1, 2],
+                                          base=generation))
+    assert snapshot.compact(path, delta_path) > 0
+    assert not (tmp_path / 'index.delta.json').exists()
+    assert snapshot.get_generation(path) != generation
+
+    loaded = snapshot.load(path)
+    assert [meta.uuid for meta in loaded.all_metas] \
+        == ['m_0', 'm_3', 'm_4', 'm_5', 'm_6', 'm_7', 'm_8', 'm_9']
+    assert loaded.count('cat') == 2
+    assert len(snapshot.load_facets(path).indptr) == len(loaded) + 1
+
+
+def test_snapshot_compact_wrong_base(index, tmp_path):
+    path = str(tmp_path / 'index.bin')
+    delta_path = str(tmp_path / 'index.delta.json')
+    snapshot.save(path, index)
+    snapshot.save_delta(delta_path, Delta([], {}, removed=[1], base='old'))
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.compact(path, delta_path)
+
+    assert (tmp_path / 'index.delta.json').exists()
+
+
+def test_snapshot_lock(tmp_path):
+    path = str(tmp_path / 'index.bin')
+
+    with snapshot.lock(path) as acquired:
+        assert acquired
+        with snapshot.lock(path, blocking=False) as other:
+            assert not other
+
+    with snapshot.lock(path, blocking=False) as acquired:
+        assert acquired
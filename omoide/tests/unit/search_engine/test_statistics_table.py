@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine.class_statistics import Statistics
+from omoide.search_engine.class_statistics_table import StatisticsTable
+
+
+@pytest.fixture
+def themes():
+    first = Statistics()
+    first.add('2021-10-01', 25, ['alpha', 'beta', 'gamma'])
+    first.add('2021-06-14', 250, ['alpha', 'cat'])
+    second = Statistics()
+    second.add('2019-02-28', 780, ['beta', 'home', 'cat'])
+    return {'t_first': first, 't_second': second}
+
+
+@pytest.fixture
+def table(themes):
+    return StatisticsTable.from_dicts({
+        theme: statistics.as_dict() for theme, statistics in themes.items()
+    })
+
+
+def test_statistics_table_merge(table, themes):
+    expected = themes['t_first'] + themes['t_second']
+
+    assert table.tags == ('alpha', 'beta', 'cat', 'gamma', 'home')
+    assert table.merge(['t_first', 't_second']).as_dict() \
+        == expected.as_dict()
+    assert table.merge(['t_second', 'unknown']).as_dict() \
+        == themes['t_second'].as_dict()
+    assert table.merge([]).total_items == 0
+
+
+def test_statistics_table_get(table):
+    everything = table.get(None)
+
+    assert everything.total_items == 3
+    assert everything.tags_by_frequency[:3] == [
+        ('alpha', 2), ('beta', 2), ('cat', 2),
+    ]
+    assert table.get(None) is everything
+    assert table.get({'t_first'}) is table.get(['t_first'])
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+import pytest
+
+from omoide.search_engine.class_tag_trie import TagTrie
+
+
+@pytest.fixture
+def tag_trie():
+    return TagTrie({'cat': 10, 'caterpillar': 2, 'catfish': 5,
+                    'car': 7, 'dog': 20, 'doge': 1}, limit=2)
+
+
+def test_tag_trie_suggest(tag_trie):
+    assert tag_trie.suggest('c') == [('cat', 10), ('car', 7)]
+    assert tag_trie.suggest('cat') == [('cat', 10), ('catfish', 5)]
+    assert tag_trie.suggest('CAT', limit=5) == [('cat', 10), ('catfish', 5),
+                                                ('caterpillar', 2)]
+    assert tag_trie.suggest('dogs') == []
+    assert tag_trie.suggest(' ') == []
+
+
+def test_tag_trie_suggest_counter(tag_trie):
+    counts = {'caterpillar': 3, 'catfish': 1}
+    assert tag_trie.suggest('ca', counter=lambda x: counts.get(x, 0)) == [
+        ('caterpillar', 3), ('catfish', 1)
+    ]
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""Tests.
+"""
+from omoide.search_engine.class_histograms import Histograms
+from omoide.search_engine.class_trace import Trace
+
+
+def test_trace_report():
+    trace = Trace()
+    trace.note('Did you mean cat?')
+    trace.add('index', total=12_345)
+
+    with trace.span('themes', themes=2) as span:
+        span.total = 100
+
+    with trace.span('shuffle', seed=7) as span:
+        span.total = 100
+
+    report = trace.report()
+    assert len(trace) == 3
+    assert report[0] == 'Did you mean cat?'
+    assert report[1] == 'Found 12 345 records in index.'
+    assert report[2].startswith('Found 100 records on 2 themes in ')
+    assert report[3].startswith('Complete shuffling with seed 7 in ')
+
+
+def test_trace_histograms():
+    timings = Histograms()
+    trace = Trace(timings)
+    trace.add('index', total=10)
+
+    for _ in range(3):
+        with trace.span('sort'):
+            pass
+
+    assert timings.total('sort') == 3
+    assert timings.total('index') == 0
+    assert trace.spans[-1].duration >= 0
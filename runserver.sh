@@ -1,3 +1,4 @@
 #!/bin/bash
 source ./venv/bin/activate
-gunicorn --workers=4 --bind :8080 omoide.application.app:app
+gunicorn --config=python:omoide.application.gunicorn_config \
+    --workers=4 --bind :8080 omoide.application.app:app